@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+audit_sources.py — AEROSPACEMODEL audit record locations
+Path: 02_LIFECYCLE_OS/lib/audit_sources.py
+Authority: ASIT
+
+The one rule for which YAML files are audit records and NCRs: every YAML
+under 09_AUDIT_AND_ASSURANCE and in a product or standard audit/ or
+audits/ folder. The audit schema and templates in 00_META and the audit
+models in 03_SHARED_SERVICES/audit describe records without being any.
+validate_audit_records.py, generate_audit_report.py, kpi_engine.py (and
+through it token_distribution.py) and registry_db.py all select their
+audit inputs with is_audit_source().
+"""
+
+AUDIT_ROOT = '09_AUDIT_AND_ASSURANCE'
+AUDIT_DIR_NAMES = {'audit', 'audits'}
+YAML_EXTENSIONS = ('.yaml', '.yml')
+NON_RECORD_ROOTS = ('00_META/', '03_SHARED_SERVICES/')
+
+
+def is_audit_source(rel):
+    """Return True when the repo-relative path is an audit record or NCR YAML."""
+    if not rel.endswith(YAML_EXTENSIONS) or rel.startswith(NON_RECORD_ROOTS):
+        return False
+    parts = rel.split('/')
+    return parts[0] == AUDIT_ROOT or any(p.lower() in AUDIT_DIR_NAMES for p in parts[:-1])
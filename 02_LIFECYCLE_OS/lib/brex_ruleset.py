@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+brex_ruleset.py — AEROSPACEMODEL BREX ruleset access
+Path: 02_LIFECYCLE_OS/lib/brex_ruleset.py
+Authority: ASIT
+
+01_GOVERNANCE/brex/BREX_RULESET.yaml is the single source of a rule's
+severity: brex_engine.py grades its findings with it, and the per-file
+validators stamp the same rule IDs through rule_severity(), so a finding
+has one severity whichever tool reports it.
+"""
+
+import os
+from functools import lru_cache
+
+from yaml_loader import LOADER_NAME, load_yaml
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BREX_RULESET = os.path.join(REPO_ROOT, '01_GOVERNANCE', 'brex', 'BREX_RULESET.yaml')
+
+
+def load_ruleset(path=BREX_RULESET):
+    return (load_yaml(path) or {}).get('rules', [])
+
+
+@lru_cache(maxsize=None)
+def rule_severities(path=BREX_RULESET):
+    """Return {rule_id: severity}; a rule without a severity is an ERROR, as in brex_engine.
+
+    Without PyYAML the ruleset cannot be read and every rule keeps its default.
+    """
+    if LOADER_NAME is None:
+        return {}
+    return {str(rule.get('rule_id')): rule.get('severity', 'ERROR') for rule in load_ruleset(path)}
+
+
+def rule_severity(rule_id, default='ERROR'):
+    """Severity BREX_RULESET.yaml assigns rule_id, or default for a rule it does not list."""
+    return rule_severities().get(rule_id, default)
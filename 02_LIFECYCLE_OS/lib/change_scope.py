@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+change_scope.py — AEROSPACEMODEL git-diff validation scope
+Path: 02_LIFECYCLE_OS/lib/change_scope.py
+Authority: ASIT
+
+Limits a validator run to the files a change can affect (--changed-since
+REV). The changed files are those that differ between REV and the working
+tree, plus untracked files, as reported by git. When a changed KNOTS.csv,
+KNU_PLAN.csv, evidence register or clause register gains or loses IDs,
+every registry file that mentions one of those IDs is affected too; these
+are found with one `git grep` over the tree rather than by parsing it.
+
+A change to a rule or schema input — 00_META, 01_GOVERNANCE, 02_LIFECYCLE_OS
+or a script passed as rule_inputs — can alter the findings of any file, so
+the scope then covers the whole tree (scope.full).
+"""
+
+import os
+import subprocess
+
+from records import RecordTable
+from repo_walk import find_files, iter_files
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+GLOBAL_INPUTS = ('00_META', '01_GOVERNANCE', '02_LIFECYCLE_OS')
+
+# Files whose IDs other registry files refer to: filename -> ID column.
+ID_COLUMNS = {
+    'KNOTS.csv': 'knot_id',
+    'KNU_PLAN.csv': 'knu_id',
+    'evidence_register.csv': 'oid',
+    'clause_register.csv': 'clause_id',
+}
+REFERRING_FILES = ['KNOTS.csv', 'KNU_PLAN.csv', 'evidence_register.csv', 'clause_to_knu_matrix.csv',
+                   'cross_standard_trace.csv']
+
+
+class ChangeScopeError(Exception):
+    """git could not resolve the revision or list the changes."""
+
+
+def git(root, *args, stdin=None, ok_codes=(0,)):
+    try:
+        proc = subprocess.run(['git', '-C', root, *args], input=stdin, capture_output=True)
+    except OSError as e:
+        raise ChangeScopeError(f'git not available: {e}') from e
+    if proc.returncode not in ok_codes:
+        raise ChangeScopeError(proc.stderr.decode('utf-8', 'replace').strip() or f'git {args[0]} failed')
+    return proc.stdout
+
+
+def split_z(output):
+    return [os.fsdecode(p) for p in output.split(b'\0') if p]
+
+
+def file_ids(table, column):
+    if table is None:
+        return set()
+    return {v.strip() for _line, v in table.select([column]) if v and v.strip()}
+
+
+class ChangeScope:
+    """Changed and affected files between rev and the working tree of root."""
+
+    def __init__(self, rev, root=REPO_ROOT, rule_inputs=()):
+        self.rev = rev
+        self.root = os.path.abspath(root)
+        self.top = os.fsdecode(git(self.root, 'rev-parse', '--show-toplevel').strip())
+        try:
+            git(self.root, 'rev-parse', '--verify', '--quiet', f'{rev}^{{commit}}')
+        except ChangeScopeError:
+            raise ChangeScopeError(f'unknown revision: {rev}') from None
+        changed = split_z(git(self.top, 'diff', '--name-only', '-z', '--no-renames', rev, '--'))
+        changed += split_z(git(self.top, 'ls-files', '--others', '--exclude-standard', '-z'))
+        self.changed = {p for p in (os.path.join(self.top, rel) for rel in changed)
+                        if p.startswith(self.root + os.sep)}
+        global_inputs = [os.path.join(self.root, d) + os.sep for d in GLOBAL_INPUTS]
+        global_inputs += [os.path.abspath(p) for p in rule_inputs]
+        self.full = any(p.startswith(tuple(global_inputs)) for p in self.changed)
+        self.toggled = set()
+        self.affected = set(self.changed)
+        if not self.full:
+            self.affected |= self.referrers()
+
+    def old_table(self, path):
+        rel = os.path.relpath(path, self.top).replace(os.sep, '/')
+        try:
+            text = git(self.top, 'show', f'{self.rev}:{rel}')
+        except ChangeScopeError:
+            return None
+        return RecordTable.from_text(text.decode('utf-8', 'replace'), os.path.basename(path))
+
+    def referrers(self):
+        """Registry files mentioning an ID that a changed file added or removed."""
+        for path in sorted(self.changed):
+            column = ID_COLUMNS.get(os.path.basename(path))
+            if column is None:
+                continue
+            old = self.old_table(path)
+            new = RecordTable.from_csv(path) if os.path.isfile(path) else None
+            self.toggled |= file_ids(old, column) ^ file_ids(new, column)
+        if not self.toggled:
+            return set()
+        patterns = '\n'.join(sorted(self.toggled)).encode('utf-8') + b'\n'
+        found = git(self.root, 'grep', '-l', '-z', '-F', '-w', '--full-name', '--untracked', '-f', '-', '--',
+                    *(f'*{name}' for name in REFERRING_FILES), stdin=patterns, ok_codes=(0, 1))
+        return {os.path.join(self.top, rel) for rel in split_z(found)}
+
+    def includes(self, filepath):
+        return self.full or os.path.abspath(filepath) in self.affected
+
+    def find_files(self, filename):
+        """Affected paths named filename (every one under root when the scope is full)."""
+        if self.full:
+            return find_files(filename, self.root)
+        return sorted(p for p in self.affected if os.path.basename(p) == filename and os.path.isfile(p))
+
+    def iter_files(self):
+        if self.full:
+            return iter_files(self.root)
+        return iter(sorted(p for p in self.affected if os.path.isfile(p)))
+
+    def describe(self):
+        if self.full:
+            return f'Scope: rule or schema inputs changed since {self.rev}; validating every file'
+        return f'Scope: {len(self.changed)} changed, {len(self.affected)} affected files since {self.rev}'
+
+
+def add_scope_arguments(parser):
+    parser.add_argument('--changed-since', default=None, metavar='REV',
+                        help='validate only files changed since git revision REV and the files referring to them')
+
+
+def open_scope(args, root=REPO_ROOT, rule_inputs=()):
+    """Return the ChangeScope --changed-since asks for, or None for a whole-tree run."""
+    rev = getattr(args, 'changed_since', None)
+    if rev is None:
+        return None
+    return ChangeScope(rev, root, rule_inputs)
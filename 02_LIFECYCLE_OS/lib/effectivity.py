@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+effectivity.py — AEROSPACEMODEL effectivity rule resolution
+Path: 02_LIFECYCLE_OS/lib/effectivity.py
+Authority: ASIT
+
+Compiles every variant's configuration/effectivity_rules.yaml into range
+indexes and resolves which rules, configuration items and service bulletins
+apply to a tail serial on a date. The rule format and effectivity types are
+defined in 06_PRODUCT_DATA_MODEL/configuration_management/effectivity_model.yaml.
+
+Each variant has two RangeIndex tables, one over serial numbers and one
+over dates: the sorted boundaries of every rule's ranges split the axis into
+segments, and each segment holds the (shared, frozen) set of rules covering
+it, so a lookup is one bisect. Rules with no serial or date constraint are
+kept apart instead of being copied into every segment. A bulk query fixes
+the date once (VariantEffectivity.on()), filters each serial segment to the
+rules in force that day, and then costs one bisect per serial; serials in
+the same segment with the same modification state share one result.
+
+A configuration item in the variant's configuration_baseline.yaml applies
+when one of the rules named by its effectivity applies, or always when it
+names none; rules may also list items under applies_to.
+"""
+
+import datetime
+import os
+from bisect import bisect_right
+from collections import namedtuple
+
+from fileio import relpath
+from repo_walk import walk_repo
+from yaml_loader import YamlLoadError, load_yaml
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+EFFECTIVITY_MODEL = os.path.join(REPO_ROOT, '06_PRODUCT_DATA_MODEL', 'configuration_management',
+                                 'effectivity_model.yaml')
+RULES_FILE = 'effectivity_rules.yaml'
+BASELINE_FILE = 'configuration_baseline.yaml'
+
+SERIAL_NUMBER, MANUFACTURING_BLOCK, DATE_BASED = 'SERIAL_NUMBER', 'MANUFACTURING_BLOCK', 'DATE_BASED'
+MODIFICATION_STATUS, UNIVERSAL = 'MODIFICATION_STATUS', 'UNIVERSAL'
+# Field each effectivity type needs besides rule_id and type.
+TYPE_FIELDS = {SERIAL_NUMBER: 'serials', MANUFACTURING_BLOCK: 'blocks', DATE_BASED: 'from_date',
+               MODIFICATION_STATUS: 'modification', UNIVERSAL: None}
+# Fields holding one value, and fields holding a value or a list of values.
+SCALAR_FIELDS = ('rule_id', 'type', 'modification', 'description')
+LIST_FIELDS = ('serials', 'blocks')
+APPLIES_TO_FIELDS = ('configuration_items', 'service_bulletins')
+OPEN_END = float('inf')
+NO_RULES = frozenset()
+
+Rule = namedtuple('Rule', 'rule_id type modification incorporated configuration_items service_bulletins')
+Resolution = namedtuple('Resolution', 'rules configuration_items service_bulletins')
+
+
+class EffectivityError(ValueError):
+    """Effectivity rules that cannot be compiled; .problems lists every reason."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(f'{len(problems)} effectivity rule problem(s)')
+
+
+def effectivity_types(path=EFFECTIVITY_MODEL):
+    model = load_yaml(path) or {}
+    return [str(t['type']) for t in model.get('effectivity_types') or [] if isinstance(t, dict) and t.get('type')]
+
+
+def rule_fields(path=EFFECTIVITY_MODEL):
+    """Return {effectivity type: fields a rule of that type may have}, from the model's effectivity_rule."""
+    model = load_yaml(path) or {}
+    spec = model.get('effectivity_rule') or {}
+    common = set(spec.get('required_fields') or []) | set(spec.get('optional_fields') or [])
+    type_fields = spec.get('type_fields') or {}
+    return {t: frozenset(common | set(id_list(type_fields.get(t)))) for t in effectivity_types(path)}
+
+
+def field_problems(entry, allowed):
+    """Return a message for every field of a rule entry that is not in allowed or has the wrong type."""
+    problems = [f'unknown field "{field}"' for field in entry if field not in allowed]
+    for field in SCALAR_FIELDS:
+        if isinstance(entry.get(field), (dict, list)):
+            problems.append(f'{field} must be a single value')
+    for field in LIST_FIELDS:
+        value = entry.get(field)
+        if isinstance(value, dict) or isinstance(value, list) and any(isinstance(v, (dict, list)) for v in value):
+            problems.append(f'{field} must be a value or a list of values')
+    if 'incorporated' in entry and not isinstance(entry['incorporated'], bool):
+        problems.append('incorporated must be true or false')
+    applies_to = entry.get('applies_to')
+    if applies_to is not None and not isinstance(applies_to, dict):
+        problems.append(f'applies_to must be a mapping of {" and/or ".join(APPLIES_TO_FIELDS)}')
+    elif applies_to:
+        problems.extend(f'unknown applies_to field "{field}"' for field in applies_to if field not in APPLIES_TO_FIELDS)
+        problems.extend(f'applies_to.{field} must be an ID or a list of IDs' for field in APPLIES_TO_FIELDS
+                        if isinstance(applies_to.get(field), dict))
+    return problems
+
+
+def parse_serial(value):
+    """Return a serial number as an int; raise ValueError for anything else."""
+    if isinstance(value, bool):
+        raise ValueError(f'invalid serial {value!r}')
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if not text.isdigit():
+        raise ValueError(f'invalid serial {value!r}')
+    return int(text)
+
+
+def parse_serial_ranges(value):
+    """Return [(first, last)] for 'N', 'N-M', 'N-' (N and subsequent) or a list of them."""
+    ranges = []
+    for item in value if isinstance(value, list) else [value]:
+        text = str(item).strip()
+        first, sep, last = text.partition('-')
+        lo = parse_serial(first)
+        hi = (parse_serial(last) if last.strip() else OPEN_END) if sep else lo
+        if hi < lo:
+            raise ValueError(f'empty serial range {text!r}')
+        ranges.append((lo, hi))
+    return ranges
+
+
+def parse_date(value):
+    """Return the ordinal of a YAML date or an ISO date string."""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()).toordinal()
+    except ValueError:
+        raise ValueError(f'invalid date {value!r} (expected YYYY-MM-DD)') from None
+
+
+def id_list(value):
+    if value is None:
+        return []
+    return [str(v).strip() for v in (value if isinstance(value, list) else [value]) if str(v).strip()]
+
+
+class RangeIndex:
+    """Sorted elementary segments of an integer axis, each with the frozenset of rules covering it."""
+
+    def __init__(self, ranges):
+        """ranges: [(first, last, rule_id)] with inclusive bounds; last may be OPEN_END."""
+        events = {}
+        for first, last, rule_id in ranges:
+            events.setdefault(first, []).append((1, rule_id))
+            if last != OPEN_END:
+                events.setdefault(last + 1, []).append((-1, rule_id))
+        self.starts = sorted(events)
+        self.sets = []
+        interned = {}
+        active = {}
+        for point in self.starts:
+            for delta, rule_id in events[point]:
+                n = active.get(rule_id, 0) + delta
+                if n:
+                    active[rule_id] = n
+                else:
+                    del active[rule_id]
+            covering = frozenset(active)
+            self.sets.append(interned.setdefault(covering, covering))
+
+    def segment(self, x):
+        """Return the index of the segment holding x, or -1 before the first boundary."""
+        return bisect_right(self.starts, x) - 1
+
+    def lookup(self, x):
+        i = self.segment(x)
+        return self.sets[i] if i >= 0 else NO_RULES
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class VariantEffectivity:
+    """The compiled effectivity rules and configuration items of one variant."""
+
+    def __init__(self, variant, rules, serial_ranges, date_ranges, items):
+        self.variant = variant
+        self.rules = rules
+        self.serials = RangeIndex(serial_ranges)
+        self.dates = RangeIndex(date_ranges)
+        constrained_serial = {rule_id for _first, _last, rule_id in serial_ranges}
+        constrained_date = {rule_id for _first, _last, rule_id in date_ranges}
+        self.any_serial = frozenset(r for r in rules if r not in constrained_serial)
+        self.any_date = frozenset(r for r in rules if r not in constrained_date)
+        self.unconditional_items = tuple(sorted(items.get(None, ())))
+        self.rule_items = {r: rules[r].configuration_items + tuple(items.get(r, ())) for r in rules}
+
+    def on(self, date):
+        """Return a DatedEffectivity resolving serials against the rules in force on date (an ordinal)."""
+        return DatedEffectivity(self, self.dates.lookup(date) | self.any_date)
+
+
+class DatedEffectivity:
+    """One variant's rules filtered to a date; resolve() costs one bisect per serial."""
+
+    def __init__(self, variant, in_force):
+        self.variant = variant
+        everywhere = variant.any_serial & in_force
+        filtered = {}
+        self.segments = []
+        for rules in variant.serials.sets:
+            key = id(rules)
+            if key not in filtered:
+                filtered[key] = self.split(rules & in_force | everywhere)
+            self.segments.append(filtered[key])
+        self.before_first = self.split(everywhere)
+        self.resolved = {}
+
+    def split(self, rule_ids):
+        """Return (Resolution of the unconditional rules, modification-dependent rules, their mods)."""
+        rules = self.variant.rules
+        plain = [r for r in rule_ids if rules[r].modification is None]
+        conditional = tuple(sorted(r for r in rule_ids if rules[r].modification is not None))
+        return self.build(self.variant.unconditional_items, plain), conditional, \
+            frozenset(rules[r].modification for r in conditional)
+
+    def resolve(self, serial, modifications=frozenset()):
+        """Return the Resolution for one serial; modifications are the mods it has incorporated.
+
+        Serials in the same segment whose incorporated mods agree on the mods
+        that segment's rules name share one cached result.
+        """
+        i = self.variant.serials.segment(serial)
+        segment = self.segments[i] if i >= 0 else self.before_first
+        base, conditional, mods = segment
+        if not conditional:
+            return base
+        key = (id(segment), mods.intersection(modifications))
+        resolution = self.resolved.get(key)
+        if resolution is None:
+            rules = self.variant.rules
+            matched = [r for r in conditional if (rules[r].modification in key[1]) == rules[r].incorporated]
+            resolution = self.resolved[key] = self.build(base.configuration_items, matched, base) if matched else base
+        return resolution
+
+    def build(self, items, rule_ids, base=None):
+        """Return the Resolution of rule_ids on top of base (or of items alone)."""
+        cis = set(items)
+        cis.update(*map(self.variant.rule_items.__getitem__, rule_ids))
+        sbs = set(base.service_bulletins) if base else set()
+        sbs.update(*(self.variant.rules[r].service_bulletins for r in rule_ids))
+        rules = sorted(base.rules + tuple(rule_ids)) if base else sorted(rule_ids)
+        return Resolution(tuple(rules), tuple(sorted(cis)), tuple(sorted(sbs)))
+
+
+def compile_variant(variant, document, baseline, where, types):
+    """Compile one variant's rules document; return (VariantEffectivity, problems).
+
+    types maps each effectivity type to the fields its rules may have
+    (rule_fields()); a rule with any other field, or a field of the wrong
+    type, is rejected rather than compiled without it.
+    """
+    problems = []
+    document = document if isinstance(document, dict) else {}
+    blocks = {}
+    for block, value in (document.get('manufacturing_blocks') or {}).items():
+        try:
+            blocks[str(block)] = parse_serial_ranges(value)
+        except ValueError as e:
+            problems.append(f'{where}: manufacturing block {block}: {e}')
+
+    rules, serial_ranges, date_ranges = {}, [], []
+    for i, entry in enumerate(document.get('effectivity_rules') or [], start=1):
+        if not isinstance(entry, dict):
+            problems.append(f'{where}: effectivity_rules[{i}]: expected a mapping')
+            continue
+        rule_id = str(entry.get('rule_id') or '').strip()
+        rule_type = str(entry.get('type') or '').strip().upper()
+        label = f'{where}: {rule_id or f"effectivity_rules[{i}]"}'
+        if not rule_id:
+            problems.append(f'{label}: missing rule_id')
+            continue
+        if rule_id in rules:
+            problems.append(f'{label}: duplicate rule_id')
+            continue
+        if rule_type not in types or rule_type not in TYPE_FIELDS:
+            problems.append(f'{label}: unknown effectivity type "{rule_type}"')
+            continue
+        needed = TYPE_FIELDS[rule_type]
+        if needed and entry.get(needed) in (None, '', []):
+            problems.append(f'{label}: {rule_type} rule needs {needed}')
+            continue
+        wrong = field_problems(entry, types[rule_type])
+        if wrong:
+            problems.extend(f'{label}: {problem}' for problem in wrong)
+            continue
+        try:
+            if rule_type == SERIAL_NUMBER:
+                serial_ranges.extend((lo, hi, rule_id) for lo, hi in parse_serial_ranges(entry['serials']))
+            elif rule_type == MANUFACTURING_BLOCK:
+                for block in id_list(entry['blocks']):
+                    if block not in blocks:
+                        raise ValueError(f'unknown manufacturing block "{block}"')
+                    serial_ranges.extend((lo, hi, rule_id) for lo, hi in blocks[block])
+            if entry.get('from_date') is not None or entry.get('to_date') is not None:
+                first = parse_date(entry['from_date']) if entry.get('from_date') is not None else -OPEN_END
+                last = parse_date(entry['to_date']) if entry.get('to_date') is not None else OPEN_END
+                if last < first:
+                    raise ValueError('to_date is before from_date')
+                date_ranges.append((first, last, rule_id))
+        except ValueError as e:
+            problems.append(f'{label}: {e}')
+            serial_ranges = [r for r in serial_ranges if r[2] != rule_id]
+            continue
+        applies_to = entry.get('applies_to') or {}
+        modification = str(entry.get('modification') or '').strip() or None
+        rules[rule_id] = Rule(rule_id, rule_type, modification if rule_type == MODIFICATION_STATUS else None,
+                              entry.get('incorporated', True) is not False,
+                              tuple(id_list(applies_to.get('configuration_items'))),
+                              tuple(id_list(applies_to.get('service_bulletins'))))
+
+    items = {}
+    baseline = baseline if isinstance(baseline, dict) else {}
+    for ci in baseline.get('configuration_items') or []:
+        if not isinstance(ci, dict) or not str(ci.get('ci_id') or '').strip():
+            continue
+        ci_id = str(ci['ci_id']).strip()
+        named = id_list(ci.get('effectivity'))
+        for rule_id in named:
+            if rule_id not in rules:
+                problems.append(f'{where}: configuration item {ci_id} names unknown effectivity rule "{rule_id}"')
+        for rule_id in named or [None]:
+            items.setdefault(rule_id, set()).add(ci_id)
+    return VariantEffectivity(variant, rules, serial_ranges, date_ranges, items), problems
+
+
+def variant_name(rel):
+    """'FAMILY/VARIANT' for a repo-relative path under 04_PRODUCTS/<FAMILY>/variants/<VARIANT>/."""
+    parts = rel.split('/')
+    if len(parts) > 4 and parts[0] == '04_PRODUCTS' and parts[2] == 'variants':
+        return f'{parts[1]}/{parts[3]}'
+    return None
+
+
+class EffectivityIndex:
+    """Compiled effectivity of every variant in the tree."""
+
+    def __init__(self, root=REPO_ROOT):
+        self.root = root
+        self.variants = {}
+        self.problems = []
+        types = rule_fields()
+        for dirpath, _dirnames, filenames in walk_repo(os.path.join(root, '04_PRODUCTS')):
+            if RULES_FILE not in filenames:
+                continue
+            rules_path = os.path.join(dirpath, RULES_FILE)
+            rel = relpath(rules_path, root)
+            variant = variant_name(rel)
+            if variant is None:
+                continue
+            try:
+                document = load_yaml(rules_path)
+                baseline_path = os.path.join(dirpath, BASELINE_FILE)
+                baseline = load_yaml(baseline_path) if os.path.isfile(baseline_path) else None
+            except YamlLoadError as e:
+                self.problems.append(str(e))
+                continue
+            self.variants[variant], problems = compile_variant(variant, document, baseline, rel, types)
+            self.problems.extend(problems)
+
+    def resolve(self, queries, date):
+        """Yield (query, Resolution or None) for (variant, serial, modifications) queries on one date.
+
+        The date filter is applied once per variant; None means the variant
+        has no effectivity rules.
+        """
+        ordinal = parse_date(date)
+        dated = {}
+        for query in queries:
+            variant, serial, modifications = query
+            view = dated.get(variant)
+            if view is None and variant in self.variants:
+                view = dated[variant] = self.variants[variant].on(ordinal)
+            yield query, view.resolve(serial, modifications) if view is not None else None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+fileio.py — AEROSPACEMODEL file helpers
+Path: 02_LIFECYCLE_OS/lib/fileio.py
+Authority: ASIT
+
+Atomic writes, no-clobber file creation and cheap change signatures shared
+by the automation scripts.
+"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+
+from instrumentation import WRITE, phase, record_file
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CACHE_DIR = os.path.join(REPO_ROOT, '.aerospacemodel_cache')
+
+# Read once at import: os.umask() can only be queried by setting it, which
+# is not safe while atomic_open() or create_file() runs in several threads.
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode='w'):
+    """Open a temp file next to path and rename it over path once the block succeeds."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with phase(WRITE, path), os.fdopen(fd, mode, **({} if 'b' in mode else {'encoding': 'utf-8', 'newline': ''})) as f:
+            yield f
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp, 0o666 & ~UMASK)
+        record_file(path, bytes_written=os.path.getsize(tmp))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def atomic_write(path, data):
+    """Write str or bytes to path via a temp file and rename, so readers never see a partial file."""
+    with atomic_open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+
+
+def create_file(path, data):
+    """Create path with data unless it already exists; return True when it was created.
+
+    The content is written to a temp file and hard-linked into place, so an
+    existing file is never overwritten and a partial file is never visible.
+    Safe to call from several threads; callers time the batch as one write
+    phase, since instrumentation phases are per process.
+    """
+    if os.path.lexists(path):
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w',
+                       **({} if isinstance(data, bytes) else {'encoding': 'utf-8', 'newline': ''})) as f:
+            f.write(data)
+        os.chmod(tmp, 0o666 & ~UMASK)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            return False
+        record_file(path, bytes_written=os.path.getsize(path))
+        return True
+    finally:
+        os.unlink(tmp)
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) for path, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def content_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def relpath(path, root=REPO_ROOT):
+    return os.path.relpath(path, root).replace(os.sep, '/')
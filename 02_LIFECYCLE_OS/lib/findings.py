@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+findings.py — AEROSPACEMODEL structured validation findings
+Path: 02_LIFECYCLE_OS/lib/findings.py
+Authority: ASIT
+
+Validators yield Finding records as they parse instead of accumulating
+error strings. FindingReporter streams them to stdout as they arrive —
+either as the classic indented text lines or as JSON Lines — stops printing
+once --max-errors findings have been emitted, and closes with a per-rule
+summary and the verdict. The cap limits output only: later findings are
+still counted, so the summary and the exit code cover the whole run.
+Memory use stays flat however many findings a registry produces.
+"""
+
+import json
+import sys
+import time
+from collections import namedtuple
+
+from instrumentation import count
+
+FLUSH_INTERVAL = 0.5
+
+Finding = namedtuple('Finding', ['file', 'line', 'rule', 'field', 'severity', 'message'])
+
+
+def make_finding(file, line, rule, severity, message, field=None):
+    return Finding(file, line, rule, field, severity, message)
+
+
+def finding_text(finding):
+    """Render a finding in the historical '<file>:<line> <message>' form."""
+    if finding.file is None:
+        return finding.message
+    if finding.line is None:
+        return f'{finding.file}: {finding.message}'
+    return f'{finding.file}:{finding.line} {finding.message}'
+
+
+def finding_dict(finding):
+    return finding._asdict()
+
+
+def add_reporting_arguments(parser):
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='stream findings as indented text (default) or JSON Lines')
+    parser.add_argument('--max-errors', type=int, default=None, metavar='N',
+                        help='print at most N findings; the rest are still counted')
+
+
+class FindingReporter:
+    """Stream findings, enforce the error cap and keep per-rule counts only."""
+
+    def __init__(self, title, fmt='text', max_errors=None, fail_severities=None, show_rule=False, stream=None):
+        self.title = title
+        self.fmt = fmt
+        self.max_errors = max_errors
+        self.fail_severities = fail_severities
+        self.show_rule = show_rule
+        self.stream = stream or sys.stdout
+        self.total = 0
+        self.reported = 0
+        self.failing = 0
+        self.by_rule = {}
+        self.truncated = False
+        self.flushed = 0.0
+
+    def emit(self, finding):
+        """Count one finding and print it unless the cap has been reached; return whether it was printed."""
+        self.total += 1
+        if self.fail_severities is None or finding.severity in self.fail_severities:
+            self.failing += 1
+        key = (finding.rule, finding.severity)
+        self.by_rule[key] = self.by_rule.get(key, 0) + 1
+        if self.max_errors is not None and self.reported >= self.max_errors:
+            self.truncated = True
+            return False
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps(finding_dict(finding)) + '\n')
+        else:
+            if self.reported == 0:
+                self.stream.write(f'{self.title} FINDINGS:\n')
+            label = f'[{finding.severity}] {finding.rule} ' if self.show_rule else ''
+            self.stream.write(f'  {label}{finding_text(finding)}\n')
+        now = time.monotonic()
+        if now - self.flushed >= FLUSH_INTERVAL:
+            self.stream.flush()
+            self.flushed = now
+        self.reported += 1
+        return True
+
+    def consume(self, findings):
+        """Drain a finding iterator; findings past the cap are counted but not printed."""
+        for finding in findings:
+            self.emit(finding)
+        return self.total
+
+    @property
+    def passed(self):
+        return self.failing == 0
+
+    def finish(self):
+        """Print the per-rule summary and return the process exit code."""
+        summary = {f'{rule} {severity}': n for (rule, severity), n in sorted(self.by_rule.items(), key=str)}
+        count('findings', self.total)
+        count('failing_findings', self.failing)
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps({'summary': summary, 'total': self.total, 'reported': self.reported,
+                                          'truncated': self.truncated, 'passed': self.passed}) + '\n')
+        else:
+            if summary:
+                self.stream.write('Summary:\n')
+                for key, n in summary.items():
+                    self.stream.write(f'  {key}: {n}\n')
+            if self.truncated:
+                self.stream.write(f'Printed {self.reported} of {self.total} findings (--max-errors)\n')
+            if self.total == 0:
+                self.stream.write(f'{self.title} PASSED\n')
+            elif self.passed:
+                self.stream.write(f'{self.title} PASSED (with findings)\n')
+            else:
+                self.stream.write(f'{self.title} FAILED ({self.failing} failing finding(s))\n')
+        self.stream.flush()
+        return 0 if self.passed else 1
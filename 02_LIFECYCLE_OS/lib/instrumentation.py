@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+instrumentation.py — AEROSPACEMODEL run metrics and profiling
+Path: 02_LIFECYCLE_OS/lib/instrumentation.py
+Authority: ASIT
+
+Scripts call start_metrics() after parsing their arguments. When --metrics
+or --profile is given, the run's wall time is split into exclusive phases —
+walk (repo_walk), parse (records, yaml_loader, registry snapshot), write
+(fileio.atomic_open) and the script's own default phase (validate for the
+validators) — and every file read or written is counted in rows and bytes.
+--profile adds a cProfile capture (cpu), tracemalloc allocation sites
+(memory) or both (all).
+
+The metrics are written as JSON when the process exits, to
+10_REPORTING/operations/metrics/<tool>.json unless --metrics names a path;
+run_pipeline.py flushes them after each in-process stage. Without either
+option no Metrics object exists and the library hooks below return their
+input or a shared null context, so an uninstrumented run pays one global
+lookup per file.
+"""
+
+import atexit
+import contextlib
+import datetime
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+METRICS_DIR = os.path.join(REPO_ROOT, '10_REPORTING', 'operations', 'metrics')
+METRICS_VERSION = 1
+
+WALK, PARSE, VALIDATE, WRITE = 'walk', 'parse', 'validate', 'write'
+PROFILE_MODES = {'cpu': ('cpu',), 'memory': ('memory',), 'all': ('cpu', 'memory')}
+PROFILE_TOP = 25
+
+NULL_PHASE = contextlib.nullcontext()
+
+_active = None
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics', nargs='?', const='', default=None, metavar='PATH',
+                        help='write phase timings and per-file counts as JSON '
+                             '(default path: 10_REPORTING/operations/metrics/<tool>.json)')
+    parser.add_argument('--profile', nargs='?', const='cpu', default=None, choices=sorted(PROFILE_MODES),
+                        help='also capture a cProfile (cpu, the default), tracemalloc allocation sites (memory) or both')
+
+
+class Metrics:
+    """Exclusive phase timers, per-file counts and counters for one run of one tool."""
+
+    def __init__(self, tool, path, default_phase=VALIDATE, profile=None):
+        self.tool = tool
+        self.path = path
+        self.default_phase = default_phase
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.phases = {default_phase: [0.0, 1]}
+        self.stack = [default_phase]
+        self.files = {}
+        self.counters = {}
+        self.profiler = None
+        self.memory = False
+        for mode in PROFILE_MODES.get(profile, ()):
+            if mode == 'cpu':
+                import cProfile
+                self.profiler = cProfile.Profile()
+            else:
+                import tracemalloc
+                tracemalloc.start()
+                self.memory = True
+        self.cpu_start = time.process_time()
+        self.start = self.mark = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def _switch(self):
+        now = time.perf_counter()
+        self.phases[self.stack[-1]][0] += now - self.mark
+        self.mark = now
+        return now
+
+    def enter(self, phase):
+        """Start charging time to phase; return the start time."""
+        now = self._switch()
+        self.stack.append(phase)
+        entry = self.phases.setdefault(phase, [0.0, 0])
+        entry[1] += 1
+        return now
+
+    def leave(self, filepath=None, started=None):
+        """Stop charging the current phase, crediting the span to filepath when given."""
+        now = self._switch()
+        phase = self.stack.pop()
+        if filepath is not None:
+            entry = self.file(filepath)
+            key = f'{phase}_seconds'
+            entry[key] = entry.get(key, 0.0) + now - started
+
+    def file(self, filepath):
+        key = display_path(filepath)
+        entry = self.files.get(key)
+        if entry is None:
+            entry = self.files[key] = {}
+        return entry
+
+    def finish(self):
+        """Stop timers and profilers; return the metrics document."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        while len(self.stack) > 1:
+            self.leave()
+        self._switch()
+        wall = time.perf_counter() - self.start
+        document = {
+            'version': METRICS_VERSION,
+            'tool': self.tool,
+            'started': self.started.isoformat(timespec='seconds'),
+            'argv': sys.argv[1:],
+            'python': sys.version.split()[0],
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(time.process_time() - self.cpu_start, 6),
+            'peak_rss_kb': peak_rss_kb(),
+            'phases': {phase: {'seconds': round(seconds, 6), 'entries': entries}
+                       for phase, (seconds, entries) in self.phases.items()},
+            'counters': dict(sorted(self.counters.items())),
+            'totals': {'files': len(self.files),
+                       'rows': sum(f.get('rows', 0) for f in self.files.values()),
+                       'bytes_read': sum(f.get('bytes_read', 0) for f in self.files.values()),
+                       'bytes_written': sum(f.get('bytes_written', 0) for f in self.files.values())},
+            'files': {path: {k: round(v, 6) if isinstance(v, float) else v for k, v in sorted(entry.items())}
+                      for path, entry in sorted(self.files.items())},
+        }
+        profile = {}
+        if self.profiler is not None:
+            profile['cpu'] = cpu_profile(self.profiler, self.path)
+        if self.memory:
+            profile['memory'] = memory_profile()
+        if profile:
+            document['profile'] = profile
+        return document
+
+
+def display_path(path):
+    """Repo-relative form of paths inside the repository; others unchanged."""
+    if os.path.isabs(path) and path.startswith(REPO_ROOT + os.sep):
+        return os.path.relpath(path, REPO_ROOT)
+    return path
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def cpu_profile(profiler, metrics_path):
+    """Dump the raw cProfile stats next to the metrics file; return the top functions by cumulative time."""
+    import pstats
+    stats_path = os.path.splitext(metrics_path)[0] + '.prof'
+    os.makedirs(os.path.dirname(os.path.abspath(stats_path)), exist_ok=True)
+    profiler.dump_stats(stats_path)
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_cc, calls, tottime, cumtime, _callers) in stats.stats.items():
+        rows.append({'function': f'{display_path(filename)}:{line}({name})', 'calls': calls, 'tottime': round(tottime, 6), 'cumtime': round(cumtime, 6)})
+    rows.sort(key=lambda r: r['cumtime'], reverse=True)
+    return {'stats_file': display_path(stats_path), 'top': rows[:PROFILE_TOP]}
+
+
+def memory_profile():
+    import tracemalloc
+    _current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    top = []
+    for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+        frame = stat.traceback[0]
+        top.append({'location': f'{display_path(frame.filename)}:{frame.lineno}', 'bytes': stat.size, 'blocks': stat.count})
+    return {'peak_traced_bytes': peak, 'top': top}
+
+
+def start_metrics(tool, args, phase=VALIDATE):
+    """Begin instrumenting this run when args asks for metrics or a profile; return the Metrics or None."""
+    global _active
+    metrics_path = getattr(args, 'metrics', None)
+    profile = getattr(args, 'profile', None)
+    if metrics_path is None and profile is None:
+        _active = None
+        return None
+    path = metrics_path or os.path.join(METRICS_DIR, f'{tool}.json')
+    _active = Metrics(tool, os.path.abspath(path), phase, profile)
+    atexit.register(_finish_at_exit, _active)
+    return _active
+
+
+def finish_metrics():
+    """Write the active run's metrics and stop instrumenting; return the path written or None."""
+    global _active
+    metrics, _active = _active, None
+    if metrics is None:
+        return None
+    from fileio import atomic_write
+    document = metrics.finish()
+    atomic_write(metrics.path, json.dumps(document, indent=2) + '\n')
+    return metrics.path
+
+
+def reset_metrics():
+    """Drop any active metrics without writing them, e.g. in a forked worker."""
+    global _active
+    _active = None
+
+
+def _finish_at_exit(metrics):
+    if _active is metrics:
+        finish_metrics()
+
+
+# -- library hooks ------------------------------------------------------------
+
+class _Phase:
+    __slots__ = ('metrics', 'name', 'filepath', 'started')
+
+    def __init__(self, metrics, name, filepath):
+        self.metrics = metrics
+        self.name = name
+        self.filepath = filepath
+
+    def __enter__(self):
+        self.started = self.metrics.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.leave(self.filepath, self.started)
+        return False
+
+
+def phase(name, filepath=None):
+    """Context manager charging its block to phase name (and to filepath); a no-op when off."""
+    if _active is None:
+        return NULL_PHASE
+    return _Phase(_active, name, filepath)
+
+
+def timed(name, iterable, filepath=None):
+    """Iterate iterable, charging the time spent producing each item (not consuming it) to phase name.
+
+    Returns iterable itself when instrumentation is off.
+    """
+    if _active is None:
+        return iterable
+    return _timed(_active, name, iter(iterable), filepath)
+
+
+def _timed(metrics, name, iterator, filepath):
+    while True:
+        started = metrics.enter(name)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            metrics.leave(filepath, started)
+        yield item
+
+
+def record_file(filepath, **counts):
+    """Add counts such as rows=, bytes_read= or bytes_written= to filepath's entry."""
+    if _active is None:
+        return
+    entry = _active.file(filepath)
+    for key, n in counts.items():
+        entry[key] = entry.get(key, 0) + n
+
+
+def count(name, n=1):
+    """Add n to a named run counter."""
+    if _active is not None:
+        _active.counters[name] = _active.counters.get(name, 0) + n
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+kpi_engine.py — AEROSPACEMODEL incremental quality KPI aggregates
+Path: 02_LIFECYCLE_OS/lib/kpi_engine.py
+Authority: ASIT
+
+Materializes the counts behind the quality metrics of
+03_SHARED_SERVICES/metrics/quality_metrics.csv at four roll-up levels:
+lifecycle phase, variant, product family and portfolio.
+
+  QM-001  KNOTs whose compliance_status is COMPLIANT, of all KNOTs
+  QM-002  KNUs with registered evidence, of all KNUs
+  QM-003  NCRs not CLOSED or REJECTED
+
+A KNOTS.csv or KNU_PLAN.csv rolls up to the variant and phase folder it
+sits in. A KNU has registered evidence when an evidence register row names
+it as knu_ref or registers one of its evidence_refs. NCRs are read from
+audit record YAML (audit_sources.is_audit_source; standalone ncr_id documents and inline nonconformances
+of audit records) and roll up to the record's product/lifecycle_phase, or
+else to the folder the file sits in; a standalone record wins over an
+inline copy of the same NCR.
+
+Each source file's contribution is remembered with its signature.
+refresh() re-reads only files that changed and applies the difference to
+the aggregates: KNOTs by file, KNUs and NCRs by retracting and re-adding
+just the entries a changed file names. The engine is persisted under
+.aerospacemodel_cache so the next process starts warm.
+"""
+
+import os
+import pickle
+import re
+from collections import Counter
+
+from audit_sources import is_audit_source
+from fileio import CACHE_DIR, atomic_write, file_signature, relpath
+from records import split_multi
+from registry_snapshot import Registry
+from repo_walk import walk_repo
+from yaml_loader import YamlLoadError, load_yaml_all
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+ENGINE_PATH = os.path.join(CACHE_DIR, 'kpi_engine.pickle')
+ENGINE_VERSION = 1
+
+PHASE, VARIANT, FAMILY, PORTFOLIO = 'phase', 'variant', 'family', 'portfolio'
+LEVELS = [PHASE, VARIANT, FAMILY, PORTFOLIO]
+
+KNOTS, KNUS, EVIDENCE, NCRS = 'knots', 'knus', 'evidence', 'ncrs'
+SOURCE_NAMES = {'KNOTS.csv': KNOTS, 'KNU_PLAN.csv': KNUS, 'evidence_register.csv': EVIDENCE}
+PHASE_PATTERN = re.compile(r'^(LC\d{2})(?:_|$)')
+
+COMPLIANT = 'COMPLIANT'
+NCR_CLOSED_STATUSES = {'CLOSED', 'REJECTED'}
+
+# metric_id -> (numerator count, denominator count or None for a plain count)
+METRIC_COUNTS = {
+    'QM-001': ('knots_compliant', 'knots'),
+    'QM-002': ('knus_evidenced', 'knus'),
+    'QM-003': ('ncrs_open', None),
+}
+
+
+def source_kind(rel):
+    name = rel.rsplit('/', 1)[-1]
+    if name in SOURCE_NAMES:
+        return SOURCE_NAMES[name]
+    if is_audit_source(rel):
+        return NCRS
+    return None
+
+
+def path_bucket(rel):
+    """Return the (family, variant, phase) a repo-relative path rolls up to; parts may be None."""
+    parts = rel.split('/')
+    family = variant = None
+    if parts[0] == '04_PRODUCTS' and len(parts) > 2:
+        family = parts[1]
+        if parts[2] == 'variants' and len(parts) > 4:
+            variant = parts[3]
+    phase = next((m.group(1) for m in map(PHASE_PATTERN.match, parts[:-1]) if m), None)
+    return family, variant, phase if variant else None
+
+
+def record_bucket(record, default):
+    """Apply a record's own product ('FAMILY' or 'FAMILY/VARIANT') and lifecycle_phase over default."""
+    family, variant, phase = default
+    product = str(record.get('product') or '').strip()
+    if product:
+        family, _sep, variant = product.partition('/')
+        variant = variant or None
+    value = str(record.get('lifecycle_phase') or record.get('phase') or '').strip().upper()
+    if PHASE_PATTERN.match(value):
+        phase = value[:4]
+    return family, variant, phase if variant else None
+
+
+def rollup_keys(bucket):
+    family, variant, phase = bucket
+    keys = [(PORTFOLIO, ())]
+    if family:
+        keys.append((FAMILY, (family,)))
+        if variant:
+            keys.append((VARIANT, (family, variant)))
+            if phase:
+                keys.append((PHASE, (family, variant, phase)))
+    return keys
+
+
+def adjust(counter, key, n):
+    value = counter.get(key, 0) + n
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+def adjust_nested(index, outer, inner, n):
+    counts = index.setdefault(outer, {})
+    adjust(counts, inner, n)
+    if not counts:
+        del index[outer]
+
+
+def entries(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def ncr_status(record):
+    return str(record.get('status') or '').strip().upper() or 'OPEN'
+
+
+def read_ncrs(rel, filepath, bucket):
+    """Return [(key, status, bucket, standalone)] for the NCRs in one audit YAML."""
+    try:
+        documents = [d for d in load_yaml_all(filepath, cache=False) if d is not None]
+    except (YamlLoadError, OSError):
+        return []
+    found = []
+    for document in documents:
+        for record in entries(document):
+            if not isinstance(record, dict):
+                continue
+            if record.get('audit_id'):
+                audit_bucket = record_bucket(record, bucket)
+                found.extend((entry, audit_bucket, False) for entry in entries(record.get('nonconformances'))
+                             if isinstance(entry, dict))
+            elif record.get('ncr_id'):
+                found.append((record, bucket, True))
+    return [(str(record.get('ncr_id') or '').strip() or f'{rel}#{i}', ncr_status(record),
+             record_bucket(record, default), standalone)
+            for i, (record, default, standalone) in enumerate(found)]
+
+
+def metric_values(counts):
+    """Return {metric_id: value} for one aggregate; a rate with nothing to count is None."""
+    values = {}
+    for metric_id, (numerator, denominator) in METRIC_COUNTS.items():
+        if denominator is None:
+            values[metric_id] = counts.get(numerator, 0)
+        else:
+            total = counts.get(denominator, 0)
+            values[metric_id] = round(100.0 * counts.get(numerator, 0) / total, 1) if total else None
+    return values
+
+
+class KpiEngine:
+    """Per-file KPI contributions and the aggregates they materialize at every roll-up level."""
+
+    def __init__(self, root=REPO_ROOT):
+        self.version = ENGINE_VERSION
+        self.root = root
+        self.sources = {}
+        self.levels = {level: {} for level in LEVELS}
+        # Plain dicts of counts rather than Counters: these hold an entry per
+        # KNU and OID, and Counters are several times slower to pickle.
+        self.knu_rows = {}        # knu_id -> {bucket: rows}
+        self.knu_oids = {}        # knu_id -> {oid: refs}
+        self.oid_knus = {}        # oid -> {knu_id: refs}
+        self.registered = {}      # oid -> evidence register rows
+        self.register_knus = {}   # knu_id -> evidence register rows naming it
+        self.ncr_records = {}     # ncr key -> {rel: (status, bucket, standalone)}
+        self.dirty = False
+
+    # -- reading -------------------------------------------------------------
+
+    def discover(self):
+        found = {}
+        for dirpath, _dirnames, filenames in walk_repo(self.root):
+            for f in filenames:
+                filepath = os.path.join(dirpath, f)
+                rel = relpath(filepath, self.root)
+                if source_kind(rel):
+                    found[rel] = filepath
+        return found
+
+    def read_source(self, rel, filepath, registry):
+        """Return the contribution of one source file."""
+        kind = source_kind(rel)
+        bucket = path_bucket(rel)
+        if kind == KNOTS:
+            counts = Counter(files=1)
+            for _line, knot_id, status in registry.select(filepath, ['knot_id', 'compliance_status']):
+                if (knot_id or '').strip():
+                    counts['knots'] += 1
+                    counts['knots_compliant'] += (status or '').strip() == COMPLIANT
+            return {'kind': kind, 'bucket': bucket, 'counts': counts}
+        if kind == KNUS:
+            knus = {}
+            for _line, knu_id, refs in registry.select(filepath, ['knu_id', 'evidence_refs']):
+                knu_id = (knu_id or '').strip()
+                if knu_id:
+                    rows, oids = knus.setdefault(knu_id, [0, []])
+                    knus[knu_id][0] = rows + 1
+                    oids.extend(split_multi(refs))
+            return {'kind': kind, 'bucket': bucket, 'counts': Counter(files=1), 'knus': knus}
+        if kind == EVIDENCE:
+            oids, knus = [], []
+            for _line, oid, knu_ref in registry.select(filepath, ['oid', 'knu_ref']):
+                if (oid or '').strip():
+                    oids.append(oid.strip())
+                knus.extend(split_multi(knu_ref))
+            return {'kind': kind, 'oids': oids, 'knus': knus}
+        return {'kind': kind, 'ncrs': read_ncrs(rel, filepath, bucket)}
+
+    # -- aggregates ----------------------------------------------------------
+
+    def add_counts(self, bucket, counts, sign=1):
+        for level, key in rollup_keys(bucket):
+            aggregate = self.levels[level].setdefault(key, Counter())
+            for name, n in counts.items():
+                adjust(aggregate, name, sign * n)
+            if not aggregate:
+                del self.levels[level][key]
+
+    def knu_evidenced(self, knu_id):
+        if self.register_knus.get(knu_id):
+            return True
+        return any(oid in self.registered for oid in self.knu_oids.get(knu_id, ()))
+
+    def add_knu(self, knu_id, sign):
+        evidenced = self.knu_evidenced(knu_id)
+        for bucket, rows in self.knu_rows.get(knu_id, {}).items():
+            self.add_counts(bucket, {'knus': rows, 'knus_evidenced': rows if evidenced else 0}, sign)
+
+    def add_ncr(self, key, sign):
+        records = self.ncr_records.get(key)
+        if not records:
+            return
+        rel = min(records, key=lambda r: (not records[r][2], r))
+        status, bucket, _standalone = records[rel]
+        self.add_counts(bucket, {'ncrs': 1, 'ncrs_open': int(status not in NCR_CLOSED_STATUSES)}, sign)
+
+    def affected(self, contribution):
+        """Return the (KNU IDs, NCR keys) whose aggregate contribution a source can alter."""
+        kind = contribution['kind']
+        if kind == KNUS:
+            return set(contribution['knus']), set()
+        if kind == EVIDENCE:
+            knus = set(contribution['knus'])
+            for oid in contribution['oids']:
+                knus.update(self.oid_knus.get(oid, ()))
+            return knus, set()
+        if kind == NCRS:
+            return set(), {ncr[0] for ncr in contribution['ncrs']}
+        return set(), set()
+
+    def index(self, rel, contribution, sign):
+        """Add (sign=1) or remove (sign=-1) one source's entries in the shared indices."""
+        kind = contribution['kind']
+        if 'counts' in contribution:
+            self.add_counts(contribution['bucket'], contribution['counts'], sign)
+        if kind == KNUS:
+            for knu_id, (rows, oids) in contribution['knus'].items():
+                adjust_nested(self.knu_rows, knu_id, contribution['bucket'], sign * rows)
+                for oid in oids:
+                    adjust_nested(self.knu_oids, knu_id, oid, sign)
+                    adjust_nested(self.oid_knus, oid, knu_id, sign)
+        elif kind == EVIDENCE:
+            for oid in contribution['oids']:
+                adjust(self.registered, oid, sign)
+            for knu_id in contribution['knus']:
+                adjust(self.register_knus, knu_id, sign)
+        elif kind == NCRS:
+            for key, status, bucket, standalone in contribution['ncrs']:
+                records = self.ncr_records.setdefault(key, {})
+                if sign > 0:
+                    records.setdefault(rel, (status, bucket, standalone))
+                else:
+                    records.pop(rel, None)
+                if not records:
+                    del self.ncr_records[key]
+
+    def refresh(self, paths=None, registry=None):
+        """Bring the aggregates in line with the tree; return the number of files re-read.
+
+        With paths, only those files are examined (and re-read even when their
+        signature looks unchanged); otherwise the tree is walked and every
+        source whose signature changed is re-read.
+        """
+        own_registry = registry is None
+        registry = registry or Registry(self.root)
+        if paths is None:
+            found = self.discover()
+            candidates = set(found) | set(self.sources)
+        else:
+            candidates = {relpath(os.path.abspath(p), self.root) for p in paths}
+            candidates = {rel for rel in candidates if source_kind(rel) and not rel.startswith('../')}
+            found = {rel: os.path.join(self.root, rel) for rel in candidates
+                     if os.path.isfile(os.path.join(self.root, rel))}
+
+        changes = []
+        for rel in sorted(candidates):
+            filepath = found.get(rel)
+            previous = self.sources.get(rel)
+            sig = file_signature(filepath) if filepath else None
+            if previous is not None and previous['signature'] == sig and paths is None:
+                continue
+            if previous is None and filepath is None:
+                continue
+            new = self.read_source(rel, filepath, registry) if filepath else None
+            changes.append((rel, sig, previous, new))
+        if own_registry:
+            registry.close()
+        if not changes:
+            return 0
+
+        knus, ncrs = set(), set()
+        for _rel, _sig, previous, new in changes:
+            for contribution in (previous, new):
+                if contribution is not None:
+                    more_knus, more_ncrs = self.affected(contribution)
+                    knus |= more_knus
+                    ncrs |= more_ncrs
+        for knu_id in knus:
+            self.add_knu(knu_id, -1)
+        for key in ncrs:
+            self.add_ncr(key, -1)
+        for rel, sig, previous, new in changes:
+            if previous is not None:
+                self.index(rel, previous, -1)
+                del self.sources[rel]
+            if new is not None:
+                new['signature'] = sig
+                self.index(rel, new, 1)
+                self.sources[rel] = new
+        for knu_id in knus:
+            self.add_knu(knu_id, 1)
+        for key in ncrs:
+            self.add_ncr(key, 1)
+        self.dirty = True
+        return len(changes)
+
+    # -- queries -------------------------------------------------------------
+
+    def counts(self, level, key=()):
+        return Counter(self.levels[level].get(tuple(key), ()))
+
+    def metrics(self, level, key=()):
+        return metric_values(self.levels[level].get(tuple(key), {}))
+
+    def keys(self, level):
+        return sorted(self.levels[level])
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path=ENGINE_PATH):
+        if not self.dirty:
+            return
+        self.dirty = False
+        atomic_write(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_engine(root=REPO_ROOT, path=ENGINE_PATH):
+    """Return the persisted engine, or an empty one when there is none for this root and version.
+
+    Call refresh() on it before use; an empty engine (no sources) needs a
+    whole-tree refresh.
+    """
+    try:
+        with open(path, 'rb') as f:
+            engine = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        engine = None
+    if not isinstance(engine, KpiEngine) or getattr(engine, 'version', None) != ENGINE_VERSION \
+            or engine.root != root:
+        engine = KpiEngine(root)
+    return engine
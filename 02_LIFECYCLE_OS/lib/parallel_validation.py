@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+parallel_validation.py — AEROSPACEMODEL sharded CSV validation
+Path: 02_LIFECYCLE_OS/lib/parallel_validation.py
+Authority: ASIT
+
+Runs a validator's per-file check over a process pool. The cache misses
+of a run are cut into shards of roughly equal size: whole files, and for a
+file much larger than a shard, byte ranges that start and end on record
+boundaries (records.iter_batches(span=...)). Workers return each shard's
+findings and facts; the parent stitches the shards of a file back
+together, shifting line numbers by the rows of the shards before it, and
+yields files in discovery order, so the output is identical to a serial
+run's. Trees whose uncached input is below MIN_POOL_BYTES, and runs with
+one worker, are checked serially in-process.
+"""
+
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from validation_cache import cached_findings, replay, stored_findings
+
+MIN_POOL_BYTES = 4 << 20
+MIN_SHARD_BYTES = 1 << 20
+SHARDS_PER_WORKER = 4
+
+
+def add_worker_arguments(parser):
+    parser.add_argument('--workers', type=int, default=None,
+                        help='checker processes (default: CPU count; 1 checks serially)')
+
+
+def file_size(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+def csv_spans(filepath, shard_bytes):
+    """Split the data rows of a CSV into (start, end) byte ranges of about shard_bytes.
+
+    Cuts fall after a newline preceded by an even number of quote
+    characters, i.e. outside any quoted field. A file too small to split,
+    or with unbalanced quotes, is one [None] span: the whole file.
+    """
+    size = file_size(filepath)
+    if size < 2 * shard_bytes:
+        return [None]
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position, quotes = 0, 0
+
+        def record_end(target):
+            nonlocal position, quotes
+            cut = data.find(b'\n', target)
+            while cut != -1:
+                quotes += data[position:cut].count(b'"')
+                position = cut
+                if quotes % 2 == 0:
+                    return cut + 1
+                cut = data.find(b'\n', cut + 1)
+            return -1
+
+        start = record_end(0)
+        if start == -1:
+            return [None]
+        spans = []
+        while start + shard_bytes < size:
+            end = record_end(start + shard_bytes)
+            if end == -1 or end >= size:
+                break
+            spans.append((start, end))
+            start = end
+        if (quotes + data[position:].count(b'"')) % 2:
+            return [None]
+    spans.append((start, size))
+    return spans if len(spans) > 1 else [None]
+
+
+def run_shard(task):
+    """Pool worker: return (findings, facts) of check(filepath, span)."""
+    check, filepath, span = task
+    findings = []
+    checked = check(filepath, span)
+    while True:
+        try:
+            findings.append(next(checked))
+        except StopIteration as stop:
+            return findings, stop.value
+
+
+def merge_facts(facts, part):
+    """Combine the facts of consecutive shards: counts add up, lists concatenate, anything else keeps the first."""
+    return {key: value + part.get(key, type(value)()) if isinstance(value, (int, list)) else value
+            for key, value in facts.items()}
+
+
+def merge_shards(results):
+    """Yield the findings of one file's shard results in order and return the merged facts.
+
+    Each shard numbers its rows from line 2; its findings move down by the
+    'rows' fact of every shard before it.
+    """
+    offset = 0
+    facts = None
+    for findings, part in results:
+        for finding in findings:
+            yield finding._replace(line=finding.line + offset) if offset and finding.line is not None else finding
+        offset += (part or {}).get('rows', 0)
+        facts = part if facts is None else merge_facts(facts, part or {})
+    return facts
+
+
+def sharded_findings(check, files, cache=None, workers=None):
+    """Yield the findings of check over files, in file order, through cache.
+
+    check(filepath, span=None) is a generator function yielding Findings
+    and returning the file's facts, which must include its 'rows' count.
+    """
+    files = list(files)
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1:
+        for filepath in files:
+            yield from cached_findings(cache, filepath, check)
+        return
+
+    entries = [cache.lookup(filepath) if cache is not None else None for filepath in files]
+    misses = [filepath for filepath, entry in zip(files, entries) if entry is None]
+    total = sum(map(file_size, misses))
+    spans = {}
+    if total >= MIN_POOL_BYTES:
+        shard_bytes = max(MIN_SHARD_BYTES, total // (workers * SHARDS_PER_WORKER))
+        spans = {filepath: csv_spans(filepath, shard_bytes) for filepath in misses}
+    tasks = [(check, filepath, span) for filepath in misses for span in spans.get(filepath, ())]
+
+    pool = None
+    if len(tasks) > 1:
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            context = None
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context)
+    try:
+        results = pool.map(run_shard, tasks) if pool is not None else None
+        for filepath, entry in zip(files, entries):
+            if entry is not None:
+                yield from replay(entry)
+                continue
+            if results is not None:
+                findings = merge_shards([next(results) for _span in spans[filepath]])
+            else:
+                findings = check(filepath)
+            if cache is not None:
+                findings = stored_findings(cache, filepath, findings)
+            yield from findings
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
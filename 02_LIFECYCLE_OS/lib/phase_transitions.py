@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+phase_transitions.py — AEROSPACEMODEL compiled lifecycle transition tables
+Path: 02_LIFECYCLE_OS/lib/phase_transitions.py
+Authority: ASIT
+
+Compiles core_models/lifecycle_state_machine.yaml (next/previous moves) and
+schedulers/dependency_rules.yaml (depends_on prerequisites) into bitmask
+tables indexed by phase position: one int per phase for its next,
+previous, allowed (next | previous), direct prerequisites, transitive
+prerequisites and forward reach. A membership test is one AND.
+
+compile_tables() also cross-checks the two files. Disagreements are
+WARNING findings: next/previous lists that do not mirror each other, moves
+that enter a phase before all of its depends_on phases can have been
+completed, and dependencies the state machine never leads along.
+
+The data checks take whole columns of records.RecordTable and evaluate
+each distinct value (or value pair) once against the tables, so a
+portfolio's KNOTs, KNUs and change logs cost one mask lookup per distinct
+phase combination plus a scan for the rows that carry a bad one.
+"""
+
+import os
+
+from fileio import relpath
+from findings import make_finding
+from records import CODED, LC_CANONICAL_PHASES, iter_rows, split_multi
+from yaml_loader import load_yaml
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+STATE_MACHINE = os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'core_models', 'lifecycle_state_machine.yaml')
+DEPENDENCY_RULES = os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'schedulers', 'dependency_rules.yaml')
+
+RULE_MODEL, RULE_ASSIGNMENT, RULE_CHANGE = 'PHASE-MODEL', 'PHASE-ASSIGNMENT', 'PHASE-CHANGE'
+ERROR, WARNING = 'ERROR', 'WARNING'
+
+
+def mask_ids(phases, mask):
+    return [p for i, p in enumerate(phases) if mask >> i & 1]
+
+
+def closure(direct):
+    """Transitive closure of a list of bitmask edge sets, by repeated expansion to a fixed point."""
+    result = list(direct)
+    changed = True
+    while changed:
+        changed = False
+        for i, mask in enumerate(result):
+            expanded = mask
+            bits = mask
+            while bits:
+                low = bits & -bits
+                expanded |= result[low.bit_length() - 1]
+                bits ^= low
+            if expanded != mask:
+                result[i] = expanded
+                changed = True
+    return result
+
+
+class TransitionTables:
+    """Bitmask tables over the lifecycle phases; bit i is phases[i]."""
+
+    def __init__(self, phases):
+        self.phases = phases
+        self.position = {p: i for i, p in enumerate(phases)}
+        size = len(phases)
+        self.next = [0] * size
+        self.previous = [0] * size
+        self.depends = [0] * size
+        self.findings = []
+
+    def bit(self, phase):
+        i = self.position.get(phase)
+        return 0 if i is None else 1 << i
+
+    def mask(self, phases):
+        m = 0
+        for p in phases:
+            m |= self.bit(p)
+        return m
+
+    def ids(self, mask):
+        return mask_ids(self.phases, mask)
+
+    def finish(self):
+        self.allowed = [n | p for n, p in zip(self.next, self.previous)]
+        self.prerequisites = closure(self.depends)
+        self.reach = closure(self.next)
+
+    def can_move(self, source, target):
+        i = self.position.get(source)
+        return i is not None and bool(self.allowed[i] & self.bit(target))
+
+    def missing_prerequisites(self, target, completed):
+        """depends_on phases of target absent from the completed mask."""
+        i = self.position.get(target)
+        return 0 if i is None else self.depends[i] & ~completed
+
+
+def compile_tables(machine_path=STATE_MACHINE, rules_path=DEPENDENCY_RULES, phases_path=LC_CANONICAL_PHASES):
+    """Compile both files into TransitionTables; .findings holds their disagreements."""
+    machine = (load_yaml(machine_path) or {}).get('phases') or []
+    rules = (load_yaml(rules_path) or {}).get('phases') or []
+    phases = [str(p.get('id')) for p in machine]
+    canonical = [row.get('lc_code') for _line, row in iter_rows(phases_path)] if os.path.isfile(phases_path) else []
+    for p in canonical:
+        if p not in phases:
+            phases.append(p)
+    tables = TransitionTables(phases)
+    machine_file, rules_file = relpath(machine_path), relpath(rules_path)
+
+    def problem(path, severity, message):
+        tables.findings.append(make_finding(path, None, RULE_MODEL, severity, message))
+
+    def known(path, owner, values, field):
+        unknown = [v for v in values if v not in tables.position]
+        if unknown:
+            problem(path, ERROR, f'{owner}: unknown phase(s) in {field}: {", ".join(unknown)}')
+        return [v for v in values if v in tables.position]
+
+    declared = set()
+    for entry in machine:
+        phase = str(entry.get('id'))
+        declared.add(phase)
+        i = tables.position[phase]
+        tables.next[i] = tables.mask(known(machine_file, phase, entry.get('next') or [], 'next'))
+        tables.previous[i] = tables.mask(known(machine_file, phase, entry.get('previous') or [], 'previous'))
+    ruled = set()
+    for entry in rules:
+        phase = str(entry.get('id'))
+        if phase not in tables.position:
+            problem(rules_file, ERROR, f'{phase}: not a lifecycle phase')
+            continue
+        ruled.add(phase)
+        tables.depends[tables.position[phase]] = tables.mask(known(rules_file, phase, entry.get('depends_on') or [],
+                                                                   'depends_on'))
+    for phase in phases:
+        if phase not in declared:
+            problem(machine_file, WARNING, f'{phase}: phase has no state machine entry')
+        if phase not in ruled:
+            problem(rules_file, WARNING, f'{phase}: phase has no dependency rule')
+    tables.finish()
+
+    for i, phase in enumerate(phases):
+        bit = 1 << i
+        for target in tables.ids(tables.next[i]):
+            j = tables.position[target]
+            if not tables.previous[j] & bit:
+                problem(machine_file, WARNING, f'{phase} -> {target}: {target} does not list {phase} in previous')
+            # Moving back to a phase already completed is iteration; a forward move
+            # must not enter target before all of its depends_on phases are done.
+            if tables.prerequisites[i] & (1 << j):
+                continue
+            skipped = tables.depends[j] & ~(tables.prerequisites[i] | bit)
+            if skipped:
+                problem(machine_file, WARNING, f'{phase} -> {target}: enters {target} before its prerequisite(s) '
+                                               f'{", ".join(tables.ids(skipped))} ({rules_file})')
+        for source in tables.ids(tables.previous[i]):
+            if not tables.next[tables.position[source]] & bit:
+                problem(machine_file, WARNING, f'{phase} lists previous {source}, but {source} has no next {phase}')
+        for dependency in tables.ids(tables.depends[i]):
+            if not tables.reach[tables.position[dependency]] & bit:
+                problem(rules_file, WARNING, f'{phase} depends on {dependency}, but no next path leads from '
+                                             f'{dependency} to {phase} ({machine_file})')
+    return tables
+
+
+def phase_codes(table, field):
+    """Return (codes, values) of a table column, coding it on the fly when it is not a coded column."""
+    column = table.columns.get(field)
+    if column is None:
+        return [0] * len(table), [None]
+    if column.kind == CODED:
+        return column.codes, column.vocab.values
+    values, codes, lookup = [None], [], {None: 0}
+    for value in column:
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(values)
+            values.append(value)
+        codes.append(code)
+    return codes, values
+
+
+def check_assignment(tables, filepath, table, expected):
+    """Findings for rows whose lifecycle_phase is unknown or differs from the directory phase expected."""
+    codes, values = phase_codes(table, 'lifecycle_phase')
+    bad = {}
+    for code in set(codes):
+        value = (values[code] or '').strip()
+        if value == expected:
+            continue
+        if not value:
+            bad[code] = 'missing lifecycle_phase'
+        elif value not in tables.position:
+            bad[code] = f'unknown lifecycle_phase {value}'
+        else:
+            bad[code] = f'lifecycle_phase {value} filed under {expected}'
+    if not bad:
+        return []
+    return [make_finding(filepath, table.lines[k], RULE_ASSIGNMENT, ERROR, bad[code], 'lifecycle_phase')
+            for k, code in enumerate(codes) if code in bad]
+
+
+def check_knot_refs(tables, filepath, table, knot_phases):
+    """Findings for KNUs whose KNOT belongs to a phase that is neither theirs nor one of its prerequisites.
+
+    knot_phases maps the variant's KNOT IDs to their phase; unknown refs are
+    left to the orphan checks.
+    """
+    phase_col, phase_values = phase_codes(table, 'lifecycle_phase')
+    ref_col, ref_values = phase_codes(table, 'knot_ref')
+    verdicts = {}
+    findings = []
+    for k, pair in enumerate(zip(phase_col, ref_col)):
+        verdict = verdicts.get(pair)
+        if verdict is None:
+            phase = (phase_values[pair[0]] or '').strip()
+            i = tables.position.get(phase)
+            verdict = verdicts[pair] = []
+            if i is not None:
+                allowed = tables.prerequisites[i] | (1 << i)
+                for ref in split_multi(ref_values[pair[1]]):
+                    knot_phase = knot_phases.get(ref)
+                    if knot_phase is not None and not tables.bit(knot_phase) & allowed:
+                        verdict.append(f'knot_ref {ref} belongs to {knot_phase}, which {phase} does not depend on')
+        for message in verdict:
+            findings.append(make_finding(filepath, table.lines[k], RULE_ASSIGNMENT, ERROR, message, 'knot_ref'))
+    return findings
+
+
+def check_change_log(tables, filepath, table):
+    """Findings for the phase changes (from_phase, to_phase) of one variant's change_log.csv, in file order.
+
+    Each change must be an allowed move, start where the previous change
+    ended, and enter a phase only after its depends_on phases were reached;
+    the phase before the first change counts as completed with all of its
+    prerequisites.
+    """
+    from_col, from_values = phase_codes(table, 'from_phase')
+    to_col, to_values = phase_codes(table, 'to_phase')
+    ids = table.columns.get('change_id')
+    moves = {}
+    findings = []
+    current, completed = None, 0
+
+    def problem(k, message, field):
+        change = ids[k] if ids is not None else None
+        findings.append(make_finding(filepath, table.lines[k], RULE_CHANGE, ERROR,
+                                     f'{change}: {message}' if change else message, field))
+
+    for k, pair in enumerate(zip(from_col, to_col)):
+        if pair == (0, 0):
+            continue
+        source, target = (from_values[pair[0]] or '').strip(), (to_values[pair[1]] or '').strip()
+        if not source and not target:
+            continue
+        verdict = moves.get(pair)
+        if verdict is None:
+            verdict = moves[pair] = []
+            for field, value in (('from_phase', source), ('to_phase', target)):
+                if value not in tables.position:
+                    verdict.append((f'unknown {field} {value!r}' if value else f'missing {field}', field))
+            if not verdict and not tables.can_move(source, target):
+                verdict.append((f'{source} -> {target} is not an allowed lifecycle move', 'to_phase'))
+        for message, field in verdict:
+            problem(k, message, field)
+        if source not in tables.position or target not in tables.position:
+            current = None
+            continue
+        if current is None:
+            completed = tables.prerequisites[tables.position[source]] | tables.bit(source)
+        elif source != current:
+            problem(k, f'starts from {source}, but the previous change ended in {current}', 'from_phase')
+        missing = tables.missing_prerequisites(target, completed)
+        if missing:
+            problem(k, f'enters {target} before its prerequisite(s) {", ".join(tables.ids(missing))}', 'to_phase')
+        completed |= tables.bit(target)
+        current = target
+    return findings
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+records.py — AEROSPACEMODEL compact record model for registry CSVs
+Path: 02_LIFECYCLE_OS/lib/records.py
+Authority: ASIT
+
+Shared typed access to KNOTS.csv, KNU_PLAN.csv, evidence_register.csv and
+clause_to_knu_matrix.csv without a dict per row.
+
+iter_rows() streams a file as (line, Row) pairs and iter_batches() as
+blocks of raw value lists for column-wise checks. A Row is a slotted view
+over the csv.reader value list that shares one field -> column index with
+every other row of the file; it answers row[field], row.get(field) and
+`field in row` exactly as a csv.DictReader row would.
+
+RecordTable holds a whole file column-wise. Controlled columns (status,
+compliance_status, lifecycle_phase) are stored as small-integer codes in
+an array against a Vocabulary seeded from CONTROLLED_STATUS_CODES.csv and
+LC_CANONICAL_PHASES.csv; other repetitive columns (refs, owners, dates)
+are dictionary-encoded the same way, and free text is packed into
+zlib-compressed blocks of BLOCK_ROWS values. A dictionary-encoded column
+whose values turn out to be mostly distinct (fewer than SPARSE_REPEATS
+rows per value) is repacked as text while loading, since its vocabulary
+would cost more than the text.
+"""
+
+import csv
+import io
+import os
+import zlib
+from array import array
+from functools import lru_cache
+from itertools import accumulate, chain, islice
+
+from instrumentation import PARSE, phase, record_file, timed
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+REGISTRIES_DIR = os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'registries')
+CONTROLLED_STATUS_CODES = os.path.join(REGISTRIES_DIR, 'CONTROLLED_STATUS_CODES.csv')
+LC_CANONICAL_PHASES = os.path.join(REGISTRIES_DIR, 'LC_CANONICAL_PHASES.csv')
+
+CODED = 'coded'
+PACKED = 'packed'
+LOAD_CHUNK_ROWS = 4096
+BLOCK_ROWS = 4096
+BLOCK_COMPRESSION = 1
+SPARSE_REPEATS = 8
+EXEMPT = 'EXEMPT'
+# Columns that mark a record as explicitly exempted, in is_exempt() order.
+EXEMPTION_FIELDS = ['status', 'compliance_status', 'exemption_ref']
+
+# Columns not listed here are packed text. Controlled columns share the
+# registry vocabularies so their codes are stable across files.
+CONTROLLED_COLUMNS = {
+    'lifecycle_phase': 'lc_code',
+    'status': 'object_status',
+    'compliance_status': 'compliance_status',
+}
+
+CODED_COLUMNS = {
+    'KNOTS.csv': ['obligation_source', 'owner', 'created_date'],
+    'KNU_PLAN.csv': ['knot_ref', 'knu_class', 'owner', 'created_date', 'start_date', 'end_date'],
+    'evidence_register.csv': ['evidence_type', 'knot_ref', 'knu_ref', 'created_date', 'author',
+                              'review_date', 'reviewer', 'signoff_date', 'signoff_authority'],
+    'clause_to_knu_matrix.csv': ['standard', 'knot_ref', 'knu_ref', 'exemption_ref'],
+}
+
+
+class Row:
+    """Read-only mapping view over one csv.reader row."""
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, field):
+        i = self._index[field]
+        values = self._values
+        return values[i] if i < len(values) else None
+
+    def get(self, field, default=None):
+        i = self._index.get(field)
+        if i is None:
+            return default
+        values = self._values
+        return values[i] if i < len(values) else None
+
+    def __contains__(self, field):
+        return field in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def items(self):
+        return ((field, self[field]) for field in self._index)
+
+
+def split_multi(value):
+    """Split a ';'-delimited multi-value cell into stripped, non-empty parts."""
+    return [v.strip() for v in (value or '').split(';') if v.strip()]
+
+
+def is_exempt(status, compliance_status, exemption_ref=None):
+    """True for a record whose status or compliance_status is EXEMPT or that names an exemption_ref.
+
+    brex_engine.py (BREX-008) and detect_orphans.py skip exempted records.
+    """
+    return EXEMPT in ((status or '').strip(), (compliance_status or '').strip()) or bool((exemption_ref or '').strip())
+
+
+def field_index(fieldnames):
+    """Map each header to its column; like DictReader, the last duplicate wins."""
+    return {field: i for i, field in enumerate(fieldnames)}
+
+
+def iter_rows(filepath):
+    """Yield (line, Row) for every data row of a CSV file, numbering from 2."""
+    for index, lines, batch in iter_batches(filepath):
+        for line, values in zip(lines, batch):
+            yield line, Row(index, values)
+
+
+def iter_batches(filepath, size=LOAD_CHUNK_ROWS, span=None):
+    """Yield (index, lines, rows) per batch of up to size data rows.
+
+    index is the file's field -> column map, shared by every batch; rows are
+    the raw csv.reader value lists, numbered in lines as iter_rows() does.
+    span=(start, end) restricts the rows to that byte range of the file,
+    which must begin and end on record boundaries (see
+    parallel_validation.csv_spans); the header still comes from the top of
+    the file and lines are numbered from 2 within the span.
+    """
+    with open(filepath, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        index = field_index(header)
+        if span is None:
+            size_read = os.fstat(f.fileno()).st_size
+        else:
+            with open(filepath, 'rb') as raw:
+                raw.seek(span[0])
+                data = raw.read(span[1] - span[0])
+            size_read = len(data)
+            reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+        rows = filter(None, reader)
+        line = 1
+        try:
+            for batch in timed(PARSE, iter(lambda: list(islice(rows, size)), []), filepath):
+                yield index, range(line + 1, line + 1 + len(batch)), batch
+                line += len(batch)
+        finally:
+            record_file(filepath, rows=line - 1, bytes_read=size_read)
+
+
+def select_rows(filepath, fields):
+    """Yield (line, value, ...) for the named fields of every row; absent fields read as None."""
+    for line, row in iter_rows(filepath):
+        yield (line,) + tuple(row.get(field) for field in fields)
+
+
+class Vocabulary:
+    """Bidirectional value <-> small-integer code table; code 0 is None."""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, seed=()):
+        self.values = [None]
+        self.codes = {None: 0}
+        for value in seed:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+@lru_cache(maxsize=None)
+def controlled_vocabularies(status_path=CONTROLLED_STATUS_CODES, phases_path=LC_CANONICAL_PHASES):
+    """Return {code_type: [values]} from the controlled registries."""
+    vocabularies = {}
+    if os.path.isfile(status_path):
+        for _line, row in iter_rows(status_path):
+            vocabularies.setdefault(row.get('code_type'), []).append(row.get('code'))
+    if os.path.isfile(phases_path):
+        vocabularies['lc_code'] = [row.get('lc_code') for _line, row in iter_rows(phases_path)]
+    return {code_type: tuple(values) for code_type, values in vocabularies.items()}
+
+
+def _widen(numbers, value):
+    """Return numbers, converted to a wider unsigned typecode if value would not fit."""
+    if value < 1 << (8 * numbers.itemsize):
+        return numbers
+    for typecode in ('B', 'H', 'I', 'Q'):
+        if value < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, numbers)
+    raise OverflowError(value)
+
+
+class CodedColumn:
+    """Dictionary-encoded column: one array of codes plus a Vocabulary."""
+
+    __slots__ = ('vocab', 'codes')
+    kind = CODED
+
+    def __init__(self, seed=()):
+        self.vocab = Vocabulary(seed)
+        self.codes = array('B')
+
+    def append(self, value):
+        code = self.vocab.code(value)
+        self.codes = _widen(self.codes, code)
+        self.codes.append(code)
+
+    def extend(self, values):
+        known = self.vocab.codes
+        code = self.vocab.code
+        codes = [known[v] if v in known else code(v) for v in values]
+        self.codes = _widen(self.codes, len(self.vocab) - 1)
+        self.codes.extend(codes)
+
+    def __getitem__(self, i):
+        return self.vocab.values[self.codes[i]]
+
+    def __setitem__(self, i, value):
+        code = self.vocab.code(value)
+        self.codes = _widen(self.codes, code)
+        self.codes[i] = code
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.vocab.values
+        return (values[c] for c in self.codes)
+
+    def is_sparse(self):
+        """True once a loaded chunk shows fewer than SPARSE_REPEATS rows per distinct value."""
+        return len(self.codes) >= LOAD_CHUNK_ROWS and len(self.vocab) * SPARSE_REPEATS > len(self.codes)
+
+    def packed(self):
+        column = PackedColumn()
+        values = iter(self)
+        for chunk in iter(lambda: list(islice(values, BLOCK_ROWS)), []):
+            column.extend(chunk)
+        return column
+
+
+def pack_block(values):
+    """Compress BLOCK_ROWS strings as their character lengths followed by their UTF-8 text."""
+    lengths = array('I', map(len, values))
+    return zlib.compress(lengths.tobytes() + ''.join(values).encode('utf-8'), BLOCK_COMPRESSION)
+
+
+def unpack_block(block):
+    raw = zlib.decompress(block)
+    lengths = array('I')
+    split = BLOCK_ROWS * lengths.itemsize
+    lengths.frombytes(raw[:split])
+    text = raw[split:].decode('utf-8')
+    offsets = list(accumulate(lengths, initial=0))
+    return [text[a:b] for a, b in zip(offsets, islice(offsets, 1, None))]
+
+
+class PackedColumn:
+    """Text column stored as zlib-compressed blocks of BLOCK_ROWS values.
+
+    Values after the last full block stay in a plain list. The last block
+    decoded is kept, so reading the column in row order decompresses each
+    block once.
+    """
+
+    __slots__ = ('blocks', 'tail', 'nulls', 'cached')
+    kind = PACKED
+
+    def __init__(self):
+        self.blocks = []
+        self.tail = []
+        self.nulls = set()
+        self.cached = (None, None)
+
+    def __getstate__(self):
+        return self.blocks, self.tail, self.nulls
+
+    def __setstate__(self, state):
+        self.blocks, self.tail, self.nulls = state
+        self.cached = (None, None)
+
+    def append(self, value):
+        self.extend((value,))
+
+    def extend(self, values):
+        if None in values:
+            base = len(self)
+            self.nulls.update(base + i for i, v in enumerate(values) if v is None)
+            values = ['' if v is None else v for v in values]
+        tail = self.tail
+        tail.extend(values)
+        while len(tail) >= BLOCK_ROWS:
+            self.blocks.append(pack_block(tail[:BLOCK_ROWS]))
+            del tail[:BLOCK_ROWS]
+
+    def block(self, b):
+        cached, values = self.cached
+        if cached != b:
+            values = unpack_block(self.blocks[b])
+            self.cached = (b, values)
+        return values
+
+    def __getitem__(self, i):
+        b, k = divmod(i, BLOCK_ROWS)
+        if 0 <= b < len(self.blocks):
+            if self.nulls and i in self.nulls:
+                return None
+            cached, values = self.cached
+            return values[k] if cached == b else self.block(b)[k]
+        if i < 0:
+            i += len(self)
+            if i >= 0:
+                return self[i]
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return None if i in self.nulls else self.tail[k]
+
+    def __len__(self):
+        return len(self.blocks) * BLOCK_ROWS + len(self.tail)
+
+    def __iter__(self):
+        nulls = self.nulls
+        values = chain(chain.from_iterable(map(unpack_block, self.blocks)), list(self.tail))
+        if not nulls:
+            return values
+        return (None if i in nulls else v for i, v in enumerate(values))
+
+
+class Record:
+    """Mapping view of one row of a RecordTable; writes go through RecordTable.set()."""
+
+    __slots__ = ('_table', '_i')
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    @property
+    def line(self):
+        return self._table.lines[self._i]
+
+    def __getitem__(self, field):
+        return self._table.columns[field][self._i]
+
+    def __setitem__(self, field, value):
+        self._table.set(self._i, field, value)
+
+    def get(self, field, default=None):
+        column = self._table.columns.get(field)
+        return default if column is None else column[self._i]
+
+    def __contains__(self, field):
+        return field in self._table.columns
+
+    def __iter__(self):
+        return iter(self._table.fieldnames)
+
+    def __len__(self):
+        return len(self._table.fieldnames)
+
+    def keys(self):
+        return list(self._table.fieldnames)
+
+    def items(self):
+        return [(field, self[field]) for field in self._table.fieldnames]
+
+
+class RecordTable:
+    """Column-backed rows of one registry CSV."""
+
+    def __init__(self, fieldnames, kind=None):
+        self.fieldnames = list(dict.fromkeys(fieldnames))
+        self.kind = kind
+        self.lines = array('I')
+        vocabularies = controlled_vocabularies()
+        coded = set(CODED_COLUMNS.get(kind, ()))
+        self.columns = {}
+        for field in self.fieldnames:
+            if field in CONTROLLED_COLUMNS:
+                self.columns[field] = CodedColumn(vocabularies.get(CONTROLLED_COLUMNS[field], ()))
+            elif field in coded:
+                self.columns[field] = CodedColumn()
+            else:
+                self.columns[field] = PackedColumn()
+
+    @classmethod
+    def from_csv(cls, filepath, kind=None):
+        kind = kind or os.path.basename(filepath)
+        with phase(PARSE, filepath), open(filepath, newline='', encoding='utf-8') as f:
+            table = cls.from_reader(csv.reader(f), kind)
+            record_file(filepath, rows=len(table), bytes_read=os.fstat(f.fileno()).st_size)
+        return table
+
+    @classmethod
+    def from_text(cls, text, kind=None):
+        return cls.from_reader(csv.reader(io.StringIO(text, newline='')), kind)
+
+    @classmethod
+    def from_reader(cls, reader, kind=None):
+        header = next(reader, None) or []
+        table = cls(header, kind)
+        index = field_index(header)
+        width = len(header)
+        positions = [(field, index[field]) for field in table.fieldnames]
+        line = 1
+        rows = filter(None, reader)
+        while True:
+            chunk = list(islice(rows, LOAD_CHUNK_ROWS))
+            if not chunk:
+                return table
+            table.lines.extend(range(line + 1, line + 1 + len(chunk)))
+            line += len(chunk)
+            # Pad short rows with None and drop surplus cells, as DictReader does.
+            chunk = [r if len(r) == width else (r + [None] * (width - len(r)))[:width] for r in chunk]
+            cells = list(zip(*chunk)) if width else []
+            del chunk
+            for field, i in positions:
+                column = table.columns[field]
+                column.extend(cells[i])
+                if column.kind == CODED and field not in CONTROLLED_COLUMNS and column.is_sparse():
+                    table.columns[field] = column.packed()
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return Record(self, i % len(self))
+
+    def __iter__(self):
+        return (Record(self, i) for i in range(len(self)))
+
+    def column(self, field):
+        return self.columns[field]
+
+    def select(self, fields):
+        """Yield (line, value, ...) per row, scanning whole columns rather than records."""
+        columns = [self.columns[f] if f in self.columns else [None] * len(self) for f in fields]
+        return zip(self.lines, *columns)
+
+    def codes(self, field):
+        """Return (code array, values list) of a coded column for code-level scans."""
+        column = self.columns[field]
+        return column.codes, column.vocab.values
+
+    def set(self, i, field, value):
+        """Write one cell; a packed text column is dictionary-encoded on its first write."""
+        column = self.columns.get(field)
+        if column is None:
+            self.add_column(field)
+            column = self.columns[field]
+        if column.kind != CODED:
+            coded = CodedColumn(controlled_vocabularies().get(CONTROLLED_COLUMNS.get(field), ()))
+            coded.extend(list(column))
+            column = self.columns[field] = coded
+        column[i] = value
+
+    def add_column(self, field):
+        seed = controlled_vocabularies().get(CONTROLLED_COLUMNS.get(field), ())
+        column = CodedColumn(seed)
+        for _ in range(len(self)):
+            column.append(None)
+        self.fieldnames.append(field)
+        self.columns[field] = column
+
+    def to_csv(self, lineterminator='\r\n'):
+        """Serialise back to CSV text; None cells are written as empty strings."""
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator=lineterminator)
+        writer.writerow(self.fieldnames)
+        for values in zip(*(self.columns[field] for field in self.fieldnames)):
+            writer.writerow(['' if v is None else v for v in values])
+        return out.getvalue()
+
+
+def load_table(filepath, kind=None):
+    return RecordTable.from_csv(filepath, kind)
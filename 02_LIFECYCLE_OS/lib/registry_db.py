@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+registry_db.py — AEROSPACEMODEL SQLite mirror of the lifecycle registry
+Path: 02_LIFECYCLE_OS/lib/registry_db.py
+Authority: ASIT
+
+Mirrors the registry into one SQLite database for ad-hoc SQL:
+
+  knots, knus        every KNOTS.csv / KNU_PLAN.csv row, with the family,
+                     variant and phase folder it is filed under
+  evidence           the evidence register(s)
+  clause_mappings    every clause_to_knu_matrix.csv row
+  sbs_codes          06_PRODUCT_DATA_MODEL/system_breakdown_structure/sbs_codes.csv
+  audits, ncrs       audit records and their nonconformances (inline or
+                     standalone ncr_id documents) from the YAML files
+                     audit_sources.is_audit_source() selects
+  refs               one row per value of a ';'-separated reference column
+                     (knu_refs, knot_ref, evidence_refs, ...)
+  sources            path, kind, (mtime, size) signature and sha256 of
+                     every mirrored file
+
+Every table carries the source path of each row and is indexed on its
+IDs, reference columns, lifecycle_phase and status columns. CSV rows also
+carry their line; audits and ncrs rows leave line NULL and keep the whole
+YAML record as JSON in document instead.
+
+sync() is incremental: a file whose signature is unchanged is skipped, one
+whose content hash is unchanged only has its signature refreshed, and only
+files with new content have their rows deleted and re-inserted. Removed
+files lose their rows. A sync runs in one transaction, so readers see the
+previous mirror or the new one, never a mix.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+
+from audit_sources import is_audit_source
+from fileio import CACHE_DIR, content_hash, file_signature, relpath
+from instrumentation import WRITE, count, phase
+from kpi_engine import path_bucket, record_bucket
+from records import split_multi
+from registry_snapshot import Registry
+from repo_walk import walk_repo
+from yaml_loader import YamlLoadError, load_yaml_all
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DB_PATH = os.path.join(CACHE_DIR, 'registry.sqlite')
+SCHEMA_VERSION = 1
+
+SBS_CODES_REL = '06_PRODUCT_DATA_MODEL/system_breakdown_structure/sbs_codes.csv'
+TEMPLATE_DIRS = ('00_META/',)
+
+# kind -> table, CSV columns, multi-value reference columns, indexed columns.
+CSV_TABLES = {
+    'KNOTS.csv': ('knots', ['knot_id', 'title', 'lifecycle_phase', 'obligation_source', 'status', 'owner',
+                            'created_date', 'description', 'clause_refs', 'knu_refs', 'compliance_status', 'notes'],
+                  ['clause_refs', 'knu_refs'], ['knot_id', 'lifecycle_phase', 'status', 'compliance_status', 'owner']),
+    'KNU_PLAN.csv': ('knus', ['knu_id', 'title', 'lifecycle_phase', 'knot_ref', 'knu_class', 'status', 'owner',
+                              'created_date', 'description', 'evidence_refs', 'compliance_status', 'start_date',
+                              'end_date', 'notes'],
+                     ['knot_ref', 'evidence_refs'],
+                     ['knu_id', 'knot_ref', 'lifecycle_phase', 'status', 'compliance_status', 'owner']),
+    'evidence_register.csv': ('evidence', ['oid', 'title', 'evidence_type', 'lifecycle_phase', 'knot_ref', 'knu_ref',
+                                           'status', 'created_date', 'author', 'description', 'file_path',
+                                           'external_ref', 'review_date', 'reviewer', 'signoff_date',
+                                           'signoff_authority'],
+                              ['knot_ref', 'knu_ref'], ['oid', 'knot_ref', 'knu_ref', 'lifecycle_phase', 'status']),
+    'clause_to_knu_matrix.csv': ('clause_mappings', ['mapping_id', 'standard', 'clause_id', 'clause_title',
+                                                     'lifecycle_phase', 'knot_ref', 'knu_ref', 'compliance_status',
+                                                     'notes', 'exemption_ref'],
+                                 ['knot_ref', 'knu_ref'],
+                                 ['mapping_id', 'standard, clause_id', 'knot_ref', 'knu_ref', 'lifecycle_phase',
+                                  'compliance_status']),
+    'sbs_codes.csv': ('sbs_codes', ['sbs_code', 'name', 'level', 'parent_code', 'domain', 'description',
+                                    'ata_chapter'],
+                      ['ata_chapter'], ['sbs_code', 'parent_code', 'domain']),
+}
+AUDIT = 'audit'
+AUDIT_COLUMNS = ['audit_id', 'audit_type', 'scope', 'lead_auditor', 'date', 'status', 'signoff_date']
+NCR_COLUMNS = ['ncr_id', 'title', 'severity', 'source_audit', 'raised_date', 'raised_by', 'owner', 'status',
+               'closure_date']
+LOCATION_COLUMNS = ['family', 'variant', 'phase']
+
+
+def source_kind(rel):
+    """Return the CSV_TABLES key or AUDIT for a repo-relative path, or None when it is not mirrored."""
+    if rel.startswith(TEMPLATE_DIRS):
+        return None
+    name = rel.rsplit('/', 1)[-1]
+    if name == 'sbs_codes.csv':
+        return name if rel == SBS_CODES_REL else None
+    if name in CSV_TABLES:
+        return name
+    if is_audit_source(rel):
+        return AUDIT
+    return None
+
+
+def schema_statements():
+    statements = ['CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+                  'CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, kind TEXT, mtime_ns INTEGER, '
+                  'size INTEGER, sha256 TEXT, rows INTEGER)',
+                  'CREATE TABLE IF NOT EXISTS refs (source TEXT, tbl TEXT, id TEXT, field TEXT, ref TEXT)']
+    indexes = ['CREATE INDEX IF NOT EXISTS refs_ref ON refs (ref, field)',
+               'CREATE INDEX IF NOT EXISTS refs_id ON refs (tbl, id)',
+               'CREATE INDEX IF NOT EXISTS refs_source ON refs (source)']
+    for table, columns, _refs, indexed in CSV_TABLES.values():
+        statements.append(f'CREATE TABLE IF NOT EXISTS {table} (source TEXT, line INTEGER, '
+                          + ', '.join(f'{c} TEXT' for c in LOCATION_COLUMNS + columns) + ')')
+        indexes.extend(f'CREATE INDEX IF NOT EXISTS {table}_{cols.replace(", ", "_")} ON {table} ({cols})'
+                       for cols in ['source'] + indexed)
+    indexes.append('CREATE INDEX IF NOT EXISTS knots_location ON knots (family, variant, phase)')
+    indexes.append('CREATE INDEX IF NOT EXISTS knus_location ON knus (family, variant, phase)')
+    for table, columns in (('audits', AUDIT_COLUMNS), ('ncrs', NCR_COLUMNS)):
+        statements.append(f'CREATE TABLE IF NOT EXISTS {table} (source TEXT, line INTEGER, '
+                          + ', '.join(f'{c} TEXT' for c in columns)
+                          + ', audit_ref TEXT, product TEXT, lifecycle_phase TEXT, document TEXT)')
+        indexes.extend(f'CREATE INDEX IF NOT EXISTS {table}_{c} ON {table} ({c})'
+                       for c in ['source', columns[0], 'status', 'lifecycle_phase', 'product'])
+    indexes.append('CREATE INDEX IF NOT EXISTS ncrs_audit_ref ON ncrs (audit_ref)')
+    return statements, indexes
+
+
+def json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def text(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def entries(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class RegistryDatabase:
+    """Incrementally synced SQLite mirror; use .connection for queries."""
+
+    def __init__(self, path=DB_PATH, root=REPO_ROOT):
+        self.path = path
+        self.root = root
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        version = self.schema_version()
+        if version is not None and version != SCHEMA_VERSION:
+            self.reset()
+        self.create_schema()
+
+    def schema_version(self):
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return int(row[0]) if row else None
+
+    def create_schema(self):
+        statements, indexes = schema_statements()
+        with self.connection:
+            for statement in statements + indexes:
+                self.connection.execute(statement)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def reset(self):
+        """Drop every mirrored table; the next sync reloads from scratch."""
+        tables = [r[0] for r in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        with self.connection:
+            for table in tables:
+                self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+        self.create_schema()
+
+    def close(self):
+        self.connection.close()
+
+    def discover(self):
+        found = {}
+        for dirpath, _dirnames, filenames in walk_repo(self.root):
+            for f in filenames:
+                filepath = os.path.join(dirpath, f)
+                rel = relpath(filepath, self.root)
+                kind = source_kind(rel)
+                if kind:
+                    found[rel] = (kind, filepath)
+        return found
+
+    def sync(self, registry=None):
+        """Bring the mirror in line with the tree; return {'loaded', 'unchanged', 'removed'} path lists."""
+        found = self.discover()
+        known = {path: (mtime, size, sha) for path, mtime, size, sha
+                 in self.connection.execute('SELECT path, mtime_ns, size, sha256 FROM sources')}
+        result = {'loaded': [], 'unchanged': [], 'removed': sorted(set(known) - set(found))}
+        owned = registry is None
+        registry = registry or Registry(self.root)
+        try:
+            with phase(WRITE, self.path), self.connection:
+                for rel in result['removed']:
+                    self.delete(rel)
+                    self.connection.execute('DELETE FROM sources WHERE path = ?', (rel,))
+                for rel, (kind, filepath) in sorted(found.items()):
+                    signature = file_signature(filepath)
+                    previous = known.get(rel)
+                    if previous is not None and list(previous[:2]) == signature:
+                        result['unchanged'].append(rel)
+                        continue
+                    sha = content_hash(filepath)
+                    if previous is not None and previous[2] == sha:
+                        self.connection.execute('UPDATE sources SET mtime_ns = ?, size = ? WHERE path = ?',
+                                                (signature[0], signature[1], rel))
+                        result['unchanged'].append(rel)
+                        continue
+                    if previous is not None:
+                        self.delete(rel)
+                    rows = self.load(rel, kind, filepath, registry)
+                    self.connection.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)',
+                                            (rel, kind, signature[0], signature[1], sha, rows))
+                    result['loaded'].append(rel)
+        finally:
+            if owned:
+                registry.close()
+        count('files_loaded', len(result['loaded']))
+        return result
+
+    def delete(self, rel):
+        for table in [t for t, _c, _r, _i in CSV_TABLES.values()] + ['audits', 'ncrs', 'refs']:
+            self.connection.execute(f'DELETE FROM {table} WHERE source = ?', (rel,))
+
+    def load(self, rel, kind, filepath, registry):
+        """Insert the rows of one source; return how many were inserted."""
+        if kind == AUDIT:
+            return self.load_audit(rel, filepath)
+        table, columns, ref_columns, _indexed = CSV_TABLES[kind]
+        family, variant, phase_dir = path_bucket(rel)
+        location = (family, variant, phase_dir)
+        rows, refs = [], []
+        id_column = columns[0]
+        for line, *values in registry.select(filepath, columns):
+            values = [text(v) or None for v in values]
+            rows.append((rel, line) + location + tuple(values))
+            record = dict(zip(columns, values))
+            for field in ref_columns:
+                refs.extend((rel, table, record[id_column], field, ref) for ref in split_multi(record[field]))
+        placeholders = ', '.join('?' * (2 + len(LOCATION_COLUMNS) + len(columns)))
+        self.connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+        self.connection.executemany('INSERT INTO refs VALUES (?, ?, ?, ?, ?)', refs)
+        return len(rows)
+
+    def load_audit(self, rel, filepath):
+        try:
+            documents = [d for d in load_yaml_all(filepath, cache=False) if d is not None]
+        except (YamlLoadError, OSError):
+            return 0
+        audits, ncrs = [], []
+        default = path_bucket(rel)
+
+        def located(record, bucket):
+            family, variant, lc = record_bucket(record, bucket)
+            return '/'.join(p for p in (family, variant) if p) or None, lc
+
+        for document in documents:
+            for record in entries(document):
+                if not isinstance(record, dict):
+                    continue
+                if record.get('audit_id'):
+                    product, lc = located(record, default)
+                    audit_id = text(record.get('audit_id'))
+                    audits.append((rel, None) + tuple(text(record.get(c)) for c in AUDIT_COLUMNS)
+                                  + (None, product, lc, json.dumps(record, default=json_default)))
+                    bucket = record_bucket(record, default)
+                    for entry in entries(record.get('nonconformances')):
+                        if isinstance(entry, dict):
+                            product, lc = located(entry, bucket)
+                            ncrs.append((rel, None) + tuple(text(entry.get(c)) for c in NCR_COLUMNS)
+                                        + (audit_id, product, lc, json.dumps(entry, default=json_default)))
+                elif record.get('ncr_id'):
+                    product, lc = located(record, default)
+                    ncrs.append((rel, None) + tuple(text(record.get(c)) for c in NCR_COLUMNS)
+                                + (text(record.get('source_audit')), product, lc,
+                                   json.dumps(record, default=json_default)))
+        width = len(AUDIT_COLUMNS) + 6
+        self.connection.executemany(f'INSERT INTO audits VALUES ({", ".join("?" * width)})', audits)
+        width = len(NCR_COLUMNS) + 6
+        self.connection.executemany(f'INSERT INTO ncrs VALUES ({", ".join("?" * width)})', ncrs)
+        return len(audits) + len(ncrs)
+
+    def query(self, sql, parameters=()):
+        """Return (column names, rows) of one SQL statement."""
+        cursor = self.connection.execute(sql, parameters)
+        return [d[0] for d in cursor.description or ()], cursor.fetchall()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+registry_snapshot.py — AEROSPACEMODEL binary registry snapshot
+Path: 02_LIFECYCLE_OS/lib/registry_snapshot.py
+Authority: ASIT
+
+One versioned file holding every parsed registry source: the CSVs and YAML
+under 00_META, 04_PRODUCTS and 05_STANDARDS_LIBRARY plus the evidence
+register. CSVs are stored as records.RecordTable, YAML as the loaded
+document, each pickled into its own section.
+
+Layout: sections, then a JSON manifest, then a fixed trailer
+(magic, format version, manifest offset, manifest length). The manifest
+maps each source's repo-relative path to its (mtime, size) signature,
+sha256 and section extent. The file is memory-mapped and a section is only
+unpickled when a tool asks for that source.
+
+Registry is the read side used by the tools: a source whose signature or
+hash still matches the manifest is served from the snapshot, anything
+else — edited, added, or no snapshot at all — is parsed from text.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+
+from fileio import CACHE_DIR, atomic_open, content_hash, file_signature, relpath
+from instrumentation import PARSE, count, phase, record_file
+from records import RecordTable, select_rows
+from repo_walk import walk_repo
+from yaml_loader import load_yaml
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, 'registry.snapshot')
+
+MAGIC = b'AMREGSNP'
+FORMAT_VERSION = 2
+TRAILER = struct.Struct('<8sIQQ')
+
+SOURCE_DIRS = ['00_META', '04_PRODUCTS', '05_STANDARDS_LIBRARY']
+SOURCE_FILES = ['03_SHARED_SERVICES/evidence/evidence_register.csv']
+SOURCE_EXTENSIONS = {'.csv': 'csv', '.yaml': 'yaml', '.yml': 'yaml'}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def source_kind(path):
+    return SOURCE_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def collect_sources(root=REPO_ROOT):
+    """Return the sorted repo-relative paths of every registry source under root."""
+    sources = []
+    for directory in SOURCE_DIRS:
+        for dirpath, _dirnames, filenames in walk_repo(os.path.join(root, directory)):
+            sources.extend(relpath(os.path.join(dirpath, f), root) for f in filenames if source_kind(f))
+    sources.extend(p for p in SOURCE_FILES if os.path.isfile(os.path.join(root, p)))
+    return sorted(set(sources))
+
+
+def parse_source(filepath):
+    kind = source_kind(filepath)
+    if kind == 'csv':
+        return RecordTable.from_csv(filepath)
+    if yaml is None:
+        raise SnapshotError('PyYAML is required to parse YAML sources')
+    return load_yaml(filepath, cache=False)
+
+
+def build_snapshot(path=SNAPSHOT_PATH, root=REPO_ROOT):
+    """Parse every source under root into a snapshot at path; return (sources, skipped)."""
+    sources = {}
+    skipped = []
+    with atomic_open(path, 'wb') as f:
+        for rel in collect_sources(root):
+            filepath = os.path.join(root, rel)
+            if source_kind(rel) == 'yaml' and yaml is None:
+                skipped.append((rel, 'PyYAML not available'))
+                continue
+            sig = file_signature(filepath)
+            try:
+                obj = parse_source(filepath)
+            except Exception as e:  # unparseable sources stay text-only
+                skipped.append((rel, str(e).splitlines()[0] if str(e) else type(e).__name__))
+                continue
+            blob = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+            sources[rel] = {'kind': source_kind(rel), 'signature': sig, 'sha256': content_hash(filepath),
+                            'offset': f.tell(), 'length': len(blob)}
+            f.write(blob)
+        manifest = json.dumps({'format': FORMAT_VERSION, 'sources': sources}, sort_keys=True).encode('utf-8')
+        offset = f.tell()
+        f.write(manifest)
+        f.write(TRAILER.pack(MAGIC, FORMAT_VERSION, offset, len(manifest)))
+    return sources, skipped
+
+
+class RegistrySnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.mm) < TRAILER.size:
+                raise SnapshotError(f'{path}: truncated snapshot')
+            magic, version, offset, length = TRAILER.unpack_from(self.mm, len(self.mm) - TRAILER.size)
+            if magic != MAGIC:
+                raise SnapshotError(f'{path}: not a registry snapshot')
+            if version != FORMAT_VERSION:
+                raise SnapshotError(f'{path}: snapshot format {version}, expected {FORMAT_VERSION}')
+            self.sources = json.loads(self.mm[offset:offset + length])['sources']
+        except BaseException:
+            self.mm.close()
+            raise
+
+    @classmethod
+    def open(cls, path=SNAPSHOT_PATH):
+        """Return the snapshot at path, or None when it is missing or unreadable."""
+        try:
+            return cls(path)
+        except (OSError, ValueError, SnapshotError):
+            return None
+
+    def load(self, rel):
+        entry = self.sources[rel]
+        with phase(PARSE, rel), memoryview(self.mm)[entry['offset']:entry['offset'] + entry['length']] as blob:
+            document = pickle.loads(blob)
+        record_file(rel, snapshot_bytes=entry['length'])
+        count('snapshot_hits')
+        return document
+
+    def is_fresh(self, rel, filepath):
+        """True when filepath still matches the manifest entry for rel."""
+        entry = self.sources.get(rel)
+        if entry is None:
+            return False
+        sig = file_signature(filepath)
+        if sig is None:
+            return False
+        return sig == entry['signature'] or content_hash(filepath) == entry['sha256']
+
+    def stale_sources(self, root=REPO_ROOT):
+        """Return (changed, added, removed) repo-relative paths relative to the tree under root."""
+        current = collect_sources(root)
+        changed = [rel for rel in current if rel in self.sources
+                   and not self.is_fresh(rel, os.path.join(root, rel))]
+        added = [rel for rel in current if rel not in self.sources]
+        removed = sorted(set(self.sources) - set(current))
+        return changed, added, removed
+
+    def close(self):
+        self.mm.close()
+
+
+class Registry:
+    """Parsed registry sources, served from a fresh snapshot entry or parsed from text."""
+
+    def __init__(self, root=REPO_ROOT, snapshot_path=SNAPSHOT_PATH, use_snapshot=True):
+        self.root = root
+        self.snapshot = RegistrySnapshot.open(snapshot_path) if use_snapshot else None
+        self.from_snapshot = 0
+        self.from_text = 0
+
+    def _load(self, filepath, parse):
+        if self.snapshot is not None:
+            rel = relpath(os.path.abspath(filepath), self.root)
+            if self.snapshot.is_fresh(rel, filepath):
+                self.from_snapshot += 1
+                return self.snapshot.load(rel)
+        self.from_text += 1
+        return parse(filepath)
+
+    def table(self, filepath):
+        return self._load(filepath, RecordTable.from_csv)
+
+    def select(self, filepath, fields):
+        """Yield (line, value, ...) for the named fields of a CSV source."""
+        table = self._load(filepath, lambda _path: None)
+        if table is None:
+            return select_rows(filepath, fields)
+        return table.select(fields)
+
+    def document(self, filepath):
+        return self._load(filepath, parse_source)
+
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
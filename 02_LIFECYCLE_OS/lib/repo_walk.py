@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+repo_walk.py — AEROSPACEMODEL repository walker
+Path: 02_LIFECYCLE_OS/lib/repo_walk.py
+Authority: ASIT
+
+Single pruned walk over the repository tree. VCS metadata, caches and
+virtual environments are never descended into.
+"""
+
+import os
+
+from instrumentation import WALK, timed
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+IGNORED_DIRS = {
+    '.git',
+    '__pycache__',
+    '.pytest_cache',
+    '.mypy_cache',
+    '.ruff_cache',
+    '.tox',
+    '.nox',
+    '.venv',
+    'venv',
+    'node_modules',
+    '.aerospacemodel_cache',
+}
+
+
+def walk_repo(root=REPO_ROOT):
+    """Yield (dirpath, dirnames, filenames) with ignored directories pruned."""
+    return timed(WALK, _pruned_walk(root))
+
+
+def _pruned_walk(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS and not d.endswith('.egg-info'))
+        yield dirpath, dirnames, sorted(filenames)
+
+
+def iter_files(root=REPO_ROOT):
+    """Yield the absolute path of every non-ignored file under root."""
+    for dirpath, _dirnames, filenames in walk_repo(root):
+        for f in filenames:
+            yield os.path.join(dirpath, f)
+
+
+def find_files(filename, root=REPO_ROOT):
+    """Return every path under root whose basename equals filename."""
+    return [os.path.join(dirpath, filename)
+            for dirpath, _dirnames, filenames in walk_repo(root)
+            if filename in filenames]
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+sbs_index.py — AEROSPACEMODEL SBS hierarchy and ATA crosswalk index
+Path: 02_LIFECYCLE_OS/lib/sbs_index.py
+Authority: ASIT
+
+SbsIndex reads 06_PRODUCT_DATA_MODEL/system_breakdown_structure/sbs_codes.csv
+once and numbers the parent-pointer tree in preorder: every node gets an
+(enter, exit) interval that contains the intervals of all its descendants.
+Ancestor and descendant tests are then two integer comparisons, a subtree
+is one slice of the preorder list, and subtree_totals() rolls per-node
+counts up the whole tree in a single reverse pass instead of walking the
+parents of every row.
+
+The ata_chapter crosswalk values are indexed both ways (chapter -> SBS
+codes, SBS code -> chapters) and checked against the ATA100
+chapter_mapping.csv and legacy_crosswalk.csv in 07_TECHNICAL_PUBLICATIONS.
+Problems are reported as findings: broken hierarchy (duplicates, unknown
+parents, cycles, level progression) as ERROR, disagreements between the
+crosswalk files as WARNING.
+"""
+
+import os
+import re
+
+from fileio import relpath
+from findings import make_finding
+from records import iter_rows, split_multi
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SBS_CODES = os.path.join(REPO_ROOT, '06_PRODUCT_DATA_MODEL', 'system_breakdown_structure', 'sbs_codes.csv')
+ATA100_DIR = os.path.join(REPO_ROOT, '07_TECHNICAL_PUBLICATIONS', 'ATA100')
+CHAPTER_MAPPING = os.path.join(ATA100_DIR, 'chapter_mapping.csv')
+LEGACY_CROSSWALK = os.path.join(ATA100_DIR, 'legacy_crosswalk.csv')
+
+ROOT_CODE = 'SYS-000'
+ERROR, WARNING = 'ERROR', 'WARNING'
+SBS_CODE_PATTERN = re.compile(r'^SYS-[0-9]{3}$')
+CHAPTER_PATTERN = re.compile(r'^(?:ATA-?)?([0-9]{2})(?:-[0-9]{2}-[0-9]{2})?$')
+
+
+def chapter_key(value):
+    """Normalize '21', 'ATA-21' or '21-00-00' to '21'; None when it is not an ATA chapter."""
+    match = CHAPTER_PATTERN.match((value or '').strip())
+    return match.group(1) if match else None
+
+
+class SbsNode:
+    __slots__ = ('code', 'name', 'level', 'parent', 'domain', 'chapters', 'line', 'enter', 'exit')
+
+    def __init__(self, code, name, level, parent, domain, chapters, line):
+        self.code = code
+        self.name = name
+        self.level = level
+        self.parent = parent
+        self.domain = domain
+        self.chapters = chapters
+        self.line = line
+        self.enter = self.exit = None
+
+
+class SbsIndex:
+    """Nested-interval SBS tree plus ATA <-> SBS multimaps; .findings lists every problem found."""
+
+    def __init__(self, sbs_path=SBS_CODES, mapping_path=CHAPTER_MAPPING, crosswalk_path=LEGACY_CROSSWALK):
+        self.path = sbs_path
+        self.nodes = {}
+        self.order = []
+        self.findings = []
+        self.chapter_codes = {}
+        self.mapping = {}
+        self.load_nodes(sbs_path)
+        self.number()
+        for node in self.nodes.values():
+            for chapter in node.chapters:
+                self.chapter_codes.setdefault(chapter, []).append(node.code)
+        for codes in self.chapter_codes.values():
+            codes.sort(key=self.position)
+        if mapping_path and os.path.isfile(mapping_path):
+            self.check_mapping(mapping_path)
+        if crosswalk_path and os.path.isfile(crosswalk_path):
+            self.check_crosswalk(crosswalk_path)
+
+    def problem(self, path, line, rule, severity, message, field=None):
+        self.findings.append(make_finding(relpath(path), line, rule, severity, message, field))
+
+    def load_nodes(self, path):
+        for line, row in iter_rows(path):
+            code = (row.get('sbs_code') or '').strip()
+            if not SBS_CODE_PATTERN.match(code):
+                self.problem(path, line, 'SBS-RULE-001', ERROR, f'Invalid sbs_code: {code!r}', 'sbs_code')
+                continue
+            if code in self.nodes:
+                self.problem(path, line, 'SBS-RULE-001', ERROR,
+                             f'Duplicate sbs_code {code} (first on line {self.nodes[code].line})', 'sbs_code')
+                continue
+            try:
+                level = int(row.get('level') or '')
+            except ValueError:
+                self.problem(path, line, 'SBS-RULE-006', ERROR, f'{code}: invalid level {row.get("level")!r}', 'level')
+                level = None
+            raw = split_multi(row.get('ata_chapter'))
+            chapters = [c for c in raw if re.fullmatch(r'[0-9]{2}', c)]
+            if len(chapters) != len(raw):
+                self.problem(path, line, 'SBS-RULE-008', ERROR,
+                             f'{code}: invalid ata_chapter {row.get("ata_chapter")!r}', 'ata_chapter')
+            self.nodes[code] = SbsNode(code, (row.get('name') or '').strip(), level,
+                                       (row.get('parent_code') or '').strip() or None,
+                                       (row.get('domain') or '').strip(), chapters, line)
+
+    def number(self):
+        """Assign preorder (enter, exit) intervals; nodes left unnumbered are cut off from the root."""
+        children = {}
+        roots = []
+        for node in self.nodes.values():
+            if node.parent is None:
+                roots.append(node)
+            elif node.parent in self.nodes:
+                children.setdefault(node.parent, []).append(node)
+            else:
+                self.problem(self.path, node.line, 'SBS-RULE-005', ERROR,
+                             f'{node.code}: parent_code {node.parent} does not exist', 'parent_code')
+        if [n.code for n in roots] != [ROOT_CODE]:
+            self.problem(self.path, None, 'SBS-RULE-002', ERROR,
+                         f'Expected the single root {ROOT_CODE}, found: {", ".join(n.code for n in roots) or "none"}')
+        for siblings in children.values():
+            siblings.sort(key=lambda n: n.code)
+
+        for root in sorted(roots, key=lambda n: n.code):
+            root.enter = len(self.order)
+            self.order.append(root.code)
+            stack = [(root, iter(children.get(root.code, ())))]
+            while stack:
+                parent, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    parent.exit = len(self.order) - 1
+                    stack.pop()
+                    continue
+                if None not in (parent.level, child.level) and child.level != parent.level + 1:
+                    self.problem(self.path, child.line, 'SBS-RULE-006', ERROR,
+                                 f'{child.code}: level {child.level} under {parent.code} (level {parent.level})',
+                                 'level')
+                child.enter = len(self.order)
+                self.order.append(child.code)
+                stack.append((child, iter(children.get(child.code, ()))))
+
+        # A parent chain that never reaches a root is a cycle (or hangs off one).
+        reported = set()
+        for node in self.nodes.values():
+            if node.enter is None and node.parent in self.nodes and node.code not in reported:
+                chain, seen = [], set()
+                walk = node
+                while walk is not None and walk.enter is None and walk.code not in seen:
+                    seen.add(walk.code)
+                    chain.append(walk.code)
+                    walk = self.nodes.get(walk.parent)
+                if walk is not None and walk.code == node.code:
+                    reported.update(chain)
+                    self.problem(self.path, node.line, 'SBS-RULE-004', ERROR,
+                                 f'{node.code}: parent_code cycle {" -> ".join(chain + [node.code])}', 'parent_code')
+                elif walk is None or walk.enter is None:
+                    self.problem(self.path, node.line, 'SBS-RULE-004', ERROR,
+                                 f'{node.code}: not reachable from {ROOT_CODE}', 'parent_code')
+
+    def position(self, code):
+        enter = self.nodes[code].enter
+        return len(self.nodes) if enter is None else enter
+
+    def interval(self, code):
+        """Return (enter, exit) of code, or None for an unknown or unreachable code."""
+        node = self.nodes.get(code)
+        if node is None or node.enter is None:
+            return None
+        return node.enter, node.exit
+
+    def is_ancestor(self, ancestor, code):
+        """True when ancestor is code or one of its ancestors."""
+        outer, inner = self.interval(ancestor), self.interval(code)
+        return outer is not None and inner is not None and outer[0] <= inner[0] and inner[1] <= outer[1]
+
+    def subtree(self, code):
+        """code and all its descendants, in preorder."""
+        span = self.interval(code)
+        return self.order[span[0]:span[1] + 1] if span else []
+
+    def ancestors(self, code):
+        """Parents of code, nearest first."""
+        chain = []
+        node = self.nodes.get(code)
+        while node is not None and node.enter is not None and node.parent is not None:
+            chain.append(node.parent)
+            node = self.nodes.get(node.parent)
+        return chain
+
+    def chapters(self, code, subtree=False):
+        """ATA chapters of code, or of its whole subtree."""
+        codes = self.subtree(code) if subtree else [code] if code in self.nodes else []
+        return sorted({c for member in codes for c in self.nodes[member].chapters})
+
+    def codes_for_chapter(self, chapter):
+        """SBS codes listing the chapter, in preorder."""
+        return list(self.chapter_codes.get(chapter_key(chapter), ()))
+
+    def subtree_totals(self, counts):
+        """Roll {code: n} up the tree; return {code: n of its subtree} for every numbered node."""
+        totals = [0] * len(self.order)
+        for code, n in counts.items():
+            span = self.interval(code)
+            if span is not None:
+                totals[span[0]] += n
+        for position in range(len(self.order) - 1, 0, -1):
+            parent = self.nodes[self.order[position]].parent
+            if parent is not None:
+                totals[self.nodes[parent].enter] += totals[position]
+        return dict(zip(self.order, totals))
+
+    def check_mapping(self, path):
+        """Index chapter_mapping.csv and report chapters whose SBS code disagrees with sbs_codes.csv."""
+        for line, row in iter_rows(path):
+            raw = (row.get('ata_chapter') or '').strip()
+            chapter = chapter_key(raw)
+            code = (row.get('sbs_code') or '').strip()
+            if chapter is None:
+                self.problem(path, line, 'ATA-XWALK', WARNING, f'Invalid ata_chapter {raw!r}', 'ata_chapter')
+                continue
+            if chapter in self.mapping:
+                self.problem(path, line, 'ATA-XWALK', WARNING, f'ATA-{chapter} mapped twice', 'ata_chapter')
+                continue
+            self.mapping[chapter] = code
+            node = self.nodes.get(code)
+            if node is None:
+                self.problem(path, line, 'ATA-XWALK', WARNING, f'ATA-{chapter}: unknown sbs_code {code!r}', 'sbs_code')
+                continue
+            listed = self.chapter_codes.get(chapter, [])
+            if not listed:
+                self.problem(path, line, 'ATA-XWALK', WARNING,
+                             f'ATA-{chapter} maps to {code} but no SBS node lists chapter {chapter}', 'sbs_code')
+            elif not any(self.is_ancestor(code, other) for other in listed):
+                self.problem(path, line, 'ATA-XWALK', WARNING,
+                             f'ATA-{chapter} maps to {code} but sbs_codes.csv lists chapter {chapter} under '
+                             f'{", ".join(listed)}', 'sbs_code')
+            domain = (row.get('domain') or '').strip()
+            if domain and domain != node.domain:
+                self.problem(path, line, 'ATA-XWALK', WARNING,
+                             f'ATA-{chapter}: domain {domain} differs from {code} domain {node.domain}', 'domain')
+
+    def check_crosswalk(self, path):
+        """Report legacy_crosswalk.csv rows whose chapter numbers disagree or are unknown."""
+        for line, row in iter_rows(path):
+            keys = {field: chapter_key(row.get(field))
+                    for field in ('ata100_chapter', 'ata_ispec2200_chapter', 's1000d_system_code')}
+            chapter = keys['ata100_chapter']
+            if chapter is None:
+                self.problem(path, line, 'ATA-XWALK', WARNING,
+                             f'Invalid ata100_chapter {row.get("ata100_chapter")!r}', 'ata100_chapter')
+                continue
+            for field, key in keys.items():
+                if key != chapter:
+                    self.problem(path, line, 'ATA-XWALK', WARNING,
+                                 f'ATA-{chapter}: {field} {row.get(field)!r} is a different chapter', field)
+            if chapter not in self.mapping and chapter not in self.chapter_codes:
+                self.problem(path, line, 'ATA-XWALK', WARNING,
+                             f'ATA-{chapter} is neither in chapter_mapping.csv nor listed by any SBS node',
+                             'ata100_chapter')
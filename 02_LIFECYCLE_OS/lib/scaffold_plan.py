@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+scaffold_plan.py — AEROSPACEMODEL bulk scaffolding plans
+Path: 02_LIFECYCLE_OS/lib/scaffold_plan.py
+Authority: ASIT
+
+Scaffolding scripts add the directories and files they need to a
+ScaffoldPlan instead of writing them one by one. The plan is resolved
+against the tree before anything is written: each file is either to be
+created or already present, as scaffolding never overwrites. A resolved
+plan can be printed as a dry run or applied by a pool of writer threads;
+applying it again creates nothing.
+
+A manifest lists a whole rollout, as YAML:
+
+    variants:
+      - product_family: SSTO_SPACEPLANE
+        variant: SSTO_CARGO
+        craft_class: CRAFT_UNCREWED    # optional: also scaffold a programme
+        family: ROBBBO-T               # optional, defaults from the craft class
+        programme: CARGO_DEMO          # optional, default PROGRAMME
+    standards:
+      - DO178C
+
+or as CSV with the columns product_family, variant, craft_class, family,
+programme and standard, where a row with only a standard scaffolds just
+that standard.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fileio import atomic_write, create_file, relpath
+from instrumentation import WRITE, display_path, phase
+from records import iter_rows
+from yaml_loader import YamlLoadError, load_yaml
+
+VARIANT_FIELDS = ['product_family', 'variant', 'craft_class', 'family', 'programme']
+CREATE, EXISTS = 'create', 'exists'
+DEFAULT_JOBS = 8
+
+
+class ManifestError(ValueError):
+    """A manifest that cannot be scaffolded; .problems lists every reason."""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = problems
+        super().__init__(f'{path}: {len(problems)} problem(s)')
+
+
+def load_manifest(path):
+    """Return {'variants': [entry], 'standards': [entry], 'problems': [str]}; every entry has a 'where'.
+
+    'problems' lists the parts of the manifest that could not be read as
+    entries; callers report them together with the problems their own
+    checks find in the entries. Only an unreadable manifest raises.
+    """
+    if path.lower().endswith('.csv'):
+        return csv_manifest(path)
+    return yaml_manifest(path)
+
+
+def csv_manifest(path):
+    manifest = {'variants': [], 'standards': [], 'problems': []}
+    for line, row in iter_rows(path):
+        where = f'{path}:{line}'
+        entry = {field: (row.get(field) or '').strip() for field in VARIANT_FIELDS}
+        standard = (row.get('standard') or '').strip()
+        if standard:
+            manifest['standards'].append({'standard': standard, 'where': where})
+        if any(entry.values()) or not standard:
+            manifest['variants'].append({**entry, 'where': where})
+    return manifest
+
+
+def yaml_manifest(path):
+    try:
+        data = load_yaml(path)
+    except YamlLoadError as e:
+        raise ManifestError(path, [f'{path}:{e.line}: {e.message}']) from None
+    if not isinstance(data, dict):
+        raise ManifestError(path, [f'{path}: expected a mapping with variants and/or standards'])
+    manifest = {'variants': [], 'standards': [], 'problems': []}
+    problems = manifest['problems']
+    sections = {}
+    for key in ('variants', 'standards'):
+        sections[key] = data.get(key) or []
+        if not isinstance(sections[key], list):
+            problems.append(f'{path}: {key}: expected a list, got {type(sections[key]).__name__}')
+            sections[key] = []
+    for i, item in enumerate(sections['variants'], start=1):
+        where = f'{path}: variants[{i}]'
+        if not isinstance(item, dict):
+            problems.append(f'{where}: expected a mapping')
+            continue
+        manifest['variants'].append({**{field: str(item.get(field) or '').strip() for field in VARIANT_FIELDS},
+                                     'where': where})
+    for i, item in enumerate(sections['standards'], start=1):
+        where = f'{path}: standards[{i}]'
+        if isinstance(item, (list, set)):
+            problems.append(f'{where}: expected a standard ID or a mapping with id')
+            continue
+        standard = item.get('id', item.get('standard')) if isinstance(item, dict) else item
+        manifest['standards'].append({'standard': str(standard or '').strip(), 'where': where})
+    return manifest
+
+
+class ScaffoldPlan:
+    """Directories and files to scaffold; files are created when missing and never overwritten."""
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = {}
+        self.problems = []
+
+    def add_dir(self, path, keep=False):
+        """Plan a directory; keep=True gives it a .gitkeep while nothing else is planned or present in it."""
+        self.dirs[path] = self.dirs.get(path, False) or keep
+
+    def add_file(self, path, content):
+        previous = self.files.setdefault(path, content)
+        if previous != content:
+            self.problems.append(f'{relpath(path)} is planned twice with different content')
+
+    def resolve(self):
+        """Return [(action, path, content)] in path order, with action CREATE or EXISTS."""
+        files = dict(self.files)
+        planned_dirs = {os.path.dirname(path) for path in self.files}
+        for directory, keep in self.dirs.items():
+            if not keep or directory in planned_dirs:
+                continue
+            gitkeep = os.path.join(directory, '.gitkeep')
+            if os.path.lexists(gitkeep) or not os.path.isdir(directory) or not os.listdir(directory):
+                files.setdefault(gitkeep, '')
+        return [(EXISTS if os.path.lexists(path) else CREATE, path, content)
+                for path, content in sorted(files.items())]
+
+    def apply(self, actions, jobs=DEFAULT_JOBS):
+        """Create the planned directories and the files resolved as CREATE; return (created, existing)."""
+        todo = [(path, content) for action, path, content in actions if action == CREATE]
+        with phase(WRITE):
+            for directory in sorted(set(self.dirs) | {os.path.dirname(path) for path, _content in todo}):
+                os.makedirs(directory, exist_ok=True)
+            if jobs > 1 and len(todo) > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    results = list(pool.map(lambda item: create_file(*item), todo))
+            else:
+                results = [create_file(path, content) for path, content in todo]
+        created = [path for (path, _content), ok in zip(todo, results) if ok]
+        existing = [path for action, path, _content in actions if action == EXISTS]
+        existing += [path for (path, _content), ok in zip(todo, results) if not ok]
+        return created, sorted(existing)
+
+
+def print_plan(actions, verbose=True):
+    """Print a dry-run listing of the files a resolved plan would create."""
+    to_create = [path for action, path, _content in actions if action == CREATE]
+    print('SCAFFOLD PLAN (dry run):')
+    if verbose:
+        for path in to_create:
+            print(f'  create {relpath(path)}')
+    print(f'Summary: {len(to_create)} file(s) to create, {len(actions) - len(to_create)} already present')
+
+
+def run_plan(plan, dry_run=False, jobs=DEFAULT_JOBS, created_manifest=None, source=None):
+    """Print the plan (dry run) or apply it, record the created files and print a summary."""
+    actions = plan.resolve()
+    if dry_run:
+        print_plan(actions)
+        return [], []
+    created, existing = plan.apply(actions, jobs)
+    if created_manifest:
+        write_created_manifest(created_manifest, created, existing, source)
+    print(f'Scaffolded: {len(created)} file(s) created, {len(existing)} already present')
+    return created, existing
+
+
+def write_created_manifest(path, created, existing, source=None):
+    """Record the files a run created, in path order, as JSON."""
+    document = {
+        'manifest': display_path(os.path.abspath(source)) if source else None,
+        'created': [relpath(p) for p in sorted(created)],
+        'existing': len(existing),
+    }
+    atomic_write(path, json.dumps(document, indent=2) + '\n')
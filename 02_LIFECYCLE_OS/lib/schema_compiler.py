@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+schema_compiler.py — AEROSPACEMODEL schema compiler for registry CSVs
+Path: 02_LIFECYCLE_OS/lib/schema_compiler.py
+Authority: ASIT
+
+Compiles the record schemas in 00_META/schemas into row validators once per
+run. A compiled schema holds the required fields, the ID regex built from
+the schema's *_id_format and the allowed value sets of its controlled
+columns (00_META/glossary/controlled_vocabulary.yaml, the lifecycle
+registries and the enums the schema declares itself).
+
+Checks run column-wise over records.iter_batches() blocks: each check is
+bound to a column index once per file and then scans that column of a
+whole batch, so no row is turned into a mapping. Findings come out in row
+order, stamped with the BREX rule each check enforces and the severity
+BREX_RULESET.yaml gives that rule.
+
+Without PyYAML the schemas cannot be read; each kind then falls back to
+the required fields and ID format built into SCHEMAS, with no vocabulary
+checks and the default severities, so the validators stay stdlib-only.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from brex_ruleset import BREX_RULESET, rule_severity
+from findings import make_finding
+from records import controlled_vocabularies, iter_batches
+from yaml_loader import LOADER_NAME, load_yaml
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SCHEMA_DIR = os.path.join(REPO_ROOT, '00_META', 'schemas')
+CONTROLLED_VOCABULARY = os.path.join(REPO_ROOT, '00_META', 'glossary', 'controlled_vocabulary.yaml')
+
+REQUIRED, ID_FORMAT, VOCABULARY = 'required', 'id_format', 'vocabulary'
+# Severity of a check whose rule BREX_RULESET.yaml does not list.
+SEVERITIES = {REQUIRED: 'ERROR', ID_FORMAT: 'ERROR', VOCABULARY: 'WARNING'}
+RULE_VOCABULARY = 'BREX-014'
+
+# filename -> schema binding. enums maps a column to the schema's own list
+# of allowed values; the shared controlled columns are in CONTROLLED_ENUMS.
+# required_fields and id_format are the fallback used without PyYAML.
+SCHEMAS = {
+    'KNOTS.csv': {
+        'schema': 'knot_schema.yaml',
+        'record': 'knot_record',
+        'id_field': 'knot_id',
+        'label': 'KNOT',
+        'enums': {},
+        'required_fields': ['knot_id', 'title', 'lifecycle_phase', 'obligation_source', 'status', 'owner',
+                            'created_date'],
+        'id_format': 'KNOT-{PRODUCT}-{LC_CODE}-{SEQ:04d}',
+        'rules': {REQUIRED: 'BREX-009', ID_FORMAT: 'BREX-004', VOCABULARY: RULE_VOCABULARY},
+    },
+    'KNU_PLAN.csv': {
+        'schema': 'knu_schema.yaml',
+        'record': 'knu_record',
+        'id_field': 'knu_id',
+        'label': 'KNU',
+        'enums': {'knu_class': 'knu_classes'},
+        'required_fields': ['knu_id', 'title', 'lifecycle_phase', 'knot_ref', 'knu_class', 'status', 'owner',
+                            'created_date'],
+        'id_format': 'KNU-{PRODUCT}-{LC_CODE}-{SEQ:04d}',
+        'rules': {REQUIRED: 'BREX-010', ID_FORMAT: 'BREX-005', VOCABULARY: RULE_VOCABULARY},
+    },
+    'clause_to_knu_matrix.csv': {
+        'schema': 'mapping_schema.yaml',
+        'record': 'clause_to_knu_mapping',
+        'id_field': 'mapping_id',
+        'label': 'mapping',
+        'enums': {},
+        'required_fields': ['mapping_id', 'standard', 'clause_id', 'clause_title', 'lifecycle_phase',
+                            'compliance_status'],
+        'id_format': None,
+        'rules': {REQUIRED: 'BREX-011', VOCABULARY: RULE_VOCABULARY},
+    },
+    'evidence_register.csv': {
+        'schema': 'evidence_model.yaml',
+        'record': 'evidence_record',
+        'id_field': 'oid',
+        'label': 'evidence',
+        'enums': {'evidence_type': 'evidence_types'},
+        'required_fields': ['oid', 'title', 'evidence_type', 'lifecycle_phase', 'knot_ref', 'knu_ref', 'status',
+                            'created_date', 'author'],
+        'id_format': None,
+        'rules': {REQUIRED: 'BREX-012', VOCABULARY: RULE_VOCABULARY},
+    },
+}
+
+# column -> (controlled_vocabulary.yaml list, registry code_type)
+CONTROLLED_ENUMS = {
+    'lifecycle_phase': ('lifecycle_phases', 'lc_code'),
+    'status': ('status_codes', 'object_status'),
+    'compliance_status': ('compliance_status_codes', 'compliance_status'),
+}
+
+# *_id_format placeholders; anything else matches an upper-case token.
+PLACEHOLDERS = {
+    'LC_CODE': r'LC\d{2}',
+}
+PLACEHOLDER_PATTERN = re.compile(r'\{([A-Z_]+)(?::0?(\d+)d)?\}')
+
+
+def compile_id_format(fmt):
+    """Turn e.g. 'KNOT-{PRODUCT}-{LC_CODE}-{SEQ:04d}' into an anchored regex."""
+    parts = []
+    end = 0
+    for m in PLACEHOLDER_PATTERN.finditer(fmt):
+        parts.append(re.escape(fmt[end:m.start()]))
+        name, digits = m.groups()
+        parts.append(rf'\d{{{int(digits)}}}' if digits else PLACEHOLDERS.get(name, r'[A-Z0-9]+'))
+        end = m.end()
+    parts.append(re.escape(fmt[end:]))
+    return re.compile('^' + ''.join(parts) + '$')
+
+
+def vocabulary_values(entries):
+    """Values of a vocabulary list whose items are plain strings or {'code': ...} mappings."""
+    values = set()
+    for entry in entries or ():
+        value = entry.get('code') if isinstance(entry, dict) else entry
+        if value is not None:
+            values.add(str(value))
+    return values
+
+
+class CompiledSchema:
+    """Column-index checks for one registry CSV kind."""
+
+    def __init__(self, kind, required, id_field, id_pattern, label, enums, delimiter, rules, sources):
+        self.kind = kind
+        self.required = required
+        self.id_field = id_field
+        self.id_pattern = id_pattern
+        self.id_column_pattern = re.compile(f'(?:{id_pattern.pattern[1:-1]}\n)*') if id_pattern else None
+        self.label = label
+        self.enums = enums
+        self.delimiter = delimiter
+        self.rules = rules
+        self.severities = {check: rule_severity(rule, SEVERITIES[check]) for check, rule in rules.items()}
+        self.sources = sources
+
+    def fingerprint_parts(self):
+        return [__file__, *self.sources, self.required, self.id_pattern.pattern if self.id_pattern else None,
+                sorted((field, sorted(values)) for field, values in self.enums.items()), self.delimiter,
+                sorted(self.rules.items()), sorted(self.severities.items())]
+
+    def bind(self, index):
+        """Return the checks as (order, check, field, column index or None) for one header."""
+        checks = []
+        if REQUIRED in self.rules:
+            checks.extend((REQUIRED, field, index.get(field)) for field in self.required)
+        if ID_FORMAT in self.rules and self.id_pattern is not None and self.id_field in index:
+            checks.append((ID_FORMAT, self.id_field, index[self.id_field]))
+        if VOCABULARY in self.rules:
+            checks.extend((VOCABULARY, field, index[field]) for field in self.enums if field in index)
+        return [(order, *check) for order, check in enumerate(checks)]
+
+    def check_batch(self, filepath, checks, lines, rows):
+        """Return the findings of one batch, ordered by row and then by check."""
+        columns = transpose(rows, 1 + max((i for _order, _check, _field, i in checks if i is not None), default=-1))
+        hits = []
+        for order, check, field, i in checks:
+            rule, severity = self.rules[check], self.severities[check]
+            if check == REQUIRED:
+                bad = range(len(rows)) if i is None else blank_positions(columns[i])
+                hits.extend((k, order, make_finding(filepath, lines[k], rule, severity,
+                                                    f'Missing required field: {field}', field)) for k in bad)
+            elif check == ID_FORMAT:
+                if self.all_ids_match(columns[i]):
+                    continue
+                match = self.id_pattern.match
+                for k, v in enumerate(columns[i]):
+                    if v and not match(v):
+                        v = v.strip()
+                        if v and not match(v):
+                            hits.append((k, order, make_finding(filepath, lines[k], rule, severity,
+                                                                f'Invalid {self.label} ID format: {v}', field)))
+            else:
+                allowed = self.enums[field]
+                if allowed.issuperset(set(columns[i]).difference(EMPTY)):
+                    continue
+                for k, v in enumerate(columns[i]):
+                    if v and v not in allowed:
+                        parts = v.split(self.delimiter) if self.delimiter else [v]
+                        unknown = [p.strip() for p in parts if p.strip() and p.strip() not in allowed]
+                        if unknown:
+                            hits.append((k, order, make_finding(filepath, lines[k], rule, severity,
+                                                                f'Uncontrolled {field} value: {"; ".join(unknown)}', field)))
+        hits.sort(key=lambda hit: hit[:2])
+        return [finding for _k, _order, finding in hits]
+
+    def all_ids_match(self, column):
+        """True when every value of column is a well-formed ID, tested with one regex call."""
+        try:
+            joined = '\n'.join(column) + '\n'
+        except TypeError:
+            return False
+        return joined.count('\n') == len(column) and self.id_column_pattern.fullmatch(joined) is not None
+
+    def check_file(self, filepath, span=None):
+        """Yield the findings of filepath (or of a byte span of it) batch by batch; return {'rows', 'ids'}."""
+        rows = 0
+        ids = []
+        checks = None
+        for index, lines, batch in iter_batches(filepath, span=span):
+            if checks is None:
+                checks = self.bind(index)
+            rows += len(batch)
+            i = index.get(self.id_field)
+            if i is not None:
+                ids.extend(filter(None, map(str.strip, filter(None, [r[i] if i < len(r) else None for r in batch]))))
+            yield from self.check_batch(filepath, checks, lines, batch)
+        return {'rows': rows, 'ids': ids}
+
+
+EMPTY = frozenset(['', None])
+
+
+def transpose(rows, width):
+    """Return the first width columns of rows, padding short rows with None."""
+    if not rows or width == 0:
+        return [()] * width
+    if min(map(len, rows)) < width:
+        rows = [r if len(r) >= width else r + [None] * (width - len(r)) for r in rows]
+    return list(zip(*rows))[:width]
+
+
+def blank_positions(column):
+    """Positions of empty, None or whitespace-only values."""
+    if all(column) and not any(map(str.isspace, column)):
+        return []
+    return [k for k, v in enumerate(column) if not v or v.isspace()]
+
+
+@lru_cache(maxsize=None)
+def compiled_schema(kind):
+    """Compile and memoize the schema bound to a registry filename such as 'KNOTS.csv'."""
+    spec = SCHEMAS[kind]
+    schema_path = os.path.join(SCHEMA_DIR, spec['schema'])
+    if LOADER_NAME is None:
+        id_pattern = compile_id_format(spec['id_format']) if spec['id_format'] else None
+        return CompiledSchema(kind, list(spec['required_fields']), spec['id_field'], id_pattern, spec['label'], {},
+                              None, dict(spec['rules']), [schema_path])
+    schema = load_yaml(schema_path) or {}
+    record = schema.get(spec['record']) or {}
+    required = [str(field) for field in record.get('required_fields') or ()]
+    fields = set(required) | {str(field) for field in record.get('optional_fields') or ()}
+
+    id_format = schema.get(f'{spec["id_field"]}_format')
+    id_pattern = compile_id_format(id_format) if id_format else None
+
+    vocabulary = load_yaml(CONTROLLED_VOCABULARY) or {}
+    registries = controlled_vocabularies()
+    enums = {}
+    for field, (vocabulary_key, code_type) in CONTROLLED_ENUMS.items():
+        if field in fields:
+            enums[field] = frozenset(vocabulary_values(vocabulary.get(vocabulary_key))
+                                     | vocabulary_values(registries.get(code_type)))
+    for field, key in spec['enums'].items():
+        if field in fields and schema.get(key):
+            enums[field] = frozenset(vocabulary_values(schema[key]))
+
+    return CompiledSchema(kind, required, spec['id_field'], id_pattern, spec['label'], enums,
+                          schema.get('multi_value_delimiter'), dict(spec['rules']),
+                          [schema_path, CONTROLLED_VOCABULARY, BREX_RULESET])
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+token_distribution.py — AEROSPACEMODEL Teknia Token (TT) distribution engine
+Path: 02_LIFECYCLE_OS/lib/token_distribution.py
+Authority: ASIT
+
+Scores every KNOT of the portfolio against the distribution_basis criteria
+of core_models/token_distribution_model.yaml:
+
+  KNOT_COMPLEXITY        KNUs planned against it plus clause mappings naming
+                         it, over the criterion's saturation, capped at 1
+  EVIDENCE_COMPLETENESS  share of its KNUs with registered evidence
+  COMPLIANCE_STATUS      the model's value for its compliance_status
+  AUDIT_CLOSURE          share of the NCRs of its variant and phase that are
+                         closed, 1 when none were raised
+
+The per-KNOT values form a feature matrix held as one array('d') column per
+criterion (AUDIT_CLOSURE as a per-bucket value gathered through an array of
+bucket codes). distribute() scores the matrix against one or several weight
+vectors at once: with NumPy as a single matrix product over zero-copy views
+of the columns, otherwise column by column in plain Python.
+
+Source files are tracked the way kpi_engine does: each KNOTS.csv,
+KNU_PLAN.csv, evidence register, clause_to_knu_matrix.csv and audit YAML
+contribution is remembered with its signature, refresh() re-reads only the
+files that changed and recomputes the rows of just the KNOTs they reach.
+The engine is persisted under .aerospacemodel_cache.
+"""
+
+import heapq
+import os
+import pickle
+from array import array
+
+from fileio import CACHE_DIR, atomic_write, file_signature, relpath
+from kpi_engine import NCR_CLOSED_STATUSES, NCRS, adjust, adjust_nested, path_bucket, read_ncrs
+from kpi_engine import source_kind as kpi_source_kind
+from records import split_multi
+from registry_snapshot import Registry
+from repo_walk import walk_repo
+from yaml_loader import load_yaml
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_PATH = os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'core_models', 'token_distribution_model.yaml')
+ENGINE_PATH = os.path.join(CACHE_DIR, 'token_engine.pickle')
+ENGINE_VERSION = 1
+
+KNOT_COMPLEXITY, EVIDENCE_COMPLETENESS = 'KNOT_COMPLEXITY', 'EVIDENCE_COMPLETENESS'
+COMPLIANCE_STATUS, AUDIT_CLOSURE = 'COMPLIANCE_STATUS', 'AUDIT_CLOSURE'
+CRITERIA = [KNOT_COMPLEXITY, EVIDENCE_COMPLETENESS, COMPLIANCE_STATUS, AUDIT_CLOSURE]
+
+KNOTS, KNUS, EVIDENCE, MAPPINGS = 'knots', 'knus', 'evidence', 'mappings'
+SOURCE_NAMES = {'KNOTS.csv': KNOTS, 'KNU_PLAN.csv': KNUS, 'evidence_register.csv': EVIDENCE,
+                'clause_to_knu_matrix.csv': MAPPINGS}
+
+
+class TokenModelError(Exception):
+    pass
+
+
+class TokenModel:
+    """Weights and criterion parameters of token_distribution_model.yaml, in CRITERIA order."""
+
+    def __init__(self, weights, saturation, compliance_values, unit='TT'):
+        self.weights = weights
+        self.saturation = saturation
+        self.compliance_values = compliance_values
+        self.unit = unit
+
+    def parameters(self):
+        """The inputs of the feature values; the weights only enter at scoring time."""
+        return self.saturation, sorted(self.compliance_values.items())
+
+
+def load_model(path=MODEL_PATH):
+    data = load_yaml(path) or {}
+    basis = {}
+    for entry in data.get('distribution_basis') or []:
+        criterion = str((entry or {}).get('criterion'))
+        if criterion not in CRITERIA:
+            raise TokenModelError(f'{relpath(path)}: no implementation for criterion {criterion}')
+        basis[criterion] = entry
+    try:
+        weights = [float(basis.get(c, {}).get('weight') or 0) for c in CRITERIA]
+        saturation = float(basis.get(KNOT_COMPLEXITY, {}).get('saturation') or 1)
+        values = {str(k): float(v) for k, v in (basis.get(COMPLIANCE_STATUS, {}).get('values') or {}).items()}
+    except (TypeError, ValueError, AttributeError) as e:
+        raise TokenModelError(f'{relpath(path)}: {e}') from e
+    return TokenModel(weights, saturation, values, str((data.get('token_model') or {}).get('unit') or 'TT'))
+
+
+def source_kind(rel):
+    name = rel.rsplit('/', 1)[-1]
+    if name in SOURCE_NAMES:
+        return SOURCE_NAMES[name]
+    return NCRS if kpi_source_kind(rel) == NCRS else None
+
+
+class Distribution:
+    """Scores and shares of one weight vector, indexable by engine slot."""
+
+    def __init__(self, weights, scores, shares, total, ids):
+        self.weights = weights
+        self.scores = scores
+        self.shares = shares
+        self.total = total
+        self.ids = ids
+
+    def rank(self, slot):
+        knot_id = self.ids[slot]
+        return -self.scores[slot], knot_id is None, knot_id or ''
+
+    def top(self, n):
+        """Slots of the n highest scores, best first; equal scores in KNOT ID order, free slots last."""
+        if numpy is not None and isinstance(self.scores, numpy.ndarray):
+            n = min(n, len(self.scores))
+            if n <= 0:
+                return []
+            cutoff = numpy.partition(self.scores, len(self.scores) - n)[len(self.scores) - n]
+            return sorted(map(int, numpy.flatnonzero(self.scores >= cutoff)), key=self.rank)[:n]
+        return heapq.nsmallest(n, range(len(self.scores)), key=self.rank)
+
+
+class TokenEngine:
+    """Per-file contributions and the per-KNOT feature matrix they determine."""
+
+    def __init__(self, root=REPO_ROOT):
+        self.version = ENGINE_VERSION
+        self.root = root
+        self.parameters = None
+        self.saturation = 1.0
+        self.compliance_values = {}
+        self.sources = {}
+        self.knot_rows = {}       # knot_id -> {rel: (compliance_status, bucket)}
+        self.knot_knus = {}       # knot_id -> {knu_id: rows}
+        self.knu_knots = {}       # knu_id -> {knot_id: rows}
+        self.knot_clauses = {}    # knot_id -> clause mapping rows
+        self.knu_oids = {}        # knu_id -> {oid: refs}
+        self.oid_knus = {}        # oid -> {knu_id: refs}
+        self.registered = {}      # oid -> evidence register rows
+        self.register_knus = {}   # knu_id -> evidence register rows naming it
+        self.ncr_records = {}     # ncr key -> {rel: (status, bucket, standalone)}
+        self.bucket_ncrs = {}     # bucket -> {'ncrs': n, 'closed': n}
+        # Feature matrix: one slot per KNOT, freed slots are all-zero rows.
+        self.ids = []
+        self.slots = {}
+        self.free = []
+        self.complexity = array('d')
+        self.evidence = array('d')
+        self.compliance = array('d')
+        self.bucket_codes = array('q')
+        self.buckets = {None: 0}
+        self.bucket_keys = [None]
+        self.closure = array('d', [0.0])
+        self.dirty = False
+
+    # -- model ---------------------------------------------------------------
+
+    def set_model(self, model):
+        """Adopt the model's criterion parameters, recomputing every KNOT row when they changed."""
+        if model.parameters() == self.parameters:
+            return
+        self.parameters = model.parameters()
+        self.saturation = model.saturation
+        self.compliance_values = dict(model.compliance_values)
+        for knot_id in list(self.slots):
+            self.update_knot(knot_id)
+        self.dirty = True
+
+    # -- reading -------------------------------------------------------------
+
+    def discover(self):
+        found = {}
+        for dirpath, _dirnames, filenames in walk_repo(self.root):
+            for f in filenames:
+                filepath = os.path.join(dirpath, f)
+                rel = relpath(filepath, self.root)
+                if source_kind(rel):
+                    found[rel] = filepath
+        return found
+
+    def read_source(self, rel, filepath, registry):
+        """Return the contribution of one source file."""
+        kind = source_kind(rel)
+        bucket = path_bucket(rel)
+        if kind == KNOTS:
+            knots = [(knot_id.strip(), (status or '').strip())
+                     for _line, knot_id, status in registry.select(filepath, ['knot_id', 'compliance_status'])
+                     if (knot_id or '').strip()]
+            return {'kind': kind, 'bucket': bucket, 'knots': knots}
+        if kind == KNUS:
+            knus = {}
+            for _line, knu_id, knot_ref, refs in registry.select(filepath, ['knu_id', 'knot_ref', 'evidence_refs']):
+                knu_id = (knu_id or '').strip()
+                if knu_id:
+                    knots, oids = knus.setdefault(knu_id, ([], []))
+                    knots.extend(split_multi(knot_ref))
+                    oids.extend(split_multi(refs))
+            return {'kind': kind, 'knus': knus}
+        if kind == EVIDENCE:
+            oids, knus = [], []
+            for _line, oid, knu_ref in registry.select(filepath, ['oid', 'knu_ref']):
+                if (oid or '').strip():
+                    oids.append(oid.strip())
+                knus.extend(split_multi(knu_ref))
+            return {'kind': kind, 'oids': oids, 'knus': knus}
+        if kind == MAPPINGS:
+            knots = []
+            for _line, knot_ref in registry.select(filepath, ['knot_ref']):
+                knots.extend(split_multi(knot_ref))
+            return {'kind': kind, 'knots': knots}
+        return {'kind': kind, 'ncrs': read_ncrs(rel, filepath, bucket)}
+
+    # -- indices -------------------------------------------------------------
+
+    def affected(self, contribution):
+        """Return the (KNOT IDs, NCR keys) whose feature values a source reaches under the current indices."""
+        kind = contribution['kind']
+        if kind == KNOTS:
+            return {knot_id for knot_id, _status in contribution['knots']}, set()
+        if kind == MAPPINGS:
+            return set(contribution['knots']), set()
+        if kind == NCRS:
+            return set(), {ncr[0] for ncr in contribution['ncrs']}
+        if kind == KNUS:
+            knus = set(contribution['knus'])
+        else:
+            knus = set(contribution['knus'])
+            for oid in contribution['oids']:
+                knus.update(self.oid_knus.get(oid, ()))
+        knots = set()
+        for knu_id in knus:
+            knots.update(self.knu_knots.get(knu_id, ()))
+        if kind == KNUS:
+            for knots_refs, _oids in contribution['knus'].values():
+                knots.update(knots_refs)
+        return knots, set()
+
+    def index(self, rel, contribution, sign):
+        """Add (sign=1) or remove (sign=-1) one source's entries in the shared indices."""
+        kind = contribution['kind']
+        if kind == KNOTS:
+            for knot_id, status in contribution['knots']:
+                rows = self.knot_rows.setdefault(knot_id, {})
+                if sign > 0:
+                    rows.setdefault(rel, (status, contribution['bucket']))
+                else:
+                    rows.pop(rel, None)
+                if not rows:
+                    del self.knot_rows[knot_id]
+        elif kind == KNUS:
+            for knu_id, (knots, oids) in contribution['knus'].items():
+                for knot_id in knots:
+                    adjust_nested(self.knot_knus, knot_id, knu_id, sign)
+                    adjust_nested(self.knu_knots, knu_id, knot_id, sign)
+                for oid in oids:
+                    adjust_nested(self.knu_oids, knu_id, oid, sign)
+                    adjust_nested(self.oid_knus, oid, knu_id, sign)
+        elif kind == EVIDENCE:
+            for oid in contribution['oids']:
+                adjust(self.registered, oid, sign)
+            for knu_id in contribution['knus']:
+                adjust(self.register_knus, knu_id, sign)
+        elif kind == MAPPINGS:
+            for knot_id in contribution['knots']:
+                adjust(self.knot_clauses, knot_id, sign)
+        else:
+            for key, status, bucket, standalone in contribution['ncrs']:
+                records = self.ncr_records.setdefault(key, {})
+                if sign > 0:
+                    records.setdefault(rel, (status, bucket, standalone))
+                else:
+                    records.pop(rel, None)
+                if not records:
+                    del self.ncr_records[key]
+
+    def add_ncr(self, key, sign):
+        """Count (sign=1) or uncount one NCR in its bucket; return the bucket or None."""
+        records = self.ncr_records.get(key)
+        if not records:
+            return None
+        rel = min(records, key=lambda r: (not records[r][2], r))
+        status, bucket, _standalone = records[rel]
+        counts = self.bucket_ncrs.setdefault(bucket, {})
+        adjust(counts, 'ncrs', sign)
+        adjust(counts, 'closed', sign * int(status in NCR_CLOSED_STATUSES))
+        if not counts:
+            del self.bucket_ncrs[bucket]
+        return bucket
+
+    # -- feature matrix ------------------------------------------------------
+
+    def bucket_code(self, bucket):
+        code = self.buckets.get(bucket)
+        if code is None:
+            code = self.buckets[bucket] = len(self.bucket_keys)
+            self.bucket_keys.append(bucket)
+            self.closure.append(0.0)
+            self.update_closure(bucket)
+        return code
+
+    def update_closure(self, bucket):
+        code = self.buckets.get(bucket)
+        if code:
+            counts = self.bucket_ncrs.get(bucket, {})
+            total = counts.get('ncrs', 0)
+            self.closure[code] = counts.get('closed', 0) / total if total else 1.0
+
+    def knu_evidenced(self, knu_id):
+        if self.register_knus.get(knu_id):
+            return True
+        return any(oid in self.registered for oid in self.knu_oids.get(knu_id, ()))
+
+    def update_knot(self, knot_id):
+        """Recompute the feature row of one KNOT, allocating or freeing its slot."""
+        rows = self.knot_rows.get(knot_id)
+        slot = self.slots.get(knot_id)
+        if not rows:
+            if slot is not None:
+                del self.slots[knot_id]
+                self.ids[slot] = None
+                self.free.append(slot)
+                self.set_row(slot, 0.0, 0.0, 0.0, 0)
+            return
+        if slot is None:
+            slot = self.slots[knot_id] = self.free.pop() if self.free else self.new_slot()
+            self.ids[slot] = knot_id
+        status, bucket = rows[min(rows)]
+        knus = self.knot_knus.get(knot_id, {})
+        planned = len(knus) + self.knot_clauses.get(knot_id, 0)
+        complexity = min(1.0, planned / self.saturation) if self.saturation > 0 else float(planned > 0)
+        evidence = sum(map(self.knu_evidenced, knus)) / len(knus) if knus else 0.0
+        self.set_row(slot, complexity, evidence, self.compliance_values.get(status, 0.0), self.bucket_code(bucket))
+
+    def new_slot(self):
+        self.ids.append(None)
+        for column in (self.complexity, self.evidence, self.compliance):
+            column.append(0.0)
+        self.bucket_codes.append(0)
+        return len(self.ids) - 1
+
+    def set_row(self, slot, complexity, evidence, compliance, code):
+        self.complexity[slot] = complexity
+        self.evidence[slot] = evidence
+        self.compliance[slot] = compliance
+        self.bucket_codes[slot] = code
+
+    # -- refresh -------------------------------------------------------------
+
+    def refresh(self, paths=None, registry=None):
+        """Bring the feature matrix in line with the tree; return the number of files re-read.
+
+        With paths, only those files are examined (and re-read even when their
+        signature looks unchanged); otherwise the tree is walked and every
+        source whose signature changed is re-read.
+        """
+        own_registry = registry is None
+        registry = registry or Registry(self.root)
+        if paths is None:
+            found = self.discover()
+            candidates = set(found) | set(self.sources)
+        else:
+            candidates = {relpath(os.path.abspath(p), self.root) for p in paths}
+            candidates = {rel for rel in candidates if source_kind(rel) and not rel.startswith('../')}
+            found = {rel: os.path.join(self.root, rel) for rel in candidates
+                     if os.path.isfile(os.path.join(self.root, rel))}
+
+        changes = []
+        for rel in sorted(candidates):
+            filepath = found.get(rel)
+            previous = self.sources.get(rel)
+            sig = file_signature(filepath) if filepath else None
+            if previous is not None and previous['signature'] == sig and paths is None:
+                continue
+            if previous is None and filepath is None:
+                continue
+            new = self.read_source(rel, filepath, registry) if filepath else None
+            changes.append((rel, sig, previous, new))
+        if own_registry:
+            registry.close()
+        if not changes:
+            return 0
+
+        # A KNOT is reached through the indices as they stand before the
+        # change (a KNU that no longer names it) and after it (one that now does).
+        knots, ncrs = set(), set()
+
+        def collect():
+            for _rel, _sig, previous, new in changes:
+                for contribution in (previous, new):
+                    if contribution is not None:
+                        more_knots, more_ncrs = self.affected(contribution)
+                        knots.update(more_knots)
+                        ncrs.update(more_ncrs)
+
+        collect()
+        buckets = {self.add_ncr(key, -1) for key in ncrs}
+        for rel, sig, previous, new in changes:
+            if previous is not None:
+                self.index(rel, previous, -1)
+                del self.sources[rel]
+            if new is not None:
+                new['signature'] = sig
+                self.index(rel, new, 1)
+                self.sources[rel] = new
+        collect()
+        buckets.update(self.add_ncr(key, 1) for key in ncrs)
+        for bucket in buckets:
+            self.update_closure(bucket)
+        for knot_id in knots:
+            self.update_knot(knot_id)
+        self.dirty = True
+        return len(changes)
+
+    # -- scoring -------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.slots)
+
+    def knot_ids(self):
+        return sorted(self.slots)
+
+    def bucket(self, slot):
+        return self.bucket_keys[self.bucket_codes[slot]]
+
+    def features(self, slot):
+        """The criterion values of one slot, in CRITERIA order."""
+        return (self.complexity[slot], self.evidence[slot], self.compliance[slot],
+                self.closure[self.bucket_codes[slot]])
+
+    def distribute(self, weight_sets):
+        """Return one Distribution per weight vector (CRITERIA order), all scored in one pass.
+
+        A KNOT's share is its score over the portfolio total; every share is 0
+        when the total is.
+        """
+        weight_sets = [list(map(float, weights)) for weights in weight_sets]
+        if not weight_sets:
+            return []
+        if numpy is not None:
+            return self.distribute_numpy(weight_sets)
+        audit = array('d', map(self.closure.__getitem__, self.bucket_codes))
+        columns = (self.complexity, self.evidence, self.compliance, audit)
+        distributions = []
+        for weights in weight_sets:
+            a, b, c, d = weights
+            scores = array('d', [a * w + b * x + c * y + d * z for w, x, y, z in zip(*columns)])
+            total = sum(scores)
+            shares = array('d', [s / total for s in scores]) if total else array('d', bytes(len(scores) * 8))
+            distributions.append(Distribution(weights, scores, shares, total, self.ids))
+        return distributions
+
+    def distribute_numpy(self, weight_sets):
+        features = numpy.empty((len(CRITERIA), len(self.ids)))
+        for row, column in enumerate((self.complexity, self.evidence, self.compliance)):
+            features[row] = numpy.frombuffer(column, dtype=numpy.float64)
+        closure = numpy.frombuffer(self.closure, dtype=numpy.float64)
+        features[3] = closure[numpy.frombuffer(self.bucket_codes, dtype=numpy.int64)]
+        scores = numpy.asarray(weight_sets) @ features
+        totals = scores.sum(axis=1)
+        shares = numpy.divide(scores, totals[:, None], out=numpy.zeros_like(scores), where=totals[:, None] != 0)
+        return [Distribution(weights, scores[i], shares[i], float(totals[i]), self.ids)
+                for i, weights in enumerate(weight_sets)]
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path=ENGINE_PATH):
+        if not self.dirty:
+            return
+        self.dirty = False
+        atomic_write(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_engine(root=REPO_ROOT, path=ENGINE_PATH):
+    """Return the persisted engine, or an empty one when there is none for this root and version.
+
+    Call set_model() and refresh() on it before use; an empty engine (no
+    sources) needs a whole-tree refresh.
+    """
+    try:
+        with open(path, 'rb') as f:
+            engine = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        engine = None
+    if not isinstance(engine, TokenEngine) or getattr(engine, 'version', None) != ENGINE_VERSION \
+            or engine.root != root:
+        engine = TokenEngine(root)
+    return engine
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+trace_graph.py — AEROSPACEMODEL traceability graph
+Path: 02_LIFECYCLE_OS/lib/trace_graph.py
+Authority: ASIT
+
+Adjacency-indexed clause -> KNOT -> KNU -> evidence graph built from
+KNOTS.csv, KNU_PLAN.csv, evidence_register.csv, clause_to_knu_matrix.csv and
+cross_standard_trace.csv. Nodes are named by their ID; clauses are named
+'<standard> <clause_id>' (clause_refs values in KNOTS.csv are used as given).
+
+Edges are remembered per source file with reference counts, so refresh()
+re-reads only files whose signature changed and removes exactly the edges
+they used to contribute. Forward and reverse closures are memoized in a
+bounded LRU; after a refresh only the cached closures that contain a changed
+edge's endpoint are dropped. The whole graph, closures included, is
+persisted under .aerospacemodel_cache so the next process starts warm.
+"""
+
+import os
+import pickle
+from collections import OrderedDict, deque
+
+from fileio import CACHE_DIR, atomic_write, file_signature, relpath
+from records import split_multi
+from registry_snapshot import Registry
+from repo_walk import walk_repo
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+GRAPH_PATH = os.path.join(CACHE_DIR, 'trace_graph.pickle')
+GRAPH_VERSION = 1
+CLOSURE_CACHE_SIZE = 1024
+
+CLAUSE, KNOT, KNU, EVIDENCE = 'clause', 'knot', 'knu', 'evidence'
+KINDS = [CLAUSE, KNOT, KNU, EVIDENCE]
+
+# (source filename, from kind, from columns, to kind, to columns). Several
+# columns are joined with a space into one name; a single column is split
+# on ';' as a multi-value field.
+EDGE_SPECS = [
+    ('KNOTS.csv', CLAUSE, ['clause_refs'], KNOT, ['knot_id']),
+    ('KNOTS.csv', KNOT, ['knot_id'], KNU, ['knu_refs']),
+    ('KNU_PLAN.csv', KNOT, ['knot_ref'], KNU, ['knu_id']),
+    ('KNU_PLAN.csv', KNU, ['knu_id'], EVIDENCE, ['evidence_refs']),
+    ('evidence_register.csv', KNOT, ['knot_ref'], EVIDENCE, ['oid']),
+    ('evidence_register.csv', KNU, ['knu_ref'], EVIDENCE, ['oid']),
+    ('clause_to_knu_matrix.csv', CLAUSE, ['standard', 'clause_id'], KNOT, ['knot_ref']),
+    ('clause_to_knu_matrix.csv', CLAUSE, ['standard', 'clause_id'], KNU, ['knu_ref']),
+    ('cross_standard_trace.csv', CLAUSE, ['source_standard', 'source_clause'], CLAUSE, ['target_standard', 'target_clause']),
+]
+SOURCE_FILES = sorted({spec[0] for spec in EDGE_SPECS})
+
+
+def node_names(values):
+    """Names referenced by one column group of a row."""
+    if len(values) > 1:
+        parts = [(v or '').strip() for v in values]
+        return [' '.join(parts)] if all(parts) else []
+    return split_multi(values[0])
+
+
+class TraceGraph:
+    """Reference-counted forward/reverse adjacency over named trace nodes."""
+
+    def __init__(self, root=REPO_ROOT):
+        self.version = GRAPH_VERSION
+        self.root = root
+        self.index = {}
+        self.names = []
+        self.kinds = []
+        self.forward = []
+        self.reverse = []
+        self.sources = {}
+        self.closures = OrderedDict()
+        self.dirty = False
+
+    # -- construction --------------------------------------------------------
+
+    def node(self, name, kind):
+        i = self.index.get(name)
+        if i is None:
+            i = len(self.names)
+            self.index[name] = i
+            self.names.append(name)
+            self.kinds.append(kind)
+            self.forward.append({})
+            self.reverse.append({})
+        return i
+
+    def add_edge(self, src, dst):
+        out, inc = self.forward[src], self.reverse[dst]
+        out[dst] = out.get(dst, 0) + 1
+        inc[src] = inc.get(src, 0) + 1
+
+    def remove_edge(self, src, dst):
+        out, inc = self.forward[src], self.reverse[dst]
+        if out[dst] == 1:
+            del out[dst]
+            del inc[src]
+        else:
+            out[dst] -= 1
+            inc[src] -= 1
+
+    def read_edges(self, filepath, registry):
+        """Return the [(src, dst), ...] node-id pairs one source file contributes."""
+        edges = []
+        name = os.path.basename(filepath)
+        for _filename, src_kind, src_columns, dst_kind, dst_columns in (s for s in EDGE_SPECS if s[0] == name):
+            split = len(src_columns)
+            for values in registry.select(filepath, src_columns + dst_columns):
+                srcs = node_names(values[1:split + 1])
+                dsts = node_names(values[split + 1:])
+                for src in srcs:
+                    s = self.node(src, src_kind)
+                    edges.extend((s, self.node(dst, dst_kind)) for dst in dsts)
+        return edges
+
+    def discover(self):
+        found = {}
+        for dirpath, _dirnames, filenames in walk_repo(self.root):
+            for f in filenames:
+                if f in SOURCE_FILES:
+                    filepath = os.path.join(dirpath, f)
+                    found[relpath(filepath, self.root)] = filepath
+        return found
+
+    def refresh(self, registry=None):
+        """Bring the graph in line with the tree; return the number of files re-read."""
+        registry = registry or Registry(self.root)
+        found = self.discover()
+        touched_src, touched_dst = set(), set()
+        reread = 0
+        for rel in [r for r in self.sources if r not in found]:
+            for s, d in self.sources.pop(rel)['edges']:
+                self.remove_edge(s, d)
+                touched_src.add(s)
+                touched_dst.add(d)
+        for rel, filepath in sorted(found.items()):
+            sig = file_signature(filepath)
+            previous = self.sources.get(rel)
+            if previous is not None and previous['signature'] == sig:
+                continue
+            old = previous['edges'] if previous else []
+            new = self.read_edges(filepath, registry)
+            for s, d in old:
+                self.remove_edge(s, d)
+            for s, d in new:
+                self.add_edge(s, d)
+            for s, d in set(old).symmetric_difference(new):
+                touched_src.add(s)
+                touched_dst.add(d)
+            self.sources[rel] = {'signature': sig, 'edges': new}
+            reread += 1
+        if reread or touched_src:
+            self.dirty = True
+        self.invalidate(touched_src, touched_dst)
+        return reread
+
+    def invalidate(self, sources, targets):
+        """Drop memoized closures that an edge change between sources and targets can alter.
+
+        A forward closure changes only if it reaches a changed edge's source;
+        a reverse closure only if it reaches a changed edge's target.
+        """
+        if not sources and not targets:
+            return
+        for key in list(self.closures):
+            start, reverse = key
+            hits = targets if reverse else sources
+            if start in hits or not hits.isdisjoint(self.closures[key]):
+                del self.closures[key]
+
+    # -- queries -------------------------------------------------------------
+
+    def lookup(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index.get(' '.join(name.split()))
+        return i
+
+    def closure(self, start, reverse=False):
+        """Return the frozenset of node ids reachable from start (excluding start)."""
+        key = (start, reverse)
+        cached = self.closures.get(key)
+        if cached is not None:
+            self.closures.move_to_end(key)
+            return cached
+        adjacency = self.reverse if reverse else self.forward
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for nxt in adjacency[queue.popleft()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        seen.discard(start)
+        result = frozenset(seen)
+        self.closures[key] = result
+        if len(self.closures) > CLOSURE_CACHE_SIZE:
+            self.closures.popitem(last=False)
+        self.dirty = True
+        return result
+
+    def reachable(self, name, reverse=False):
+        """Return {kind: [names]} reachable from name, or None if name is not in the graph."""
+        start = self.lookup(name)
+        if start is None:
+            return None
+        grouped = {kind: [] for kind in KINDS}
+        for i in self.closure(start, reverse):
+            grouped[self.kinds[i]].append(self.names[i])
+        return {kind: sorted(names) for kind, names in grouped.items()}
+
+    def impacted_by(self, name):
+        """Everything downstream of name, e.g. what a clause change impacts."""
+        return self.reachable(name)
+
+    def supports(self, name):
+        """Everything upstream of name, e.g. the clauses an evidence OID supports."""
+        return self.reachable(name, reverse=True)
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path=GRAPH_PATH):
+        if not self.dirty:
+            return
+        self.dirty = False
+        atomic_write(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_graph(root=REPO_ROOT, path=GRAPH_PATH, registry=None):
+    """Return the persisted graph refreshed against the tree, or a freshly built one."""
+    graph = None
+    try:
+        with open(path, 'rb') as f:
+            graph = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        graph = None
+    if not isinstance(graph, TraceGraph) or getattr(graph, 'version', None) != GRAPH_VERSION \
+            or graph.root != root:
+        graph = TraceGraph(root)
+    graph.refresh(registry)
+    return graph
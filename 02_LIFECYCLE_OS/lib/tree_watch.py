@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+tree_watch.py — AEROSPACEMODEL repository change watcher
+Path: 02_LIFECYCLE_OS/lib/tree_watch.py
+Authority: ASIT
+
+Reports which files under the repository changed since the last call.
+On Linux the watcher uses inotify through ctypes: one watch per directory
+(ignored directories are pruned as in repo_walk), new directories are
+watched as they appear, and the descriptor can be passed to select(). Where
+inotify is unavailable, or with polling=True, the watcher compares
+(mtime_ns, size) signatures of every file on each call instead.
+
+changes() returns a set of absolute paths, or None when events were lost
+(inotify queue overflow) and the caller must rescan the whole tree. A
+directory that was deleted or moved away is reported as its path with a
+trailing separator, standing for every file that was under it.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+
+from fileio import file_signature
+from repo_walk import IGNORED_DIRS, iter_files, walk_repo
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+READ_SIZE = 64 * 1024
+
+
+def is_ignored_dir(name):
+    return name in IGNORED_DIRS or name.endswith('.egg-info')
+
+
+class PollingWatcher:
+    """Signature comparison over a full walk; fileno() is None, so callers poll on a timer."""
+
+    def __init__(self, root):
+        self.root = root
+        self.signatures = self.scan()
+
+    def scan(self):
+        return {path: file_signature(path) for path in iter_files(self.root)}
+
+    def fileno(self):
+        return None
+
+    def changes(self):
+        current = self.scan()
+        previous, self.signatures = self.signatures, current
+        changed = {path for path, sig in current.items() if previous.get(path) != sig}
+        changed.update(set(previous) - set(current))
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watch; raises OSError when inotify is not available."""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError(errno.ENOSYS, 'libc not found')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify not available')
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self.watches = {}
+        try:
+            for dirpath, _dirnames, _filenames in walk_repo(root):
+                self.add_watch(dirpath)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, dirpath):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f'inotify_add_watch failed for {dirpath}')
+        self.watches[wd] = dirpath
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self):
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                return data
+            if not chunk:
+                return data
+            data += chunk
+
+    def changes(self):
+        data = self.read_events()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            dirpath = self.watches.get(wd)
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if dirpath is None or not name:
+                continue
+            path = os.path.join(dirpath, name)
+            if mask & IN_ISDIR:
+                if is_ignored_dir(name):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land in a new directory before its watch exists.
+                    for sub, _dirnames, _filenames in walk_repo(path):
+                        self.add_watch(sub)
+                    changed.update(iter_files(path))
+                else:
+                    changed.add(path + os.sep)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(root, polling=False):
+    """Return an InotifyWatcher for root, or a PollingWatcher when polling or inotify is unavailable."""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+validation_cache.py — AEROSPACEMODEL persistent validation cache
+Path: 02_LIFECYCLE_OS/lib/validation_cache.py
+Authority: ASIT
+
+Per-validator cache of file results keyed by path and content hash. A file
+whose (mtime, size) signature is unchanged is a hit without being read; on a
+signature change the content is hashed and only re-validated when the hash
+differs. The whole cache is discarded when the validator's rule fingerprint
+changes, e.g. after an edit to a record schema or the controlled vocabulary.
+"""
+
+import hashlib
+import json
+import os
+
+from fileio import CACHE_DIR, atomic_write, content_hash, file_signature
+from findings import Finding
+from instrumentation import count
+
+CACHE_VERSION = 2
+MAX_CACHED_FINDINGS = 10000
+VALIDATION_CACHE_DIR = os.path.join(CACHE_DIR, 'validation')
+
+
+def rules_fingerprint(*parts):
+    """Hash the rule definitions of a validator.
+
+    Strings naming existing files (typically the validator's own __file__
+    and any schema it reads) contribute their content; every other part
+    contributes its repr.
+    """
+    h = hashlib.sha256(str(CACHE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, str) and os.path.isfile(part):
+            with open(part, 'rb') as f:
+                h.update(f.read())
+        else:
+            h.update(repr(part).encode('utf-8'))
+    return h.hexdigest()
+
+
+class ValidationCache:
+    """Replayable per-file findings and summary facts for one validator."""
+
+    def __init__(self, name, fingerprint, cache_dir=VALIDATION_CACHE_DIR):
+        self.path = os.path.join(cache_dir, f'{name}.json')
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('fingerprint') == fingerprint:
+            self.entries = data.get('entries', {})
+
+    def lookup(self, filepath):
+        """Return the cached {'findings', 'facts'} entry for filepath, or None on a miss."""
+        sig = file_signature(filepath)
+        entry = self.entries.get(filepath)
+        if entry and sig is not None and entry['signature'] == sig:
+            self.hits += 1
+            count('validation_cache_hits')
+            return entry
+        digest = content_hash(filepath) if sig is not None else None
+        if entry and digest is not None and entry['sha256'] == digest:
+            entry['signature'] = sig
+            self.dirty = True
+            self.hits += 1
+            count('validation_cache_hits')
+            return entry
+        self.pending[filepath] = (sig, digest)
+        self.misses += 1
+        count('validation_cache_misses')
+        return None
+
+    def store(self, filepath, findings, facts=None):
+        sig, digest = self.pending.pop(filepath, (None, None))
+        if sig is None:
+            sig = file_signature(filepath)
+            digest = content_hash(filepath)
+        self.entries[filepath] = {'signature': sig, 'sha256': digest,
+                                  'findings': [list(f) for f in findings], 'facts': facts or {}}
+        self.dirty = True
+
+    def discard(self, filepath):
+        self.pending.pop(filepath, None)
+
+    def save(self):
+        for filepath in [p for p in self.entries if not os.path.exists(p)]:
+            del self.entries[filepath]
+            self.dirty = True
+        if not self.dirty:
+            return
+        atomic_write(self.path, json.dumps({'fingerprint': self.fingerprint, 'entries': self.entries}))
+        self.dirty = False
+
+
+def cached_findings(cache, filepath, check):
+    """Yield the findings of check(filepath) through cache and return its summary facts.
+
+    check is a generator function yielding Finding records and returning the
+    file's facts. A file is only stored once it has been read to the end and
+    produced at most MAX_CACHED_FINDINGS findings, so an early stop or a
+    pathological file never costs unbounded memory.
+    """
+    if cache is None:
+        return (yield from check(filepath))
+    entry = cache.lookup(filepath)
+    if entry is not None:
+        return (yield from replay(entry))
+    return (yield from stored_findings(cache, filepath, check(filepath)))
+
+
+def replay(entry):
+    """Yield the findings of a cache entry and return its facts."""
+    for f in entry['findings']:
+        yield Finding(*f)
+    return entry['facts']
+
+
+def stored_findings(cache, filepath, findings):
+    """Pass the findings generator of a cache miss through, storing them with its facts when it completes."""
+    collected = []
+    facts = yield from _collect(findings, collected)
+    if len(collected) <= MAX_CACHED_FINDINGS:
+        cache.store(filepath, collected, facts)
+    else:
+        cache.discard(filepath)
+    return facts
+
+
+def _collect(findings, collected):
+    try:
+        while True:
+            try:
+                finding = next(findings)
+            except StopIteration as stop:
+                return stop.value
+            if len(collected) <= MAX_CACHED_FINDINGS:
+                collected.append(finding)
+            yield finding
+    finally:
+        findings.close()
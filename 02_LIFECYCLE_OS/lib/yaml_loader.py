@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+yaml_loader.py — AEROSPACEMODEL YAML loading
+Path: 02_LIFECYCLE_OS/lib/yaml_loader.py
+Authority: ASIT
+
+Single entry point for reading YAML. Documents are parsed with libyaml's
+CSafeLoader when PyYAML was built with it and with the pure-Python
+SafeLoader otherwise. Parsed documents are pickled under
+.aerospacemodel_cache/yaml, keyed by the sha256 of the file content, so a
+model or ruleset that has not changed is unpickled instead of re-parsed by
+every process. Parse errors are raised as YamlLoadError carrying the file
+and line.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+
+from fileio import CACHE_DIR, atomic_write
+from instrumentation import PARSE, count, phase, record_file
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+YAML_CACHE_DIR = os.path.join(CACHE_DIR, 'yaml')
+YAML_CACHE_VERSION = 1
+
+if yaml is not None:
+    SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    LOADER_NAME = f'{SafeLoader.__name__}/{yaml.__version__}'
+else:
+    SafeLoader = None
+    LOADER_NAME = None
+
+
+class YamlLoadError(ValueError):
+    """A YAML file that could not be parsed; .file and .line (1-based, or None) locate it."""
+
+    def __init__(self, filepath, line, message):
+        self.file = filepath
+        self.line = line
+        self.message = message
+        location = f'{filepath}:{line}' if line is not None else filepath
+        super().__init__(f'{location}: {message}')
+
+
+def _cache_key(data, multi):
+    h = hashlib.sha256(f'{YAML_CACHE_VERSION}:{LOADER_NAME}:{int(multi)}:'.encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+def _parse(filepath, data, multi):
+    if yaml is None:
+        raise YamlLoadError(filepath, None, 'PyYAML is not available')
+    try:
+        stream = io.StringIO(data.decode('utf-8'))
+        stream.name = filepath
+        if multi:
+            return list(yaml.load_all(stream, Loader=SafeLoader))
+        return yaml.load(stream, Loader=SafeLoader)
+    except UnicodeDecodeError as e:
+        raise YamlLoadError(filepath, None, f'not UTF-8: {e}') from e
+    except yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None) or getattr(e, 'context_mark', None)
+        line = mark.line + 1 if mark is not None else None
+        raise YamlLoadError(filepath, line, ' '.join(str(e).split())) from e
+    except ValueError as e:
+        # Constructors raise plain ValueError, e.g. for a date like 2026-13-01.
+        raise YamlLoadError(filepath, None, str(e)) from e
+
+
+def _load(filepath, multi, cache):
+    with phase(PARSE, filepath):
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        record_file(filepath, bytes_read=len(data))
+        if not cache:
+            return _parse(filepath, data, multi)
+        cached = os.path.join(YAML_CACHE_DIR, _cache_key(data, multi) + '.pickle')
+        try:
+            with open(cached, 'rb') as f:
+                document = pickle.load(f)
+            count('yaml_cache_hits')
+            return document
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+        count('yaml_cache_misses')
+        document = _parse(filepath, data, multi)
+    try:
+        atomic_write(cached, pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL))
+    except (OSError, pickle.PicklingError):
+        pass
+    return document
+
+
+def load_yaml(filepath, cache=True):
+    """Return the single document in filepath (None for an empty file)."""
+    return _load(filepath, False, cache)
+
+
+def load_yaml_all(filepath, cache=True):
+    """Return the list of documents in a multi-document YAML file."""
+    return _load(filepath, True, cache)
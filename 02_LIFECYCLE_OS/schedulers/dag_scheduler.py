@@ -3,46 +3,370 @@
 dag_scheduler.py — AEROSPACEMODEL DAG-based lifecycle scheduler
 Path: 02_LIFECYCLE_OS/schedulers/dag_scheduler.py
 Authority: ASIT
+Usage: python3 dag_scheduler.py [--knu] [--variant <FAMILY>/<VARIANT>] [--default-duration DAYS] [--json <OUTPUT>]
+
+Without --knu, prints the phase execution order and the parallel waves of
+dependency_rules.yaml. With --knu, the phase graph is expanded for every
+variant under 04_PRODUCTS into a KNU-level graph: each KNU depends on the
+completion gate of every phase its own phase depends on, and each phase gate
+depends on the KNUs of that phase. KNU durations come from the
+KNU_PLAN.csv start_date/end_date (inclusive days) and a KNU never starts
+before its planned start_date. Critical path and slack are then computed with
+a forward and a backward pass, linear in nodes plus edges.
+
+All graph traversals are iterative; cycles are reported with their members.
 """
 
-import yaml
+import argparse
+import datetime
+import heapq
+import json
 import os
+import re
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 DEPENDENCY_RULES = os.path.join(os.path.dirname(__file__), 'dependency_rules.yaml')
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import select_rows  # noqa: E402
+from registry_snapshot import Registry  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+from yaml_loader import load_yaml  # noqa: E402
+
+PRODUCTS_ROOT = os.path.join(REPO_ROOT, '04_PRODUCTS')
+LC_PHASE_DIR_PATTERN = re.compile(r'^(LC\d{2})_[A-Z_]+$')
+DEFAULT_KNU_DURATION = 1
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a dependency graph contains cycles; .cycles lists their members."""
+
+    def __init__(self, cycles):
+        self.cycles = cycles
+        super().__init__('dependency cycle(s): ' + '; '.join(' -> '.join(c) for c in cycles))
 
 
 def load_rules():
-    with open(DEPENDENCY_RULES, encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    return load_yaml(DEPENDENCY_RULES)
+
+
+def strongly_connected_components(nodes, dependencies):
+    """Iterative Tarjan SCC over nodes with edges node -> dependency."""
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(dependencies.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(dependencies.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def find_cycles(nodes, dependencies):
+    """Return the member lists of every cycle (SCCs larger than one node, or self-loops)."""
+    order = {n: i for i, n in enumerate(nodes)}
+    cycles = []
+    for component in strongly_connected_components(nodes, dependencies):
+        if len(component) > 1 or component[0] in dependencies.get(component[0], ()):
+            cycles.append(sorted(component, key=lambda n: order.get(n, len(order))))
+    return cycles
+
+
+def _indegrees(nodes, dependencies):
+    indegree = {n: 0 for n in nodes}
+    dependents = {n: [] for n in nodes}
+    for node in nodes:
+        for dep in dependencies.get(node, ()):
+            if dep not in indegree:
+                raise ValueError(f'{node} depends on unknown node {dep}')
+            indegree[node] += 1
+            dependents[dep].append(node)
+    return indegree, dependents
 
 
 def topological_sort(phases, dependencies):
-    visited = set()
-    order = []
+    """Return phases ordered so every phase follows its dependencies.
+
+    Kahn's algorithm with ties broken by declaration order.
+    """
+    order = {n: i for i, n in enumerate(phases)}
+    indegree, dependents = _indegrees(phases, dependencies)
+    ready = [(order[n], n) for n in phases if indegree[n] == 0]
+    heapq.heapify(ready)
+    result = []
+    while ready:
+        _, node = heapq.heappop(ready)
+        result.append(node)
+        for child in dependents[node]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                heapq.heappush(ready, (order[child], child))
+    if len(result) != len(phases):
+        raise DependencyCycleError(find_cycles(phases, dependencies))
+    return result
+
+
+def parallel_waves(nodes, dependencies):
+    """Group nodes into waves; every node in a wave can run at the same time."""
+    order = {n: i for i, n in enumerate(nodes)}
+    indegree, dependents = _indegrees(nodes, dependencies)
+    wave = [n for n in nodes if indegree[n] == 0]
+    waves = []
+    while wave:
+        waves.append(wave)
+        following = []
+        for node in wave:
+            for child in dependents[node]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    following.append(child)
+        wave = sorted(following, key=order.__getitem__)
+    if sum(len(w) for w in waves) != len(nodes):
+        raise DependencyCycleError(find_cycles(nodes, dependencies))
+    return waves
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat((value or '').strip())
+    except ValueError:
+        return None
 
-    def visit(phase_id):
-        if phase_id in visited:
-            return
-        visited.add(phase_id)
-        for dep in dependencies.get(phase_id, []):
-            visit(dep)
-        order.append(phase_id)
 
-    for phase in phases:
-        visit(phase)
-    return order
+def discover_variant_plans(products_root=PRODUCTS_ROOT):
+    """Return {'<FAMILY>/<VARIANT>': {phase_code: KNU_PLAN.csv path}}."""
+    variants = {}
+    for dirpath, _dirnames, filenames in walk_repo(products_root):
+        match = LC_PHASE_DIR_PATTERN.match(os.path.basename(dirpath))
+        lifecycle_dir = os.path.dirname(dirpath)
+        if not match or 'KNU_PLAN.csv' not in filenames or os.path.basename(lifecycle_dir) != 'lifecycle':
+            continue
+        variant_dir = os.path.dirname(lifecycle_dir)
+        if os.path.basename(os.path.dirname(variant_dir)) != 'variants':
+            continue
+        family = os.path.basename(os.path.dirname(os.path.dirname(variant_dir)))
+        key = f'{family}/{os.path.basename(variant_dir)}'
+        variants.setdefault(key, {})[match.group(1)] = os.path.join(dirpath, 'KNU_PLAN.csv')
+    return variants
+
+
+def build_knu_graph(phase_dependencies, variant_plans, default_duration=DEFAULT_KNU_DURATION, registry=None):
+    """Expand the phase graph into a KNU-level graph for every variant.
+
+    Returns (nodes, dependencies, info, warnings). Gate nodes are named
+    '<variant>:<LCxx>:GATE' and have zero duration. KNU_PLAN.csv rows are
+    read through registry when given, so a current snapshot is used.
+    """
+    select = registry.select if registry is not None else select_rows
+    nodes, dependencies, info, warnings = [], {}, {}, []
+    for variant, plans in sorted(variant_plans.items()):
+        knus_by_phase = {}
+        for phase, path in sorted(plans.items()):
+            for i, knu_id, start_date, end_date in select(path, ['knu_id', 'start_date', 'end_date']):
+                knu_id = (knu_id or '').strip()
+                if not knu_id:
+                    continue
+                start, end = parse_date(start_date), parse_date(end_date)
+                if start and end and end >= start:
+                    duration = (end - start).days + 1
+                else:
+                    if start and end:
+                        warnings.append(f'{path}:{i} end_date precedes start_date for {knu_id}')
+                    duration = default_duration
+                node = f'{variant}:{knu_id}'
+                if node in info:
+                    warnings.append(f'{path}:{i} duplicate KNU {knu_id} in {variant}; first occurrence kept')
+                    continue
+                info[node] = {'variant': variant, 'phase': phase, 'knu_id': knu_id,
+                              'duration': duration, 'start_date': start}
+                knus_by_phase.setdefault(phase, []).append(node)
+
+        for phase in phase_dependencies:
+            gate = f'{variant}:{phase}:GATE'
+            upstream = [f'{variant}:{dep}:GATE' for dep in phase_dependencies[phase]]
+            for node in knus_by_phase.get(phase, []):
+                nodes.append(node)
+                dependencies[node] = upstream
+            nodes.append(gate)
+            dependencies[gate] = knus_by_phase.get(phase, []) + upstream
+            info[gate] = {'variant': variant, 'phase': phase, 'knu_id': None, 'duration': 0, 'start_date': None}
+    return nodes, dependencies, info, warnings
+
+
+def critical_path(nodes, dependencies, info):
+    """Forward/backward pass over a DAG; returns per-node schedule and per-variant critical paths.
+
+    Times are in days from the earliest planned start_date of each variant.
+    """
+    order = topological_sort(nodes, dependencies)
+    origin = {}
+    for node in order:
+        start = info[node]['start_date']
+        if start is not None:
+            variant = info[node]['variant']
+            origin[variant] = min(origin.get(variant, start), start)
+
+    dependents = {n: [] for n in nodes}
+    for node in nodes:
+        for dep in dependencies.get(node, ()):
+            dependents[dep].append(node)
+
+    es, ef = {}, {}
+    for node in order:
+        start = max((ef[d] for d in dependencies.get(node, ())), default=0)
+        planned = info[node]['start_date']
+        if planned is not None:
+            start = max(start, (planned - origin[info[node]['variant']]).days)
+        es[node] = start
+        ef[node] = start + info[node]['duration']
+
+    finish = {}
+    for node in order:
+        variant = info[node]['variant']
+        finish[variant] = max(finish.get(variant, 0), ef[node])
+
+    ls, lf = {}, {}
+    for node in reversed(order):
+        lf[node] = min((ls[c] for c in dependents[node]), default=finish[info[node]['variant']])
+        ls[node] = lf[node] - info[node]['duration']
+
+    schedule = {n: {'es': es[n], 'ef': ef[n], 'ls': ls[n], 'lf': lf[n], 'slack': ls[n] - es[n]} for n in nodes}
+
+    paths = {}
+    for node in reversed(order):
+        variant = info[node]['variant']
+        if variant in paths or ef[node] != finish[variant] or schedule[node]['slack'] != 0:
+            continue
+        chain = [node]
+        current = node
+        while True:
+            preds = [d for d in dependencies.get(current, ()) if ef[d] == es[current] and schedule[d]['slack'] == 0]
+            if not preds:
+                break
+            current = preds[0]
+            chain.append(current)
+        paths[variant] = [n for n in reversed(chain) if info[n]['knu_id'] is not None]
+    return schedule, finish, paths, origin
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Schedule lifecycle phases or KNUs from dependency_rules.yaml.')
+    parser.add_argument('--knu', action='store_true', help='expand to a KNU-level graph and compute critical path and slack')
+    parser.add_argument('--variant', metavar='FAMILY/VARIANT', action='append',
+                        help='restrict --knu to these variants (repeatable)')
+    parser.add_argument('--default-duration', type=int, default=DEFAULT_KNU_DURATION,
+                        help='duration in days for KNUs without valid start_date/end_date')
+    parser.add_argument('--json', metavar='OUTPUT', help='write the schedule as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('dag_scheduler', args, phase='schedule')
+
     rules = load_rules()
     phases = [p['id'] for p in rules.get('phases', [])]
     dependencies = {p['id']: p.get('depends_on', []) for p in rules.get('phases', [])}
-    order = topological_sort(phases, dependencies)
-    print('Execution order:')
-    for i, phase in enumerate(order, start=1):
-        print(f'  {i}. {phase}')
+    try:
+        order = topological_sort(phases, dependencies)
+        waves = parallel_waves(phases, dependencies)
+    except DependencyCycleError as e:
+        print('DEPENDENCY CYCLE DETECTED:')
+        for cycle in e.cycles:
+            print(f"  {' -> '.join(cycle)}")
+        sys.exit(1)
+
+    if not args.knu:
+        print('Execution order:')
+        for i, phase in enumerate(order, start=1):
+            print(f'  {i}. {phase}')
+        print('Parallel waves:')
+        for i, wave in enumerate(waves, start=1):
+            print(f"  {i}. {', '.join(wave)}")
+        if args.json:
+            with atomic_open(args.json) as f:
+                json.dump({'order': order, 'waves': waves}, f, indent=2)
+                f.write('\n')
+        return
+
+    variant_plans = discover_variant_plans()
+    if args.variant:
+        variant_plans = {v: p for v, p in variant_plans.items() if v in set(args.variant)}
+    phase_deps = {phase: dependencies[phase] for phase in order}
+    registry = Registry()
+    nodes, knu_deps, info, warnings = build_knu_graph(phase_deps, variant_plans, args.default_duration, registry)
+    registry.close()
+    schedule, finish, paths, origin = critical_path(nodes, knu_deps, info)
+    knu_waves = [[n for n in wave if info[n]['knu_id']] for wave in parallel_waves(nodes, knu_deps)]
+    knu_waves = [w for w in knu_waves if w]
+    knus_by_variant = {}
+    for node in nodes:
+        if info[node]['knu_id']:
+            knus_by_variant.setdefault(info[node]['variant'], []).append(node)
+
+    for warning in warnings:
+        print(f'WARNING: {warning}')
+    for variant in sorted(finish):
+        knus = knus_by_variant.get(variant, [])
+        critical = [n for n in knus if schedule[n]['slack'] == 0]
+        print(f'{variant}: {len(knus)} KNUs, finish day {finish[variant]}, {len(critical)} with zero slack')
+        print('  Critical path:')
+        for node in paths.get(variant, []):
+            s = schedule[node]
+            print(f"    {info[node]['knu_id']} ({info[node]['phase']}) day {s['es']}-{s['ef']}")
+    print(f'KNU waves: {len(knu_waves)}')
+
+    if args.json:
+        with atomic_open(args.json) as f:
+            json.dump({
+                'phase_order': order,
+                'phase_waves': waves,
+                'variants': {v: {'origin': origin[v].isoformat() if v in origin else None,
+                                 'finish': finish[v],
+                                 'critical_path': [info[n]['knu_id'] for n in paths.get(v, [])]}
+                             for v in sorted(finish)},
+                'knu_waves': [[info[n]['knu_id'] for n in w] for w in knu_waves],
+                'knus': {n: dict(schedule[n], variant=info[n]['variant'], phase=info[n]['phase'],
+                                 knu_id=info[n]['knu_id'], duration=info[n]['duration'])
+                         for n in nodes if info[n]['knu_id']},
+            }, f, indent=2)
+            f.write('\n')
 
 
 if __name__ == '__main__':
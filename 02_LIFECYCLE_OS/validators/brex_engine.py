@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+brex_engine.py — AEROSPACEMODEL single-pass BREX rule engine
+Path: 02_LIFECYCLE_OS/validators/brex_engine.py
+Authority: ASIT
+Usage: python3 brex_engine.py [--format text|jsonl] [--max-errors N]
+
+Runs every rule of 01_GOVERNANCE/brex/BREX_RULESET.yaml over one pruned
+walk of the repository. Each file is opened and parsed once and handed to
+every rule bound to it; findings are merged and graded with
+BREX_SEVERITY_MODEL.yaml. Findings are streamed as they are produced and
+the run stops at --max-errors. The build fails when any finding carries a
+severity whose ci_action is FAIL.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+try:
+    import yaml
+except ImportError:
+    print('WARNING: PyYAML not available; BREX validation skipped')
+    sys.exit(0)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+import validate_audit_records  # noqa: E402
+import validate_structure  # noqa: E402
+from brex_ruleset import load_ruleset  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import EXEMPTION_FIELDS, Row, is_exempt, iter_batches, split_multi  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+from schema_compiler import SCHEMAS, compiled_schema  # noqa: E402
+from yaml_loader import YamlLoadError, load_yaml  # noqa: E402
+
+BREX_SEVERITY_MODEL = os.path.join(REPO_ROOT, '01_GOVERNANCE', 'brex', 'BREX_SEVERITY_MODEL.yaml')
+
+LC_PHASE_DIR_PATTERN = re.compile(r'^LC\d{2}_[A-Z_]+$')
+MULTI_VALUE_FIELDS = ['clause_refs', 'knu_refs', 'evidence_refs', 'knot_ref', 'knu_ref']
+FOREIGN_DELIMITERS = (',', '|')
+
+
+def load_severity_model(path=BREX_SEVERITY_MODEL):
+    levels = (load_yaml(path) or {}).get('severity_levels', [])
+    return {lvl['level']: lvl.get('ci_action', 'LOG') for lvl in levels}
+
+
+def is_active_phase_dir(dirpath):
+    return (LC_PHASE_DIR_PATTERN.match(os.path.basename(dirpath)) is not None
+            and os.path.basename(os.path.dirname(dirpath)) == 'lifecycle')
+
+
+class BrexEngine:
+    """Dispatch table from BREX rule IDs to checks, fed by one repository walk."""
+
+    def __init__(self, rules, severity_actions):
+        self.rules = {r['rule_id']: r for r in rules}
+        self.severity_actions = severity_actions
+        self.evidence_oids = set()
+        self.evidence_refs = []
+
+        # Rule bindings by parse unit. Schema rules (required fields, ID
+        # formats, controlled values) run as compiled column checks over
+        # each batch of a registry CSV; row checks take (filepath, line, row)
+        # and checks that only collect state return None.
+        self.repo_checks = {
+            'BREX-001': validate_structure.check_structure,
+        }
+        self.dir_checks = {
+            'BREX-002': self.check_phase_has('KNOTS.csv'),
+            'BREX-003': self.check_phase_has('KNU_PLAN.csv'),
+        }
+        self.schema_rules = {name: set(spec['rules'].values()) for name, spec in SCHEMAS.items()}
+        self.csv_checks = {
+            'KNOTS.csv': [
+                ('BREX-006', self.check_multi_value_fields),
+            ],
+            'KNU_PLAN.csv': [
+                ('BREX-006', self.check_multi_value_fields),
+                ('BREX-007', self.collect_evidence_refs),
+                ('BREX-008', self.check_orphan_knu),
+            ],
+            'clause_to_knu_matrix.csv': [
+                ('BREX-006', self.check_multi_value_fields),
+            ],
+            'evidence_register.csv': [
+                ('BREX-007', self.collect_evidence_oids),
+            ],
+        }
+        self.yaml_checks = [
+            ('BREX-013', validate_audit_records.is_audit_yaml, validate_audit_records.check_audit_record),
+        ]
+        self.final_checks = {
+            'BREX-007': self.check_evidence_registered,
+        }
+
+    def enabled(self, rule_id):
+        return rule_id in self.rules
+
+    def unbound_rules(self):
+        bound = set(self.repo_checks) | set(self.dir_checks) | set(self.final_checks)
+        bound |= {rule_id for checks in self.csv_checks.values() for rule_id, _ in checks}
+        bound |= {rule_id for rules in self.schema_rules.values() for rule_id in rules}
+        bound |= {rule_id for rule_id, _, _ in self.yaml_checks}
+        return sorted(set(self.rules) - bound)
+
+    # -- rule implementations without a per-file validator ---------------
+
+    @staticmethod
+    def check_phase_has(filename):
+        def check(dirpath, filenames):
+            if is_active_phase_dir(dirpath) and filename not in filenames:
+                yield make_finding(dirpath, None, None, None, f'Missing {filename}')
+        return check
+
+    @staticmethod
+    def check_multi_value_fields(filepath, i, row):
+        for field in MULTI_VALUE_FIELDS:
+            value = row.get(field) or ''
+            if any(d in value for d in FOREIGN_DELIMITERS):
+                yield make_finding(filepath, i, None, None,
+                                   f'Multi-value field {field} must use ";" delimiter: {value}', field)
+
+    @staticmethod
+    def check_orphan_knu(filepath, i, row):
+        knu_id = (row.get('knu_id') or '').strip()
+        knot_ref = (row.get('knot_ref') or '').strip()
+        if knu_id and not knot_ref and not is_exempt(*(row.get(field) for field in EXEMPTION_FIELDS)):
+            yield make_finding(filepath, i, None, None, f'Orphan KNU: {knu_id}', 'knot_ref')
+
+    def collect_evidence_refs(self, filepath, i, row):
+        for oid in split_multi(row.get('evidence_refs')):
+            self.evidence_refs.append((filepath, i, oid))
+
+    def collect_evidence_oids(self, filepath, i, row):
+        oid = (row.get('oid') or '').strip()
+        if oid:
+            self.evidence_oids.add(oid)
+
+    def check_evidence_registered(self):
+        for filepath, i, oid in self.evidence_refs:
+            if oid not in self.evidence_oids:
+                yield make_finding(filepath, i, None, None,
+                                   f'Evidence OID not registered in evidence_register.csv: {oid}', 'evidence_refs')
+
+    # -- driver ------------------------------------------------------------
+
+    def grade(self, rule_id, findings):
+        """Stamp findings with the rule ID and the severity the ruleset assigns it."""
+        severity = self.rules[rule_id].get('severity', 'ERROR')
+        for finding in findings or ():
+            yield finding._replace(rule=rule_id, severity=severity)
+
+    def fail_severities(self):
+        return {r.get('severity', 'ERROR') for r in self.rules.values()
+                if self.severity_actions.get(r.get('severity', 'ERROR'), 'FAIL') == 'FAIL'}
+
+    def run(self, root=REPO_ROOT):
+        """Yield graded findings from a single walk of root."""
+        for rule_id, check in self.repo_checks.items():
+            if self.enabled(rule_id):
+                yield from self.grade(rule_id, check())
+
+        dir_checks = [(r, c) for r, c in self.dir_checks.items() if self.enabled(r)]
+        csv_checks = {name: [(r, c) for r, c in checks if self.enabled(r)]
+                      for name, checks in self.csv_checks.items()}
+        schema_files = {name for name, rules in self.schema_rules.items() if any(map(self.enabled, rules))}
+        yaml_checks = [(r, m, c) for r, m, c in self.yaml_checks if self.enabled(r)]
+
+        for dirpath, _dirnames, filenames in walk_repo(root):
+            for rule_id, check in dir_checks:
+                yield from self.grade(rule_id, check(dirpath, filenames))
+            for f in filenames:
+                filepath = os.path.join(dirpath, f)
+                if csv_checks.get(f) or f in schema_files:
+                    schema = compiled_schema(f) if f in schema_files else None
+                    yield from self.dispatch_csv(filepath, schema, csv_checks.get(f, []))
+                matching = [(r, c) for r, m, c in yaml_checks if m(filepath)]
+                if matching:
+                    yield from self.dispatch_yaml(filepath, matching)
+
+        for rule_id, check in self.final_checks.items():
+            if self.enabled(rule_id):
+                yield from self.grade(rule_id, check())
+
+    def dispatch_csv(self, filepath, schema, checks):
+        bound = None
+        for index, lines, batch in iter_batches(filepath):
+            if schema is not None:
+                if bound is None:
+                    bound = schema.bind(index)
+                for finding in schema.check_batch(filepath, bound, lines, batch):
+                    if self.enabled(finding.rule):
+                        yield from self.grade(finding.rule, [finding])
+            for i, values in zip(lines, batch):
+                row = Row(index, values)
+                for rule_id, check in checks:
+                    yield from self.grade(rule_id, check(filepath, i, row))
+
+    def dispatch_yaml(self, filepath, checks):
+        try:
+            data = load_yaml(filepath)
+        except YamlLoadError as e:
+            for rule_id, _check in checks:
+                yield from self.grade(rule_id, [make_finding(filepath, e.line, None, None, f'YAML parse error: {e.message}')])
+            return
+        for rule_id, check in checks:
+            yield from self.grade(rule_id, check(filepath, data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the BREX ruleset over the repository in a single pass.')
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('brex_engine', args)
+
+    engine = BrexEngine(load_ruleset(), load_severity_model())
+    for rule_id in engine.unbound_rules():
+        print(f'WARNING: no check bound to {rule_id}; rule skipped', file=sys.stderr)
+    reporter = FindingReporter('BREX VALIDATION', args.format, args.max_errors,
+                               fail_severities=engine.fail_severities(), show_rule=True)
+    reporter.consume(engine.run())
+    sys.exit(reporter.finish())
+
+
+if __name__ == '__main__':
+    main()
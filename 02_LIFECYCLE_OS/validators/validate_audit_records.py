@@ -5,6 +5,7 @@ Path: 02_LIFECYCLE_OS/validators/validate_audit_records.py
 Authority: ASIT
 """
 
+import argparse
 import os
 import sys
 
@@ -15,40 +16,83 @@ except ImportError:
     sys.exit(0)
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from audit_sources import is_audit_source  # noqa: E402
+from brex_ruleset import BREX_RULESET, rule_severity  # noqa: E402
+from change_scope import ChangeScopeError, add_scope_arguments, open_scope  # noqa: E402
+from fileio import relpath  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from repo_walk import iter_files  # noqa: E402
+from validation_cache import ValidationCache, cached_findings, rules_fingerprint  # noqa: E402
+from yaml_loader import LOADER_NAME, YamlLoadError, load_yaml  # noqa: E402
 
 REQUIRED_FIELDS = ['audit_id', 'audit_type', 'scope', 'lead_auditor', 'date', 'status']
 
+RULE_REQUIRED_FIELDS = 'BREX-013'
+RULE_YAML_PARSE = 'YAML-PARSE'
+
+
+def is_audit_yaml(filepath, root=REPO_ROOT):
+    return is_audit_source(relpath(os.path.abspath(filepath), root))
 
-def validate_audit_yaml(filepath, errors):
-    with open(filepath, encoding='utf-8') as f:
-        try:
-            data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            errors.append(f'{filepath}: YAML parse error: {e}')
-            return
+
+def check_audit_record(filepath, data):
     if not isinstance(data, dict):
         return
     if 'audit_id' in data:
         for field in REQUIRED_FIELDS:
             if field not in data or not data[field]:
-                errors.append(f'{filepath}: Missing required field: {field}')
+                yield make_finding(filepath, None, RULE_REQUIRED_FIELDS, rule_severity(RULE_REQUIRED_FIELDS),
+                                   f'Missing required field: {field}', field)
+
+
+def check_audit_yaml(filepath):
+    try:
+        data = load_yaml(filepath)
+    except YamlLoadError as e:
+        yield make_finding(filepath, e.line, RULE_YAML_PARSE, 'ERROR', f'YAML parse error: {e.message}')
+        return {'parsed': False}
+    yield from check_audit_record(filepath, data)
+    audit_id = data.get('audit_id') if isinstance(data, dict) else None
+    return {'parsed': True, 'audit_id': audit_id if isinstance(audit_id, str) else None}
+
+
+def validate_audit_yaml(filepath, cache=None):
+    return (yield from cached_findings(cache, filepath, check_audit_yaml))
+
+
+def iter_findings(cache=None, scope=None):
+    for filepath in (scope.iter_files() if scope else iter_files()):
+        if is_audit_yaml(filepath):
+            yield from validate_audit_yaml(filepath, cache)
 
 
 def main():
-    errors = []
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f.endswith('.yaml') and 'audit' in f.lower():
-                validate_audit_yaml(os.path.join(root, f), errors)
-
-    if errors:
-        print('AUDIT RECORD VALIDATION FAILED:')
-        for e in errors:
-            print(f'  {e}')
+    parser = argparse.ArgumentParser(description='Validate every audit record YAML in the repository.')
+    parser.add_argument('--no-cache', action='store_true', help='revalidate every file and leave the cache untouched')
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_audit_records', args)
+
+    try:
+        scope = open_scope(args)
+    except ChangeScopeError as e:
+        print(f'ERROR: {e}')
         sys.exit(1)
-    else:
-        print('AUDIT RECORD VALIDATION PASSED')
-        sys.exit(0)
+    if scope is not None:
+        print(scope.describe(), file=sys.stderr)
+
+    fingerprint = rules_fingerprint(__file__, REQUIRED_FIELDS, LOADER_NAME, BREX_RULESET)
+    cache = None if args.no_cache else ValidationCache('validate_audit_records', fingerprint)
+    reporter = FindingReporter('AUDIT RECORD VALIDATION', args.format, args.max_errors, fail_severities={'ERROR'})
+    reporter.consume(iter_findings(cache, scope))
+    if cache is not None:
+        cache.save()
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
@@ -5,40 +5,56 @@ Path: 02_LIFECYCLE_OS/validators/validate_evidence.py
 Authority: ASIT
 """
 
-import csv
+import argparse
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 EVIDENCE_REGISTER = os.path.join(REPO_ROOT, '03_SHARED_SERVICES', 'evidence', 'evidence_register.csv')
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
 
-REQUIRED_FIELDS = ['oid', 'title', 'evidence_type', 'lifecycle_phase', 'knot_ref', 'knu_ref', 'status', 'created_date', 'author']
+from change_scope import ChangeScopeError, add_scope_arguments, open_scope  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from parallel_validation import add_worker_arguments, sharded_findings  # noqa: E402
+from schema_compiler import REQUIRED, compiled_schema  # noqa: E402
 
+SCHEMA = 'evidence_register.csv'
 
-def validate_evidence_register(filepath, errors):
+
+def check_evidence_register(filepath, span=None):
+    return (yield from compiled_schema(SCHEMA).check_file(filepath, span))
+
+
+def validate_evidence_register(filepath, workers=None):
+    schema = compiled_schema(SCHEMA)
     if not os.path.isfile(filepath):
-        errors.append(f'Evidence register not found: {filepath}')
+        yield make_finding(None, None, schema.rules[REQUIRED], 'ERROR', f'Evidence register not found: {filepath}')
         return
-    with open(filepath, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, start=2):
-            for field in REQUIRED_FIELDS:
-                if field not in row or not row[field].strip():
-                    errors.append(f'{filepath}:{i} Missing required field: {field}')
+    yield from sharded_findings(check_evidence_register, [filepath], workers=workers)
 
 
 def main():
-    errors = []
-    validate_evidence_register(EVIDENCE_REGISTER, errors)
-
-    if errors:
-        print('EVIDENCE VALIDATION FAILED:')
-        for e in errors:
-            print(f'  {e}')
+    parser = argparse.ArgumentParser(description='Validate the shared evidence register.')
+    add_worker_arguments(parser)
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_evidence', args)
+
+    try:
+        scope = open_scope(args)
+    except ChangeScopeError as e:
+        print(f'ERROR: {e}')
         sys.exit(1)
-    else:
-        print('EVIDENCE VALIDATION PASSED')
-        sys.exit(0)
+    if scope is not None:
+        print(scope.describe(), file=sys.stderr)
+
+    reporter = FindingReporter('EVIDENCE VALIDATION', args.format, args.max_errors, fail_severities={'ERROR'})
+    if scope is None or scope.includes(EVIDENCE_REGISTER):
+        reporter.consume(validate_evidence_register(EVIDENCE_REGISTER, args.workers))
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
@@ -5,44 +5,63 @@ Path: 02_LIFECYCLE_OS/validators/validate_knots.py
 Authority: ASIT
 """
 
-import csv
+import argparse
 import os
-import re
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-KNOT_ID_PATTERN = re.compile(r'^KNOT-[A-Z0-9]+-LC\d{2}-\d{4}$')
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
 
-REQUIRED_FIELDS = ['knot_id', 'title', 'lifecycle_phase', 'obligation_source', 'status', 'owner', 'created_date']
+from change_scope import ChangeScopeError, add_scope_arguments, open_scope  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from parallel_validation import add_worker_arguments, sharded_findings  # noqa: E402
+from repo_walk import find_files  # noqa: E402
+from schema_compiler import compiled_schema  # noqa: E402
+from validation_cache import ValidationCache, cached_findings, rules_fingerprint  # noqa: E402
 
+SCHEMA = 'KNOTS.csv'
 
-def validate_knots_csv(filepath, errors):
-    with open(filepath, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, start=2):
-            for field in REQUIRED_FIELDS:
-                if field not in row or not row[field].strip():
-                    errors.append(f'{filepath}:{i} Missing required field: {field}')
-            knot_id = row.get('knot_id', '').strip()
-            if knot_id and not KNOT_ID_PATTERN.match(knot_id):
-                errors.append(f'{filepath}:{i} Invalid KNOT ID format: {knot_id}')
+
+def check_knots_csv(filepath, span=None):
+    facts = yield from compiled_schema(SCHEMA).check_file(filepath, span)
+    return {'rows': facts['rows'], 'knot_ids': facts['ids']}
+
+
+def validate_knots_csv(filepath, cache=None):
+    return (yield from cached_findings(cache, filepath, check_knots_csv))
+
+
+def iter_findings(cache=None, scope=None, workers=None):
+    files = scope.find_files('KNOTS.csv') if scope else find_files('KNOTS.csv')
+    yield from sharded_findings(check_knots_csv, files, cache, workers)
 
 
 def main():
-    errors = []
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f == 'KNOTS.csv':
-                validate_knots_csv(os.path.join(root, f), errors)
-
-    if errors:
-        print('KNOT VALIDATION FAILED:')
-        for e in errors:
-            print(f'  {e}')
+    parser = argparse.ArgumentParser(description='Validate every KNOTS.csv in the repository.')
+    parser.add_argument('--no-cache', action='store_true', help='revalidate every file and leave the cache untouched')
+    add_worker_arguments(parser)
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_knots', args)
+
+    try:
+        scope = open_scope(args)
+    except ChangeScopeError as e:
+        print(f'ERROR: {e}')
         sys.exit(1)
-    else:
-        print('KNOT VALIDATION PASSED')
-        sys.exit(0)
+    if scope is not None:
+        print(scope.describe(), file=sys.stderr)
+
+    fingerprint = rules_fingerprint(__file__, *compiled_schema(SCHEMA).fingerprint_parts())
+    cache = None if args.no_cache else ValidationCache('validate_knots', fingerprint)
+    reporter = FindingReporter('KNOT VALIDATION', args.format, args.max_errors, fail_severities={'ERROR'})
+    reporter.consume(iter_findings(cache, scope, args.workers))
+    if cache is not None:
+        cache.save()
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
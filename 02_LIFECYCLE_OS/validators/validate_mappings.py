@@ -5,39 +5,63 @@ Path: 02_LIFECYCLE_OS/validators/validate_mappings.py
 Authority: ASIT
 """
 
-import csv
+import argparse
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
 
-REQUIRED_CLAUSE_FIELDS = ['mapping_id', 'standard', 'clause_id', 'clause_title', 'lifecycle_phase', 'compliance_status']
+from change_scope import ChangeScopeError, add_scope_arguments, open_scope  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from parallel_validation import add_worker_arguments, sharded_findings  # noqa: E402
+from repo_walk import find_files  # noqa: E402
+from schema_compiler import compiled_schema  # noqa: E402
+from validation_cache import ValidationCache, cached_findings, rules_fingerprint  # noqa: E402
 
+SCHEMA = 'clause_to_knu_matrix.csv'
 
-def validate_clause_to_knu_csv(filepath, errors):
-    with open(filepath, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, start=2):
-            for field in REQUIRED_CLAUSE_FIELDS:
-                if field not in row or not row[field].strip():
-                    errors.append(f'{filepath}:{i} Missing required field: {field}')
+
+def check_clause_to_knu_csv(filepath, span=None):
+    facts = yield from compiled_schema(SCHEMA).check_file(filepath, span)
+    return {'rows': facts['rows'], 'mapping_ids': facts['ids']}
+
+
+def validate_clause_to_knu_csv(filepath, cache=None):
+    return (yield from cached_findings(cache, filepath, check_clause_to_knu_csv))
+
+
+def iter_findings(cache=None, scope=None, workers=None):
+    files = scope.find_files('clause_to_knu_matrix.csv') if scope else find_files('clause_to_knu_matrix.csv')
+    yield from sharded_findings(check_clause_to_knu_csv, files, cache, workers)
 
 
 def main():
-    errors = []
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f == 'clause_to_knu_matrix.csv':
-                validate_clause_to_knu_csv(os.path.join(root, f), errors)
-
-    if errors:
-        print('MAPPING VALIDATION FAILED:')
-        for e in errors:
-            print(f'  {e}')
+    parser = argparse.ArgumentParser(description='Validate every clause_to_knu_matrix.csv in the repository.')
+    parser.add_argument('--no-cache', action='store_true', help='revalidate every file and leave the cache untouched')
+    add_worker_arguments(parser)
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_mappings', args)
+
+    try:
+        scope = open_scope(args)
+    except ChangeScopeError as e:
+        print(f'ERROR: {e}')
         sys.exit(1)
-    else:
-        print('MAPPING VALIDATION PASSED')
-        sys.exit(0)
+    if scope is not None:
+        print(scope.describe(), file=sys.stderr)
+
+    fingerprint = rules_fingerprint(__file__, *compiled_schema(SCHEMA).fingerprint_parts())
+    cache = None if args.no_cache else ValidationCache('validate_mappings', fingerprint)
+    reporter = FindingReporter('MAPPING VALIDATION', args.format, args.max_errors, fail_severities={'ERROR'})
+    reporter.consume(iter_findings(cache, scope, args.workers))
+    if cache is not None:
+        cache.save()
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
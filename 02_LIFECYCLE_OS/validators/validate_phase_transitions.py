@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+validate_phase_transitions.py — AEROSPACEMODEL lifecycle phase transition validator
+Path: 02_LIFECYCLE_OS/validators/validate_phase_transitions.py
+Authority: ASIT
+Usage: python3 validate_phase_transitions.py [--format text|jsonl] [--max-errors N]
+
+Compiles lifecycle_state_machine.yaml and dependency_rules.yaml into bitmask
+transition tables (02_LIFECYCLE_OS/lib/phase_transitions.py), reports where
+the two files disagree, and checks the whole portfolio against them:
+
+  - every KNOTS.csv and KNU_PLAN.csv row carries the phase of the
+    lifecycle/LCxx_* directory it is filed in;
+  - every KNU's knot_ref names a KNOT of its own phase or of a phase it
+    depends on;
+  - every phase change in configuration/change_log.csv (rows with
+    from_phase and to_phase) is an allowed move, continues from the phase
+    the previous change ended in, and has its prerequisites completed.
+
+Registry tables come from the registry snapshot when it is current, so
+the phase columns are already integer-coded. Disagreements between the
+model files are warnings; data violations fail the run.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import relpath  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from phase_transitions import check_assignment, check_change_log, check_knot_refs, compile_tables, phase_codes  # noqa: E402
+from registry_snapshot import Registry  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+from yaml_loader import YamlLoadError  # noqa: E402
+
+PRODUCTS_ROOT = os.path.join(REPO_ROOT, '04_PRODUCTS')
+LC_PHASE_DIR_PATTERN = re.compile(r'^(LC\d{2})_[A-Z_]+$')
+REGISTRY_FILES = ['KNOTS.csv', 'KNU_PLAN.csv']
+
+
+def discover_variants(products_root=PRODUCTS_ROOT):
+    """Return {variant_dir: {'phases': {phase: {filename: path}}, 'change_log': path or None}}."""
+    variants = {}
+    for dirpath, _dirnames, filenames in walk_repo(products_root):
+        name = os.path.basename(dirpath)
+        parent = os.path.dirname(dirpath)
+        match = LC_PHASE_DIR_PATTERN.match(name)
+        if match and os.path.basename(parent) == 'lifecycle':
+            files = {f: os.path.join(dirpath, f) for f in REGISTRY_FILES if f in filenames}
+            if files:
+                variant = variants.setdefault(os.path.dirname(parent), {'phases': {}, 'change_log': None})
+                variant['phases'][match.group(1)] = files
+        elif name == 'configuration' and 'change_log.csv' in filenames:
+            variant = variants.setdefault(parent, {'phases': {}, 'change_log': None})
+            variant['change_log'] = os.path.join(dirpath, 'change_log.csv')
+    return variants
+
+
+def knot_phases(registry, phases):
+    """Map every KNOT ID of a variant to the lifecycle_phase its row declares."""
+    result = {}
+    for files in phases.values():
+        if 'KNOTS.csv' not in files:
+            continue
+        table = registry.table(files['KNOTS.csv'])
+        codes, values = phase_codes(table, 'lifecycle_phase')
+        ids = table.columns.get('knot_id')
+        if ids is None:
+            continue
+        for knot_id, code in zip(ids, codes):
+            if knot_id and values[code]:
+                result.setdefault(knot_id.strip(), values[code].strip())
+    return result
+
+
+def iter_findings(tables, registry, variants):
+    yield from tables.findings
+    for variant_dir in sorted(variants):
+        variant = variants[variant_dir]
+        knots = knot_phases(registry, variant['phases'])
+        for phase, files in sorted(variant['phases'].items()):
+            for filename, path in sorted(files.items()):
+                table = registry.table(path)
+                yield from check_assignment(tables, relpath(path), table, phase)
+                if filename == 'KNU_PLAN.csv':
+                    yield from check_knot_refs(tables, relpath(path), table, knots)
+        if variant['change_log']:
+            yield from check_change_log(tables, relpath(variant['change_log']), registry.table(variant['change_log']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate KNOT/KNU phase assignments and change log phase changes '
+                                                 'against the lifecycle state machine and dependency rules.')
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_phase_transitions', args)
+
+    try:
+        tables = compile_tables()
+    except YamlLoadError as e:
+        print(f'ERROR: {e}')
+        sys.exit(1)
+    registry = Registry()
+    reporter = FindingReporter('PHASE TRANSITION VALIDATION', args.format, args.max_errors,
+                               fail_severities={'ERROR'}, show_rule=True)
+    reporter.consume(iter_findings(tables, registry, discover_variants()))
+    registry.close()
+    sys.exit(reporter.finish())
+
+
+if __name__ == '__main__':
+    main()
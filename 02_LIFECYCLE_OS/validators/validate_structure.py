@@ -3,12 +3,22 @@
 validate_structure.py — AEROSPACEMODEL structural validator
 Path: 02_LIFECYCLE_OS/validators/validate_structure.py
 Authority: ASIT
+
+Checks the mandatory root files, directories and model files. The check
+is a handful of stat calls, so --changed-since (accepted for the merge
+gates of 08_AUTOMATION/ci/merge_gates.yaml) still checks the whole tree.
 """
 
+import argparse
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from change_scope import add_scope_arguments  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
 
 MANDATORY_ROOT_FILES = [
     'README.md',
@@ -49,45 +59,49 @@ MANDATORY_CI_FILES = [
     '.github/workflows/validate_structure.yml',
 ]
 
+RULE_STRUCTURE = 'BREX-001'
 
-def check_file(path, errors):
+
+def check_file(path):
     full_path = os.path.join(REPO_ROOT, path)
     if not os.path.isfile(full_path):
-        errors.append(f'MISSING FILE: {path}')
+        yield make_finding(None, None, RULE_STRUCTURE, 'ERROR', f'MISSING FILE: {path}')
 
 
-def check_dir(path, errors):
+def check_dir(path):
     full_path = os.path.join(REPO_ROOT, path)
     if not os.path.isdir(full_path):
-        errors.append(f'MISSING DIR: {path}')
-
+        yield make_finding(None, None, RULE_STRUCTURE, 'ERROR', f'MISSING DIR: {path}')
 
-def main():
-    errors = []
 
+def check_structure():
     for f in MANDATORY_ROOT_FILES:
-        check_file(f, errors)
+        yield from check_file(f)
 
     for d in MANDATORY_DIRS:
-        check_dir(d, errors)
+        yield from check_dir(d)
 
     for f in MANDATORY_META_FILES:
-        check_file(f, errors)
+        yield from check_file(f)
 
     for f in MANDATORY_LOS_FILES:
-        check_file(f, errors)
+        yield from check_file(f)
 
     for f in MANDATORY_CI_FILES:
-        check_file(f, errors)
-
-    if errors:
-        print('STRUCTURE VALIDATION FAILED:')
-        for e in errors:
-            print(f'  {e}')
-        sys.exit(1)
-    else:
-        print('STRUCTURE VALIDATION PASSED')
-        sys.exit(0)
+        yield from check_file(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the mandatory repository structure.')
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validate_structure', args)
+
+    reporter = FindingReporter('STRUCTURE VALIDATION', args.format, args.max_errors)
+    reporter.consume(check_structure())
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+build_snapshot.py — Compile the lifecycle registry into a binary snapshot
+Path: 08_AUTOMATION/scripts/build_snapshot.py
+Usage: python3 build_snapshot.py [--output <PATH>] [--check]
+
+Parses every CSV and YAML source under 00_META, 04_PRODUCTS and
+05_STANDARDS_LIBRARY, plus the evidence register, into
+.aerospacemodel_cache/registry.snapshot. detect_orphans.py,
+propagate_compliance.py and dag_scheduler.py read sources from the snapshot
+while their content hash still matches its manifest and parse the text
+otherwise.
+
+With --check nothing is written; the command lists sources that changed,
+appeared or disappeared since the snapshot was built and exits 1 if any did.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from registry_snapshot import SNAPSHOT_PATH, RegistrySnapshot, build_snapshot  # noqa: E402
+
+
+def check(path):
+    snapshot = RegistrySnapshot.open(path)
+    if snapshot is None:
+        print(f'SNAPSHOT MISSING OR UNREADABLE: {path}')
+        return 1
+    try:
+        changed, added, removed = snapshot.stale_sources()
+    finally:
+        snapshot.close()
+    if not (changed or added or removed):
+        print(f'SNAPSHOT CURRENT: {len(snapshot.sources)} sources')
+        return 0
+    print('SNAPSHOT STALE:')
+    for label, paths in (('changed', changed), ('added', added), ('removed', removed)):
+        for rel in paths:
+            print(f'  {label}: {rel}')
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile registry CSV/YAML sources into one binary snapshot.')
+    parser.add_argument('--output', default=SNAPSHOT_PATH, metavar='PATH', help='snapshot file to write or check')
+    parser.add_argument('--check', action='store_true', help='report stale sources instead of rebuilding')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('build_snapshot', args, phase='build')
+
+    if args.check:
+        sys.exit(check(args.output))
+
+    start = time.perf_counter()
+    sources, skipped = build_snapshot(args.output)
+    for rel, reason in skipped:
+        print(f'WARNING: {rel} not snapshotted: {reason}')
+    size = os.path.getsize(args.output)
+    print(f'Snapshot written: {args.output} ({len(sources)} sources, {size} bytes, '
+          f'{time.perf_counter() - start:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
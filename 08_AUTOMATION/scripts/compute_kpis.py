@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+compute_kpis.py — Quality KPIs by lifecycle phase, variant, product family and portfolio
+Path: 08_AUTOMATION/scripts/compute_kpis.py
+Usage: python3 compute_kpis.py [--changed <FILE> ...] [--rebuild] [--output-root <DIR>]
+
+Computes the metrics of 03_SHARED_SERVICES/metrics/quality_metrics.csv that
+have a source in the tree (QM-001 KNOT compliance rate, QM-002 evidence
+register completeness, QM-003 open NCR count) and writes:
+
+  10_REPORTING/product_health/quality_kpis.json, quality_kpis.csv  per variant and phase
+  10_REPORTING/executive/quality_kpis.json, quality_kpis.csv       per family and portfolio
+
+The aggregates are kept in .aerospacemodel_cache/kpi_engine.pickle. Each run
+re-reads only the KNOTS.csv, KNU_PLAN.csv, evidence register and audit YAML
+files whose signature changed; with --changed only the named files are
+examined and the tree is not walked at all. Reports are left untouched when
+no source changed.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open, atomic_write, relpath  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from kpi_engine import FAMILY, METRIC_COUNTS, PHASE, PORTFOLIO, VARIANT, KpiEngine, load_engine, metric_values  # noqa: E402
+from records import iter_rows  # noqa: E402
+
+QUALITY_METRICS = os.path.join(REPO_ROOT, '03_SHARED_SERVICES', 'metrics', 'quality_metrics.csv')
+OUTPUT_ROOT = os.path.join(REPO_ROOT, '10_REPORTING')
+REPORT_NAME = 'quality_kpis'
+COUNT_COLUMNS = ['files', 'knots', 'knots_compliant', 'knus', 'knus_evidenced', 'ncrs', 'ncrs_open']
+
+
+def load_metric_definitions(path=QUALITY_METRICS):
+    """Return {metric_id: {'name', 'unit', 'target'}} for the metrics the engine computes."""
+    definitions = {}
+    for _line, row in iter_rows(path):
+        metric_id = (row.get('metric_id') or '').strip()
+        try:
+            target = float(row.get('target') or '')
+        except ValueError:
+            target = None
+        definitions[metric_id] = {'name': (row.get('metric_name') or '').strip(),
+                                  'unit': (row.get('unit') or '').strip(), 'target': target}
+    return definitions
+
+
+def on_target(value, definition):
+    """A count meets its target at or below it, a rate at or above it; None when either is unknown."""
+    if value is None or definition.get('target') is None:
+        return None
+    if definition['unit'] == 'count':
+        return value <= definition['target']
+    return value >= definition['target']
+
+
+def aggregate_json(counts, definitions):
+    values = metric_values(counts)
+    return {
+        'kpis': values,
+        'on_target': {m: on_target(v, definitions.get(m, {})) for m, v in values.items()},
+        'counts': {c: counts.get(c, 0) for c in COUNT_COLUMNS},
+    }
+
+
+def key_name(key):
+    return '/'.join(key) if key else PORTFOLIO
+
+
+def write_csv(path, rows):
+    with atomic_open(path) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['level', 'key'] + list(METRIC_COUNTS) + COUNT_COLUMNS)
+        for level, key, counts in rows:
+            values = metric_values(counts)
+            writer.writerow([level, key_name(key)] + ['' if values[m] is None else values[m] for m in METRIC_COUNTS]
+                            + [counts.get(c, 0) for c in COUNT_COLUMNS])
+
+
+def report_paths(output_root):
+    return [os.path.join(output_root, directory, f'{REPORT_NAME}{ext}')
+            for directory in ('product_health', 'executive') for ext in ('.json', '.csv')]
+
+
+def write_reports(engine, definitions, output_root):
+    health_json, health_csv, executive_json, executive_csv = report_paths(output_root)
+    generated = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    metrics = {m: definitions[m] for m in METRIC_COUNTS if m in definitions}
+
+    variants = {}
+    for key in engine.keys(VARIANT):
+        variants[key_name(key)] = dict(aggregate_json(engine.counts(VARIANT, key), definitions), phases={})
+    for key in engine.keys(PHASE):
+        variants[key_name(key[:2])]['phases'][key[2]] = aggregate_json(engine.counts(PHASE, key), definitions)
+    atomic_write(health_json, json.dumps({'generated': generated, 'metrics': metrics, 'variants': variants},
+                                         indent=2) + '\n')
+    write_csv(health_csv, [(level, key, engine.counts(level, key)) for level in (VARIANT, PHASE)
+                           for key in engine.keys(level)])
+
+    document = {
+        'generated': generated,
+        'metrics': metrics,
+        'portfolio': aggregate_json(engine.counts(PORTFOLIO), definitions),
+        'families': {key_name(key): aggregate_json(engine.counts(FAMILY, key), definitions)
+                     for key in engine.keys(FAMILY)},
+    }
+    atomic_write(executive_json, json.dumps(document, indent=2) + '\n')
+    write_csv(executive_csv, [(PORTFOLIO, (), engine.counts(PORTFOLIO))]
+              + [(FAMILY, key, engine.counts(FAMILY, key)) for key in engine.keys(FAMILY)])
+    return [health_json, health_csv, executive_json, executive_csv]
+
+
+def format_value(value, definition):
+    if value is None:
+        return 'n/a'
+    return f'{value:g}%' if definition.get('unit') == 'percent' else f'{value:g}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute quality KPIs per phase, variant, product family and portfolio.')
+    parser.add_argument('--changed', nargs='+', metavar='FILE', default=None,
+                        help='re-read only these source files instead of checking the whole tree')
+    parser.add_argument('--rebuild', action='store_true', help='discard the persisted aggregates and re-read every source')
+    parser.add_argument('--output-root', default=OUTPUT_ROOT, metavar='DIR',
+                        help='reporting root holding product_health/ and executive/ (default: 10_REPORTING)')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('compute_kpis', args, phase='aggregate')
+
+    definitions = load_metric_definitions()
+    engine = KpiEngine() if args.rebuild else load_engine()
+    paths = args.changed if engine.sources else None
+    reread = engine.refresh(paths)
+    changed = engine.dirty
+    engine.save()
+
+    reports = report_paths(args.output_root)
+    written = changed or not all(os.path.isfile(p) for p in reports)
+    if written:
+        write_reports(engine, definitions, args.output_root)
+
+    print('Quality KPIs')
+    print('============')
+    print(f'Re-read {reread} of {len(engine.sources)} source files '
+          f'({"named files only" if paths is not None else "whole tree checked"})')
+    values = engine.metrics(PORTFOLIO)
+    for metric_id, definition in sorted(definitions.items()):
+        if metric_id in values:
+            print(f'  {metric_id} {definition["name"]}: {format_value(values[metric_id], definition)}'
+                  f' (target {format_value(definition["target"], definition)})')
+        else:
+            print(f'  {metric_id} {definition["name"]}: not computed (no source in the repository)')
+    if written:
+        print(f'Reports written: {", ".join(relpath(p) for p in reports)}')
+    else:
+        print('No source changed; reports are current')
+
+
+if __name__ == '__main__':
+    main()
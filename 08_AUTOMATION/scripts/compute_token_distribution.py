@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+compute_token_distribution.py — Teknia Token (TT) distribution across the portfolio's KNOTs
+Path: 08_AUTOMATION/scripts/compute_token_distribution.py
+Usage: python3 compute_token_distribution.py [--changed <FILE> ...] [--rebuild] [--pool <TT>]
+                                             [--what-if <NAME=W1,W2,W3,W4> ...] [--scenarios <FILE.yaml>]
+                                             [--top N] [--output <OUT.csv> | --no-report]
+
+Scores every KNOT against the distribution_basis of
+02_LIFECYCLE_OS/core_models/token_distribution_model.yaml (see
+02_LIFECYCLE_OS/lib/token_distribution.py for the criteria) and writes
+10_REPORTING/programme/token_distribution.csv: one row per KNOT with its
+criterion values and, per scenario, its score, share and, with --pool, its
+TT allocation.
+
+The baseline scenario uses the model's weights. What-if scenarios give
+alternative weights in criterion order (KNOT_COMPLEXITY,
+EVIDENCE_COMPLETENESS, COMPLIANCE_STATUS, AUDIT_CLOSURE), either as
+--what-if NAME=0.1,0.5,0.2,0.2 or as a YAML mapping of
+NAME: {CRITERION: weight}; all scenarios are scored together.
+
+The feature matrix is kept in .aerospacemodel_cache/token_engine.pickle.
+Each run re-reads only the source files whose signature changed; with
+--changed only the named files are examined.
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open, relpath  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from token_distribution import CRITERIA, TokenEngine, TokenModelError, load_engine, load_model, numpy  # noqa: E402
+from yaml_loader import YamlLoadError, load_yaml  # noqa: E402
+
+OUTPUT = os.path.join(REPO_ROOT, '10_REPORTING', 'programme', 'token_distribution.csv')
+BASELINE = 'baseline'
+
+
+def parse_what_if(value):
+    name, sep, weights = value.partition('=')
+    try:
+        weights = [float(w) for w in weights.split(',')]
+    except ValueError:
+        weights = []
+    if not sep or not name or len(weights) != len(CRITERIA):
+        raise argparse.ArgumentTypeError(f'expected NAME={",".join(["W"] * len(CRITERIA))}, got {value!r}')
+    return name, weights
+
+
+def load_scenarios(path):
+    """Return [(name, weights)] from a YAML mapping of NAME: {CRITERION: weight}; absent criteria weigh 0."""
+    data = load_yaml(path) or {}
+    if not isinstance(data, dict):
+        raise TokenModelError(f'{path}: expected a mapping of scenario names to criterion weights')
+    scenarios = []
+    for name, weights in data.items():
+        weights = weights or {}
+        unknown = [c for c in weights if c not in CRITERIA] if isinstance(weights, dict) else ['(not a mapping)']
+        if unknown:
+            raise TokenModelError(f'{path}: {name}: unknown criteria {", ".join(map(str, unknown))}')
+        try:
+            scenarios.append((str(name), [float(weights.get(c) or 0) for c in CRITERIA]))
+        except (TypeError, ValueError) as e:
+            raise TokenModelError(f'{path}: {name}: {e}') from e
+    return scenarios
+
+
+def write_report(path, engine, scenarios, distributions, pool):
+    columns = ['knot_id', 'family', 'variant', 'lifecycle_phase'] + [c.lower() for c in CRITERIA]
+    for name, _weights in scenarios:
+        columns += [f'{name}_score', f'{name}_share'] + ([f'{name}_tokens'] if pool is not None else [])
+    values = [(d.scores.tolist(), d.shares.tolist()) for d in distributions]
+    with atomic_open(path) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(columns)
+        for knot_id in engine.knot_ids():
+            slot = engine.slots[knot_id]
+            family, variant, phase = engine.bucket(slot) or (None, None, None)
+            row = [knot_id, family or '', variant or '', phase or '']
+            row += [round(v, 4) for v in engine.features(slot)]
+            for scores, shares in values:
+                row += [round(scores[slot], 6), round(shares[slot], 9)]
+                if pool is not None:
+                    row.append(round(shares[slot] * pool, 6))
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distribute Teknia Tokens across KNOTs by the token distribution model.')
+    parser.add_argument('--changed', nargs='+', metavar='FILE', default=None,
+                        help='re-read only these source files instead of checking the whole tree')
+    parser.add_argument('--rebuild', action='store_true', help='discard the persisted feature matrix and re-read every source')
+    parser.add_argument('--pool', type=float, default=None, metavar='TT', help='tokens to distribute (default: shares only)')
+    parser.add_argument('--what-if', action='append', type=parse_what_if, default=[], metavar='NAME=W1,W2,W3,W4',
+                        help='alternative weights in criterion order; repeatable')
+    parser.add_argument('--scenarios', metavar='FILE', help='YAML mapping of scenario names to {CRITERION: weight}')
+    parser.add_argument('--top', type=int, default=10, metavar='N', help='KNOTs listed per scenario (default: 10)')
+    parser.add_argument('--output', default=OUTPUT, metavar='PATH',
+                        help='report CSV (default: 10_REPORTING/programme/token_distribution.csv)')
+    parser.add_argument('--no-report', action='store_true', help='print the summary without writing the report')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('compute_token_distribution', args, phase='aggregate')
+
+    try:
+        model = load_model()
+        scenarios = [(BASELINE, model.weights)] + args.what_if
+        if args.scenarios:
+            scenarios += load_scenarios(args.scenarios)
+    except (TokenModelError, YamlLoadError, OSError) as e:
+        print(f'ERROR: {e}')
+        sys.exit(1)
+    names = [name for name, _weights in scenarios]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f'ERROR: duplicate scenario name(s): {", ".join(duplicates)}')
+        sys.exit(1)
+
+    engine = TokenEngine() if args.rebuild else load_engine()
+    paths = args.changed if engine.sources else None
+    engine.set_model(model)
+    reread = engine.refresh(paths)
+    engine.save()
+    distributions = engine.distribute([weights for _name, weights in scenarios])
+
+    print('Token distribution')
+    print('==================')
+    print(f'Re-read {reread} of {len(engine.sources)} source files '
+          f'({"named files only" if paths is not None else "whole tree checked"})')
+    print(f'{len(engine)} KNOTs scored against {len(scenarios)} scenario(s) '
+          f'({"NumPy" if numpy is not None else "pure Python"})')
+    for (name, weights), distribution in zip(scenarios, distributions):
+        print(f'  {name} ({", ".join(f"{c}={w:g}" for c, w in zip(CRITERIA, weights))}): '
+              f'total score {distribution.total:.4f}')
+        for slot in distribution.top(args.top):
+            if engine.ids[slot] is None or not distribution.scores[slot]:
+                break
+            share = distribution.shares[slot]
+            tokens = f', {share * args.pool:.2f} {model.unit}' if args.pool is not None else ''
+            print(f'    {engine.ids[slot]}: {distribution.scores[slot]:.4f} ({share:.4%}{tokens})')
+    if not args.no_report:
+        write_report(args.output, engine, scenarios, distributions, args.pool)
+        print(f'Report written: {relpath(os.path.abspath(args.output))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,213 @@
 #!/usr/bin/env python3
 """
-detect_orphans.py — Detect orphan KNUs and KNOTs
+detect_orphans.py — Detect orphan KNUs and dangling cross-references
 Path: 08_AUTOMATION/scripts/detect_orphans.py
+Usage: python3 detect_orphans.py [--changed-since REV] [--format text|jsonl] [--max-errors N]
+
+Referential integrity as a hash join. One walk lists the registry files; a
+build pass reads only their ID columns into per-kind key sets (KNOT IDs,
+KNU IDs, evidence OIDs, (standard, clause_id) pairs), and a probe pass
+streams every reference column and looks each value up. Multi-value fields
+are split on ';'. Run time is linear in the number of rows and references.
+
+Checked references:
+  KNU_PLAN.csv              knot_ref -> KNOT, evidence_refs -> evidence OID
+  KNOTS.csv                 knu_refs -> KNU
+  clause_to_knu_matrix.csv  knot_ref -> KNOT, knu_ref -> KNU, clause_id -> clause
+  cross_standard_trace.csv  source/target clause -> clause
+
+Clause references are only checked for standards that have a
+clause_register.csv. A KNU with an empty knot_ref is reported as an orphan.
+Rows exempted as for BREX-008 (status or compliance_status EXEMPT, or an
+exemption_ref; records.is_exempt) are not probed at all.
+
+With --changed-since REV only files changed since REV, and files that
+mention an ID those changes added or removed, are probed (change_scope).
 """
 
-import csv
+import argparse
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from change_scope import ChangeScopeError, add_scope_arguments, open_scope  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import EXEMPTION_FIELDS, is_exempt, split_multi  # noqa: E402
+from registry_snapshot import Registry  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+
+# Build side: filename -> (key kind, key columns). A key of more than one
+# column is joined as a tuple.
+KEYS = {
+    'KNOTS.csv': ('knot', ['knot_id']),
+    'KNU_PLAN.csv': ('knu', ['knu_id']),
+    'evidence_register.csv': ('evidence', ['oid']),
+    'clause_register.csv': ('clause', ['standard', 'clause_id']),
+}
+
+# Probe side: filename -> [(key kind, reference columns, multi-valued)].
+REFERENCES = {
+    'KNU_PLAN.csv': [
+        ('knot', ['knot_ref'], False),
+        ('evidence', ['evidence_refs'], True),
+    ],
+    'KNOTS.csv': [
+        ('knu', ['knu_refs'], True),
+    ],
+    'clause_to_knu_matrix.csv': [
+        ('knot', ['knot_ref'], True),
+        ('knu', ['knu_ref'], True),
+        ('clause', ['standard', 'clause_id'], False),
+    ],
+    'cross_standard_trace.csv': [
+        ('clause', ['source_standard', 'source_clause'], False),
+        ('clause', ['target_standard', 'target_clause'], False),
+    ],
+}
+
+RULES = {
+    'knot': 'REF-KNOT',
+    'knu': 'REF-KNU',
+    'evidence': 'REF-EVIDENCE',
+    'clause': 'REF-CLAUSE',
+}
+RULE_ORPHAN_KNU = 'ORPHAN-KNU'
+ORPHAN = 'orphan'
+
+LABELS = {
+    'knot': 'KNOT',
+    'knu': 'KNU',
+    'evidence': 'evidence OID',
+    'clause': 'clause',
+}
+
+
+def discover(root=REPO_ROOT):
+    """Return {filename: [paths]} for every file taking part in the join."""
+    wanted = set(KEYS) | set(REFERENCES)
+    files = {name: [] for name in wanted}
+    for dirpath, _dirnames, filenames in walk_repo(root):
+        for f in filenames:
+            if f in wanted:
+                files[f].append(os.path.join(dirpath, f))
+    return files
+
+
+def file_keys(filepath, columns, registry):
+    """Build side of one file: the set of its non-empty keys."""
+    keys = set()
+    for values in registry.select(filepath, columns):
+        key = tuple((v or '').strip() for v in values[1:])
+        if all(key):
+            keys.add(key[0] if len(key) == 1 else key)
+    return keys
+
+
+def build_indexes(files, registry):
+    """Hash-join build side: {key kind: set of keys}."""
+    indexes = {kind: set() for kind, _columns in KEYS.values()}
+    for name, (kind, columns) in KEYS.items():
+        for filepath in files.get(name, []):
+            indexes[kind] |= file_keys(filepath, columns, registry)
+    return indexes
+
+
+def scan_references(filepath, references, registry):
+    """Yield (line, kind, columns, value) for every reference in filepath, in row order.
+
+    A KNU without knot_ref is yielded with kind ORPHAN and its knu_id as value;
+    a multi-column reference has a tuple value. Exempted rows yield nothing.
+    """
+    fields = list(dict.fromkeys(column for _kind, columns, _multi in references for column in columns))
+    is_knu_plan = os.path.basename(filepath) == 'KNU_PLAN.csv'
+    if is_knu_plan:
+        fields.append('knu_id')
+    fields += [field for field in EXEMPTION_FIELDS if field not in fields]
+    position = {field: i for i, field in enumerate(fields, start=1)}
+    probes = [(kind, columns, [position[c] for c in columns], multi) for kind, columns, multi in references]
+    exemption = [position[field] for field in EXEMPTION_FIELDS]
+    for values in registry.select(filepath, fields):
+        line = values[0]
+        if is_exempt(*(values[i] for i in exemption)):
+            continue
+        if is_knu_plan:
+            knu_id = (values[position['knu_id']] or '').strip()
+            if knu_id and not (values[position['knot_ref']] or '').strip():
+                yield line, ORPHAN, ['knot_ref'], knu_id
+        for kind, columns, positions, multi in probes:
+            if len(positions) > 1:
+                key = tuple((values[i] or '').strip() for i in positions)
+                if all(key):
+                    yield line, kind, columns, key
+                continue
+            value = values[positions[0]]
+            for ref in (split_multi(value) if multi else [(value or '').strip()]):
+                if ref:
+                    yield line, kind, columns, ref
+
+
+def is_dangling(kind, value, indexes, clause_standards):
+    """True when a scanned reference misses its index; clause references only count for registered standards."""
+    if kind == ORPHAN:
+        return True
+    if isinstance(value, tuple):
+        return value[0] in clause_standards and value not in indexes[kind]
+    return value not in indexes[kind]
+
+
+def reference_finding(filepath, line, kind, columns, value):
+    if kind == ORPHAN:
+        return make_finding(filepath, line, RULE_ORPHAN_KNU, 'ERROR', f'Orphan KNU: {value}', 'knot_ref')
+    if isinstance(value, tuple):
+        return make_finding(filepath, line, RULES[kind], 'ERROR', f'Unknown {LABELS[kind]} {value[0]} {value[1]}',
+                            columns[-1])
+    return make_finding(filepath, line, RULES[kind], 'ERROR',
+                        f'Dangling {columns[0]}: {LABELS[kind]} {value} does not exist', columns[0])
+
+
+def probe_file(filepath, references, indexes, clause_standards, registry):
+    """Yield a finding for every reference in filepath that misses its index."""
+    for line, kind, columns, value in scan_references(filepath, references, registry):
+        if is_dangling(kind, value, indexes, clause_standards):
+            yield reference_finding(filepath, line, kind, columns, value)
+
+
+def iter_findings(root=REPO_ROOT, registry=None, scope=None):
+    """Yield every dangling reference; with a ChangeScope, the build side still covers the whole tree but only affected files are probed."""
+    registry = registry or Registry(root)
+    files = discover(root)
+    indexes = build_indexes(files, registry)
+    clause_standards = {standard for standard, _clause in indexes['clause']}
+    for name, references in REFERENCES.items():
+        for filepath in files.get(name, []):
+            if scope is None or scope.includes(filepath):
+                yield from probe_file(filepath, references, indexes, clause_standards, registry)
 
 
 def main():
-    knot_ids = set()
-    knu_knot_refs = set()
-    orphan_knus = []
-
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f == 'KNOTS.csv':
-                with open(os.path.join(root, f), newline='', encoding='utf-8') as cf:
-                    for row in csv.DictReader(cf):
-                        kid = row.get('knot_id', '').strip()
-                        if kid:
-                            knot_ids.add(kid)
-            if f == 'KNU_PLAN.csv':
-                filepath = os.path.join(root, f)
-                with open(filepath, newline='', encoding='utf-8') as cf:
-                    for row in csv.DictReader(cf):
-                        knu_id = row.get('knu_id', '').strip()
-                        knot_ref = row.get('knot_ref', '').strip()
-                        if knu_id and not knot_ref:
-                            orphan_knus.append((knu_id, filepath))
-                        if knot_ref:
-                            knu_knot_refs.add(knot_ref)
-
-    if orphan_knus:
-        print('ORPHAN KNUs DETECTED:')
-        for knu_id, path in orphan_knus:
-            print(f'  {knu_id} in {path}')
+    parser = argparse.ArgumentParser(description='Detect orphan KNUs and dangling cross-references.')
+    add_scope_arguments(parser)
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('detect_orphans', args)
+
+    try:
+        scope = open_scope(args, rule_inputs=[__file__])
+    except ChangeScopeError as e:
+        print(f'ERROR: {e}')
         sys.exit(1)
-    else:
-        print('No orphan KNUs detected')
-        sys.exit(0)
+    if scope is not None:
+        print(scope.describe(), file=sys.stderr)
+
+    registry = Registry()
+    reporter = FindingReporter('REFERENTIAL INTEGRITY', args.format, args.max_errors)
+    reporter.consume(iter_findings(registry=registry, scope=scope))
+    registry.close()
+    sys.exit(reporter.finish())
 
 
 if __name__ == '__main__':
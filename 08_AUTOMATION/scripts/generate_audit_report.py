@@ -2,27 +2,347 @@
 """
 generate_audit_report.py — Generate audit report from audit records
 Path: 08_AUTOMATION/scripts/generate_audit_report.py
+Usage: python3 generate_audit_report.py [--output-dir <DIR>] [--workers N] [--no-cache]
+
+Parses every audit record and NCR YAML under 09_AUDIT_AND_ASSURANCE and the
+product/standard audit/ folders and aggregates audits, findings, NCRs and
+corrective actions by audit type, audit status, product and lifecycle phase.
+Writes 10_REPORTING/quality/audit_summary.json and audit_summary.csv.
+
+Record shapes follow 00_META/schemas/audit_schema.yaml (documents with
+audit_id) and 03_SHARED_SERVICES/audit/nonconformity_model.yaml (documents
+with ncr_id). Entries of an audit's nonconformances list are NCRs: either
+inline NCR mappings or ncr_id strings resolved against standalone NCR files.
+A standalone NCR is attributed to the audit named by its source_audit.
+
+Files are parsed on a process pool; the parsed summary of each file is kept
+in the validation cache and reused while its content is unchanged, so only
+new or edited records are re-read.
 """
 
+import argparse
+import csv
+import json
+import multiprocessing
 import os
+import re
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import yaml
+except ImportError:
+    print('WARNING: PyYAML not available; audit report skipped')
+    sys.exit(0)
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from audit_sources import is_audit_source  # noqa: E402
+from fileio import atomic_open, atomic_write, relpath  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+from validation_cache import ValidationCache, rules_fingerprint  # noqa: E402
+from yaml_loader import LOADER_NAME, YamlLoadError, load_yaml, load_yaml_all  # noqa: E402
+
+AUDIT_SCHEMA = os.path.join(REPO_ROOT, '00_META', 'schemas', 'audit_schema.yaml')
+NCR_MODEL = os.path.join(REPO_ROOT, '03_SHARED_SERVICES', 'audit', 'nonconformity_model.yaml')
+OUTPUT_DIR = os.path.join(REPO_ROOT, '10_REPORTING', 'quality')
+
+
+NCR_CLOSED_STATUSES = {'CLOSED', 'REJECTED'}
+CA_CLOSED_STATUSES = {'CLOSED', 'COMPLETE', 'COMPLETED', 'VERIFIED'}
+UNASSIGNED = 'UNASSIGNED'
+PHASE_PATTERN = re.compile(r'^(LC\d{2})(?:_|$)')
+DIMENSIONS = ['audit_type', 'status', 'product', 'phase']
+MIN_POOL_FILES = 8
+
+
+def load_vocabulary():
+    """Return (finding types, NCR statuses) from the audit schema and nonconformity model."""
+    schema = load_yaml(AUDIT_SCHEMA) or {}
+    model = load_yaml(NCR_MODEL) or {}
+    return list(schema.get('finding_types', [])), list(model.get('ncr_statuses', []))
+
+
+def discover(root=REPO_ROOT):
+    """Return the sorted paths of every audit record and NCR YAML."""
+    found = []
+    for dirpath, _dirnames, filenames in walk_repo(root):
+        for f in filenames:
+            filepath = os.path.join(dirpath, f)
+            if is_audit_source(relpath(filepath, root)):
+                found.append(filepath)
+    return found
+
+
+def path_context(rel):
+    """Derive (product, phase) from a repo-relative path; either may be None."""
+    parts = rel.split('/')
+    product = None
+    if parts[0] == '04_PRODUCTS' and len(parts) > 2:
+        product = parts[1]
+        if 'variants' in parts[2:-1]:
+            i = parts.index('variants', 2)
+            if i + 1 < len(parts) - 1:
+                product = f'{parts[1]}/{parts[i + 1]}'
+    phase = next((m.group(1) for m in map(PHASE_PATTERN.match, parts[:-1]) if m), None)
+    return product, phase
+
+
+def code(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value.upper() if value else None
+
+
+def entries(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def summarize_ncr(ncr):
+    return {
+        'ncr_id': str(ncr.get('ncr_id') or '').strip() or None,
+        'status': code(ncr.get('status')) or 'OPEN',
+        'severity': code(ncr.get('severity')) or 'UNSPECIFIED',
+        'source_audit': str(ncr.get('source_audit') or '').strip() or None,
+    }
+
+
+def summarize_audit(record):
+    findings = Counter()
+    for entry in entries(record.get('findings')):
+        kind = code(entry.get('type') or entry.get('finding_type')) if isinstance(entry, dict) else None
+        findings[kind or 'UNCLASSIFIED'] += 1
+    findings['OBSERVATION'] += len(entries(record.get('observations')))
+    ncrs, ncr_refs = [], []
+    for entry in entries(record.get('nonconformances')):
+        if isinstance(entry, dict):
+            ncrs.append(summarize_ncr(entry))
+        elif str(entry).strip():
+            ncr_refs.append(str(entry).strip())
+    actions = Counter()
+    for entry in entries(record.get('corrective_actions')):
+        actions[(code(entry.get('status')) if isinstance(entry, dict) else None) or 'UNSPECIFIED'] += 1
+    return {
+        'audit_id': str(record.get('audit_id')).strip(),
+        'audit_type': code(record.get('audit_type')) or 'UNSPECIFIED',
+        'status': code(record.get('status')) or 'UNSPECIFIED',
+        'product': str(record.get('product') or '').strip() or None,
+        'phase': code(record.get('lifecycle_phase') or record.get('phase')),
+        'findings': dict(findings),
+        'ncrs': ncrs,
+        'ncr_refs': ncr_refs,
+        'corrective_actions': dict(actions),
+    }
+
+
+def parse_audit_file(filepath):
+    """Return the JSON-serializable summary of one audit YAML: {'audits', 'ncrs'} or {'error'}."""
+    try:
+        documents = [d for d in load_yaml_all(filepath, cache=False) if d is not None]
+    except YamlLoadError as e:
+        return {'error': f'line {e.line}: {e.message}' if e.line else e.message}
+    except OSError as e:
+        return {'error': str(e)}
+    audits, ncrs = [], []
+    for document in documents:
+        for record in entries(document):
+            if not isinstance(record, dict):
+                continue
+            if record.get('audit_id'):
+                audits.append(summarize_audit(record))
+            elif record.get('ncr_id'):
+                ncrs.append(summarize_ncr(record))
+    return {'audits': audits, 'ncrs': ncrs}
+
+
+def parse_all(files, cache=None, workers=None):
+    """Return {filepath: summary}, parsing cache misses on a process pool."""
+    summaries = {}
+    misses = []
+    for filepath in files:
+        entry = cache.lookup(filepath) if cache is not None else None
+        if entry is not None:
+            summaries[filepath] = entry['facts']
+        else:
+            misses.append(filepath)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(misses) or 1))
+    if workers == 1 or len(misses) < MIN_POOL_FILES:
+        parsed = map(parse_audit_file, misses)
+    else:
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            context = None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parsed = list(pool.map(parse_audit_file, misses, chunksize=max(1, len(misses) // (workers * 4))))
+    for filepath, summary in zip(misses, parsed):
+        summaries[filepath] = summary
+        if cache is not None:
+            cache.store(filepath, [], summary)
+    return summaries
+
+
+def new_bucket():
+    return {'audits': 0, 'findings': Counter(), 'ncr_status': Counter(), 'ncr_severity': Counter(),
+            'corrective_actions': Counter()}
+
+
+def aggregate(summaries, root=REPO_ROOT):
+    """Fold per-file summaries into {'totals', 'by_<dimension>', ...} buckets."""
+    audits = {}
+    ncrs = {}
+    inline = []
+    errors = []
+    for filepath, summary in sorted(summaries.items()):
+        rel = relpath(filepath, root)
+        if 'error' in summary:
+            errors.append({'file': rel, 'error': summary['error']})
+            continue
+        product, phase = path_context(rel)
+        for audit in summary['audits']:
+            audit = dict(audit, file=rel)
+            audit['product'] = audit['product'] or product or UNASSIGNED
+            audit['phase'] = audit['phase'] or phase or UNASSIGNED
+            audits.setdefault(audit['audit_id'], audit)
+            inline.extend((audit['audit_id'], ncr) for ncr in audit['ncrs'])
+        for ncr in summary['ncrs']:
+            ncrs.setdefault(ncr['ncr_id'], ncr)
+
+    # Standalone NCR files take precedence over inline copies of the same NCR.
+    attributed = {}
+    for i, (audit_id, ncr) in enumerate(inline):
+        key = ncr['ncr_id'] or f'{audit_id}#{i}'
+        attributed.setdefault(key, (audit_id, ncrs.get(ncr['ncr_id'], ncr)))
+    for audit in audits.values():
+        for ref in audit['ncr_refs']:
+            if ref in ncrs:
+                attributed.setdefault(ref, (audit['audit_id'], ncrs[ref]))
+    unattributed = []
+    for ncr_id, ncr in ncrs.items():
+        if ncr_id in attributed:
+            continue
+        if ncr['source_audit'] in audits:
+            attributed[ncr_id] = (ncr['source_audit'], ncr)
+        else:
+            unattributed.append(ncr_id)
+
+    totals = new_bucket()
+    groups = {dimension: {} for dimension in DIMENSIONS}
+    for audit in audits.values():
+        buckets = [totals] + [groups[d].setdefault(audit[d], new_bucket()) for d in DIMENSIONS]
+        for bucket in buckets:
+            bucket['audits'] += 1
+            bucket['findings'].update(audit['findings'])
+            bucket['corrective_actions'].update(audit['corrective_actions'])
+    for audit_id, ncr in attributed.values():
+        audit = audits[audit_id]
+        for bucket in [totals] + [groups[d][audit[d]] for d in DIMENSIONS]:
+            bucket['findings']['NONCONFORMANCE'] += 1
+            bucket['ncr_status'][ncr['status']] += 1
+            bucket['ncr_severity'][ncr['severity']] += 1
+    for ncr_id in unattributed:
+        totals['ncr_status'][ncrs[ncr_id]['status']] += 1
+        totals['ncr_severity'][ncrs[ncr_id]['severity']] += 1
+        totals['findings']['NONCONFORMANCE'] += 1
+
+    return {
+        'totals': totals,
+        **{f'by_{d}': dict(sorted(groups[d].items())) for d in DIMENSIONS},
+        'unattributed_ncrs': sorted(unattributed),
+        'unresolved_ncr_refs': sorted({ref for a in audits.values() for ref in a['ncr_refs'] if ref not in ncrs}),
+        'unparsed': errors,
+    }
+
+
+def bucket_row(bucket, finding_types):
+    open_ncrs = sum(n for status, n in bucket['ncr_status'].items() if status not in NCR_CLOSED_STATUSES)
+    open_actions = sum(n for status, n in bucket['corrective_actions'].items() if status not in CA_CLOSED_STATUSES)
+    row = {'audits': bucket['audits'], 'findings': sum(bucket['findings'].values())}
+    for kind in finding_types:
+        row[kind.lower()] = bucket['findings'].get(kind, 0)
+    row.update({'ncrs': sum(bucket['ncr_status'].values()), 'ncrs_open': open_ncrs,
+                'corrective_actions': sum(bucket['corrective_actions'].values()),
+                'corrective_actions_open': open_actions})
+    return row
+
+
+def bucket_json(bucket, finding_types, ncr_statuses):
+    row = bucket_row(bucket, finding_types)
+    row['findings_by_type'] = dict(sorted(bucket['findings'].items()))
+    row['ncrs_by_status'] = {s: bucket['ncr_status'].get(s, 0) for s in ncr_statuses}
+    row['ncrs_by_status'].update({s: n for s, n in sorted(bucket['ncr_status'].items()) if s not in row['ncrs_by_status']})
+    row['ncrs_by_severity'] = dict(sorted(bucket['ncr_severity'].items()))
+    row['corrective_actions_by_status'] = dict(sorted(bucket['corrective_actions'].items()))
+    return row
+
+
+def write_reports(report, output_dir, finding_types, ncr_statuses, files):
+    json_path = os.path.join(output_dir, 'audit_summary.json')
+    csv_path = os.path.join(output_dir, 'audit_summary.csv')
+    document = {
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'files_parsed': files,
+        'totals': bucket_json(report['totals'], finding_types, ncr_statuses),
+    }
+    for d in DIMENSIONS:
+        document[f'by_{d}'] = {key: bucket_json(b, finding_types, ncr_statuses) for key, b in report[f'by_{d}'].items()}
+    for key in ('unattributed_ncrs', 'unresolved_ncr_refs', 'unparsed'):
+        document[key] = report[key]
+    atomic_write(json_path, json.dumps(document, indent=2) + '\n')
+
+    columns = list(bucket_row(report['totals'], finding_types))
+    with atomic_open(csv_path) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['dimension', 'key'] + columns)
+        writer.writerow(['total', ''] + list(bucket_row(report['totals'], finding_types).values()))
+        for d in DIMENSIONS:
+            for key, bucket in report[f'by_{d}'].items():
+                writer.writerow([d, key] + list(bucket_row(bucket, finding_types).values()))
+    return json_path, csv_path
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Aggregate audit records, NCRs and corrective actions into quality reports.')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, metavar='DIR', help='report directory (default: 10_REPORTING/quality)')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true', help='re-parse every file and leave the cache untouched')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('generate_audit_report', args, phase='aggregate')
+
+    finding_types, ncr_statuses = load_vocabulary()
+    files = discover()
+    cache = None if args.no_cache else ValidationCache('generate_audit_report', rules_fingerprint(__file__, LOADER_NAME))
+    summaries = parse_all(files, cache, args.workers)
+    if cache is not None:
+        cache.save()
+
+    report = aggregate(summaries)
+    json_path, csv_path = write_reports(report, args.output_dir, finding_types, ncr_statuses, len(files))
+
+    totals = bucket_row(report['totals'], finding_types)
     print('Audit Report Generator')
     print('======================')
-    audit_dirs = []
-    for root, dirs, files in os.walk(REPO_ROOT):
-        if 'audit' in os.path.basename(root).lower():
-            for f in files:
-                if f.endswith('.yaml') or f.endswith('.csv'):
-                    audit_dirs.append(os.path.join(root, f))
-
-    print(f'Found {len(audit_dirs)} audit record files')
-    for f in audit_dirs:
-        print(f'  {f}')
+    print(f'Parsed {len(files)} audit files ({cache.hits if cache else 0} from cache)')
+    print(f'  Audits: {totals["audits"]}')
+    print(f'  Findings: {totals["findings"]}')
+    print(f'  NCRs: {totals["ncrs"]} ({totals["ncrs_open"]} open)')
+    print(f'  Corrective actions: {totals["corrective_actions"]} ({totals["corrective_actions_open"]} open)')
+    for entry in report['unparsed']:
+        print(f'WARNING: {entry["file"]} not parsed: {entry["error"]}')
+    for ncr_id in report['unattributed_ncrs']:
+        print(f'WARNING: NCR {ncr_id} has no matching source_audit')
+    for ref in report['unresolved_ncr_refs']:
+        print(f'WARNING: NCR reference {ref} has no NCR record')
+    print(f'Report written: {relpath(json_path)}, {relpath(csv_path)}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+generate_synthetic_portfolio.py — Build a synthetic repository tree for benchmarking
+Path: 08_AUTOMATION/scripts/generate_synthetic_portfolio.py
+Usage: python3 generate_synthetic_portfolio.py <OUTPUT_DIR> [--families N] [--variants M] [--rows K] [--phases P] [--seed S]
+
+Copies the repository framework (everything except 04_PRODUCTS and caches)
+into OUTPUT_DIR and generates, in the real layout:
+  04_PRODUCTS/SYN_FAMILY_<f>/variants/SYN_VARIANT_<v>/lifecycle/<LCxx_NAME>/KNOTS.csv and KNU_PLAN.csv
+  03_SHARED_SERVICES/evidence/evidence_register.csv
+  05_STANDARDS_LIBRARY/AS9100/lifecycle_os/mappings/clause_to_knu_matrix.csv
+
+Each phase of each variant gets K KNUs and ceil(K/2) KNOTs; every KNU has a
+parent KNOT and one evidence OID, every KNOT one clause mapping. Output is
+fully determined by the arguments, so the same sizes always produce the
+same tree. Scripts copied into OUTPUT_DIR resolve REPO_ROOT to it and can be
+run there unchanged.
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import random
+import shutil
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open  # noqa: E402
+from instrumentation import WRITE, add_metrics_arguments, phase, start_metrics  # noqa: E402
+from records import iter_rows  # noqa: E402
+from repo_walk import IGNORED_DIRS  # noqa: E402
+from scaffold_product_variant import LC_PHASES  # noqa: E402
+from yaml_loader import load_yaml  # noqa: E402
+
+CLAUSE_REGISTER = os.path.join('05_STANDARDS_LIBRARY', 'AS9100', 'registers', 'clause_register.csv')
+CLAUSE_MATRIX = os.path.join('05_STANDARDS_LIBRARY', 'AS9100', 'lifecycle_os', 'mappings', 'clause_to_knu_matrix.csv')
+EVIDENCE_REGISTER = os.path.join('03_SHARED_SERVICES', 'evidence', 'evidence_register.csv')
+KNU_SCHEMA = os.path.join(REPO_ROOT, '00_META', 'schemas', 'knu_schema.yaml')
+EVIDENCE_MODEL = os.path.join(REPO_ROOT, '00_META', 'schemas', 'evidence_model.yaml')
+
+KNOT_FIELDS = ['knot_id', 'title', 'lifecycle_phase', 'obligation_source', 'status', 'owner', 'created_date',
+               'description', 'clause_refs', 'knu_refs', 'compliance_status', 'notes']
+KNU_FIELDS = ['knu_id', 'title', 'lifecycle_phase', 'knot_ref', 'knu_class', 'status', 'owner', 'created_date',
+              'description', 'evidence_refs', 'compliance_status', 'start_date', 'end_date', 'notes']
+EVIDENCE_FIELDS = ['oid', 'title', 'evidence_type', 'lifecycle_phase', 'knot_ref', 'knu_ref', 'status',
+                   'created_date', 'author', 'description', 'file_path', 'external_ref', 'review_date', 'reviewer',
+                   'signoff_date', 'signoff_authority']
+MAPPING_FIELDS = ['mapping_id', 'standard', 'clause_id', 'clause_title', 'lifecycle_phase', 'knot_ref', 'knu_ref',
+                  'compliance_status', 'notes', 'exemption_ref']
+
+STATUSES = ['DRAFT', 'REVIEW', 'APPROVED', 'BASELINED']
+COMPLIANCE = ['NOT_STARTED', 'IN_PROGRESS', 'PENDING_REVIEW', 'COMPLIANT', 'PARTIAL', 'NON_COMPLIANT']
+OWNERS = ['ASIT', 'ENG-SYS', 'ENG-PROP', 'ENG-STRUCT', 'QA', 'CERT']
+PLAN_START = datetime.date(2026, 1, 5)
+PHASE_DAYS = 30
+MAX_SEQ = 9999
+
+
+def copy_framework(output_dir, root=REPO_ROOT):
+    """Copy every top-level entry except 04_PRODUCTS and ignored directories into output_dir."""
+    ignore = shutil.ignore_patterns(*IGNORED_DIRS, '*.egg-info')
+    os.makedirs(output_dir, exist_ok=True)
+    for name in sorted(os.listdir(root)):
+        if name in IGNORED_DIRS or name == '04_PRODUCTS':
+            continue
+        src, dst = os.path.join(root, name), os.path.join(output_dir, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, ignore=ignore, dirs_exist_ok=True)
+        else:
+            shutil.copy2(src, dst)
+    os.makedirs(os.path.join(output_dir, '04_PRODUCTS'), exist_ok=True)
+
+
+def write_csv(path, fields, rows):
+    with atomic_open(path) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(fields)
+        writer.writerows(rows)
+
+
+def generate_portfolio(output_dir, families=2, variants=2, rows=25, phases=len(LC_PHASES), seed=0):
+    """Generate the synthetic tree under output_dir; return the row and file counts."""
+    if not 1 <= rows <= MAX_SEQ:
+        raise ValueError(f'rows per phase must be between 1 and {MAX_SEQ}')
+    rng = random.Random(seed)
+    with phase(WRITE):
+        copy_framework(output_dir)
+    clauses = [(row['clause_id'], row['clause_title']) for _line, row in iter_rows(os.path.join(output_dir, CLAUSE_REGISTER))]
+    knu_classes = [str(c) for c in (load_yaml(KNU_SCHEMA) or {}).get('knu_classes', [])] or ['ARTEFACT']
+    evidence_types = [str(t) for t in (load_yaml(EVIDENCE_MODEL) or {}).get('evidence_types', [])] or ['OTHER']
+
+    counts = {'knots': 0, 'knus': 0, 'evidence': 0, 'mappings': 0, 'files': 0}
+    evidence = []
+    mappings = []
+    knots_per_phase = (rows + 1) // 2
+    for f in range(1, families + 1):
+        for v in range(1, variants + 1):
+            token = f'S{f:03d}{v:03d}'
+            base = os.path.join(output_dir, '04_PRODUCTS', f'SYN_FAMILY_{f:03d}', 'variants', f'SYN_VARIANT_{v:03d}')
+            for p, lc_phase in enumerate(LC_PHASES[:phases]):
+                lc = lc_phase[:4]
+                phase_start = PLAN_START + datetime.timedelta(days=PHASE_DAYS * p)
+                knot_ids = [f'KNOT-{token}-{lc}-{n:04d}' for n in range(1, knots_per_phase + 1)]
+                children = {knot_id: [] for knot_id in knot_ids}
+                knu_rows = []
+                for n in range(1, rows + 1):
+                    knu_id = f'KNU-{token}-{lc}-{n:04d}'
+                    knot_id = knot_ids[(n - 1) // 2]
+                    oid = f'OID-{token}-{lc}-{n:04d}'
+                    children[knot_id].append(knu_id)
+                    start = phase_start + datetime.timedelta(days=rng.randrange(PHASE_DAYS // 2))
+                    end = start + datetime.timedelta(days=rng.randrange(1, PHASE_DAYS // 2))
+                    knu_rows.append([knu_id, f'Synthetic unit {n} of {lc}', lc, knot_id, rng.choice(knu_classes),
+                                     rng.choice(STATUSES), rng.choice(OWNERS), '2026-01-01',
+                                     f'Generated work unit for {token} {lc}', oid, rng.choice(COMPLIANCE),
+                                     start.isoformat(), end.isoformat(), ''])
+                    evidence.append([oid, f'Evidence for {knu_id}', rng.choice(evidence_types), lc, knot_id, knu_id,
+                                     'DRAFT', '2026-01-01', rng.choice(OWNERS), '', '', '', '', '', '', ''])
+                knot_rows = []
+                for knot_id in knot_ids:
+                    clause_id, clause_title = rng.choice(clauses)
+                    knot_rows.append([knot_id, f'Synthetic obligation {knot_id}', lc, 'AS9100', rng.choice(STATUSES),
+                                      rng.choice(OWNERS), '2026-01-01', f'Generated obligation for {token} {lc}',
+                                      f'AS9100 {clause_id}', ';'.join(children[knot_id]), 'NOT_STARTED', ''])
+                    mappings.append([f'MAP-{token}-{lc}-{len(mappings) + 1:07d}', 'AS9100', clause_id, clause_title,
+                                     lc, knot_id, children[knot_id][0], 'NOT_STARTED', '', ''])
+                phase_dir = os.path.join(base, 'lifecycle', lc_phase)
+                write_csv(os.path.join(phase_dir, 'KNOTS.csv'), KNOT_FIELDS, knot_rows)
+                write_csv(os.path.join(phase_dir, 'KNU_PLAN.csv'), KNU_FIELDS, knu_rows)
+                counts['knots'] += len(knot_rows)
+                counts['knus'] += len(knu_rows)
+                counts['files'] += 2
+    write_csv(os.path.join(output_dir, EVIDENCE_REGISTER), EVIDENCE_FIELDS, evidence)
+    write_csv(os.path.join(output_dir, CLAUSE_MATRIX), MAPPING_FIELDS, mappings)
+    counts['evidence'] = len(evidence)
+    counts['mappings'] = len(mappings)
+    counts['files'] += 2
+    counts['rows'] = counts['knots'] + counts['knus'] + counts['evidence'] + counts['mappings']
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic portfolio tree for benchmarking.')
+    parser.add_argument('output_dir', metavar='OUTPUT_DIR', help='directory to create the tree in')
+    parser.add_argument('--families', type=int, default=2, metavar='N', help='product families (default: 2)')
+    parser.add_argument('--variants', type=int, default=2, metavar='M', help='variants per family (default: 2)')
+    parser.add_argument('--rows', type=int, default=25, metavar='K', help='KNU rows per lifecycle phase (default: 25)')
+    parser.add_argument('--phases', type=int, default=len(LC_PHASES), metavar='P',
+                        help=f'lifecycle phases per variant (default: {len(LC_PHASES)})')
+    parser.add_argument('--seed', type=int, default=0, metavar='S', help='random seed (default: 0)')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('generate_synthetic_portfolio', args, phase='generate')
+
+    output_dir = os.path.abspath(args.output_dir)
+    if os.path.exists(os.path.join(output_dir, '04_PRODUCTS')):
+        print(f'ERROR: {output_dir} already contains 04_PRODUCTS')
+        sys.exit(1)
+    try:
+        counts = generate_portfolio(output_dir, args.families, args.variants, args.rows, args.phases, args.seed)
+    except ValueError as e:
+        print(f'ERROR: {e}')
+        sys.exit(1)
+    print(f'Synthetic portfolio written to {output_dir}')
+    for key in ('knots', 'knus', 'evidence', 'mappings', 'files'):
+        print(f'  {key}: {counts[key]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,24 +2,41 @@
 """
 propagate_compliance.py — Propagate compliance status through the traceability chain
 Path: 08_AUTOMATION/scripts/propagate_compliance.py
+Usage: python3 propagate_compliance.py [--incremental] [--changed <KNU_PLAN.csv> ...]
+
+KNU compliance statuses are gathered into a knot_ref -> statuses index in a
+single pass over every KNU_PLAN.csv. Each KNOTS.csv is rewritten atomically,
+and only when one of its compliance_status values actually changes.
+
+With --incremental, per-file index contributions persisted from the previous
+run are reused: only KNU_PLAN.csv files whose signature changed (or those
+named with --changed) are re-read, and only KNOTs they reference — before or
+after the change — are recomputed, together with KNOTs in edited KNOTS.csv.
 """
 
-import csv
+import argparse
+import json
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import CACHE_DIR, atomic_write, file_signature, relpath  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import RecordTable, select_rows  # noqa: E402
+from registry_snapshot import Registry  # noqa: E402
+from repo_walk import walk_repo  # noqa: E402
+
+INDEX_STATE = os.path.join(CACHE_DIR, 'compliance_index.json')
+INDEX_STATE_VERSION = 1
 
 
-def get_knot_compliance(knot_id, knu_plan_files):
-    knu_statuses = []
-    for kfile in knu_plan_files:
-        with open(kfile, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('knot_ref', '').strip() == knot_id:
-                    knu_statuses.append(row.get('compliance_status', 'NOT_STARTED').strip())
+def knu_status(status):
+    return 'NOT_STARTED' if status is None else status.strip()
 
+
+def derive_knot_compliance(knu_statuses):
     if not knu_statuses:
         return 'NOT_STARTED'
     if 'NON_COMPLIANT' in knu_statuses:
@@ -31,33 +48,149 @@ def get_knot_compliance(knot_id, knu_plan_files):
     return 'PARTIAL'
 
 
+def read_knu_plan_contribution(filepath, registry=None):
+    """Return {knot_ref: [compliance_status, ...]} for one KNU_PLAN.csv."""
+    refs = {}
+    select = registry.select if registry is not None else select_rows
+    for _line, knot_ref, status in select(filepath, ['knot_ref', 'compliance_status']):
+        knot_ref = (knot_ref or '').strip()
+        if knot_ref:
+            refs.setdefault(knot_ref, []).append(knu_status(status))
+    return refs
+
+
+def build_status_index(contributions):
+    """Merge per-file contributions into one knot_ref -> statuses inverted index."""
+    index = {}
+    for refs in contributions.values():
+        for knot_ref, statuses in refs.items():
+            index.setdefault(knot_ref, []).extend(statuses)
+    return index
+
+
+def get_knot_compliance(knot_id, index):
+    return derive_knot_compliance(index.get(knot_id, []))
+
+
+def propagate_knots_csv(filepath, index, knot_filter=None):
+    """Recompute compliance_status in one KNOTS.csv; rewrite it only if a value changed.
+
+    Returns (knot_ids in file, number of KNOTs whose status changed).
+    """
+    with open(filepath, newline='', encoding='utf-8') as f:
+        content = f.read()
+    table = RecordTable.from_text(content, 'KNOTS.csv')
+    knot_ids = []
+    changed = 0
+    for row in table:
+        knot_id = (row.get('knot_id') or '').strip()
+        if not knot_id:
+            continue
+        knot_ids.append(knot_id)
+        if knot_filter is not None and knot_id not in knot_filter:
+            continue
+        status = get_knot_compliance(knot_id, index)
+        if (row.get('compliance_status') or '') != status:
+            row['compliance_status'] = status
+            changed += 1
+
+    if changed:
+        atomic_write(filepath, table.to_csv('\r\n' if '\r\n' in content else '\n'))
+    return knot_ids, changed
+
+
+def discover(root=REPO_ROOT):
+    knu_plan_files, knots_files = [], []
+    for dirpath, _dirnames, filenames in walk_repo(root):
+        if 'KNU_PLAN.csv' in filenames:
+            knu_plan_files.append(os.path.join(dirpath, 'KNU_PLAN.csv'))
+        if 'KNOTS.csv' in filenames:
+            knots_files.append(os.path.join(dirpath, 'KNOTS.csv'))
+    return knu_plan_files, knots_files
+
+
+def load_state(path=INDEX_STATE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != INDEX_STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state, path=INDEX_STATE):
+    atomic_write(path, json.dumps(state, sort_keys=True))
+
+
+def propagate(incremental=False, changed=None, root=REPO_ROOT, state_path=INDEX_STATE):
+    """Run propagation and return (knots recomputed, KNOTs changed, KNOTS.csv files rewritten)."""
+    knu_plan_files, knots_files = discover(root)
+    state = load_state(state_path) if incremental else None
+    old_plans = state['knu_plans'] if state else {}
+    old_knots = state['knots_files'] if state else {}
+    forced = {relpath(os.path.abspath(p), root) for p in (changed or [])}
+    registry = Registry(root)
+
+    plans = {}
+    touched = set()
+    for filepath in knu_plan_files:
+        rel = relpath(filepath, root)
+        sig = file_signature(filepath)
+        previous = old_plans.get(rel)
+        if previous and previous['signature'] == sig and rel not in forced:
+            plans[rel] = previous
+            continue
+        refs = read_knu_plan_contribution(filepath, registry)
+        plans[rel] = {'signature': sig, 'refs': refs}
+        if previous:
+            touched.update(previous['refs'])
+        touched.update(refs)
+    for rel in set(old_plans) - set(plans):
+        touched.update(old_plans[rel]['refs'])
+
+    registry.close()
+
+    index = build_status_index({rel: entry['refs'] for rel, entry in plans.items()})
+
+    knots = {}
+    recomputed = changed_knots = rewritten = 0
+    for filepath in knots_files:
+        rel = relpath(filepath, root)
+        previous = old_knots.get(rel)
+        if state is not None and previous and previous['signature'] == file_signature(filepath) \
+                and rel not in forced:
+            if not touched.intersection(previous['knot_ids']):
+                knots[rel] = previous
+                continue
+            knot_filter = touched
+        else:
+            knot_filter = None
+        knot_ids, n = propagate_knots_csv(filepath, index, knot_filter)
+        recomputed += len(knot_ids) if knot_filter is None else len(touched.intersection(knot_ids))
+        changed_knots += n
+        rewritten += 1 if n else 0
+        knots[rel] = {'signature': file_signature(filepath), 'knot_ids': knot_ids}
+
+    save_state({'version': INDEX_STATE_VERSION, 'knu_plans': plans, 'knots_files': knots}, state_path)
+    return recomputed, changed_knots, rewritten
+
+
 def main():
-    knu_plan_files = []
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f == 'KNU_PLAN.csv':
-                knu_plan_files.append(os.path.join(root, f))
-
-    for root, dirs, files in os.walk(REPO_ROOT):
-        for f in files:
-            if f == 'KNOTS.csv':
-                filepath = os.path.join(root, f)
-                rows = []
-                with open(filepath, newline='', encoding='utf-8') as cf:
-                    reader = csv.DictReader(cf)
-                    fieldnames = reader.fieldnames
-                    for row in reader:
-                        knot_id = row.get('knot_id', '').strip()
-                        if knot_id:
-                            row['compliance_status'] = get_knot_compliance(knot_id, knu_plan_files)
-                        rows.append(row)
-
-                with open(filepath, 'w', newline='', encoding='utf-8') as cf:
-                    writer = csv.DictWriter(cf, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(rows)
-
-    print('Compliance propagation complete')
+    parser = argparse.ArgumentParser(description='Propagate KNU compliance status up to KNOTs.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse the persisted index and recompute only KNOTs touched by changed files')
+    parser.add_argument('--changed', nargs='+', metavar='FILE', default=[],
+                        help='treat these KNU_PLAN.csv/KNOTS.csv files as changed (implies --incremental)')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('propagate_compliance', args, phase='propagate')
+
+    recomputed, changed_knots, rewritten = propagate(incremental=args.incremental or bool(args.changed),
+                                                      changed=args.changed)
+    print(f'Compliance propagation complete: {recomputed} KNOTs recomputed, '
+          f'{changed_knots} changed, {rewritten} KNOTS.csv files rewritten')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+resolve_effectivity.py — Resolve effectivity for tail serials on a date
+Path: 08_AUTOMATION/scripts/resolve_effectivity.py
+Usage: python3 resolve_effectivity.py --fleet <fleet.csv> [--date YYYY-MM-DD] [--output <OUT.csv|OUT.json>]
+       python3 resolve_effectivity.py --variant <FAMILY/VARIANT> --serials <N-M,...> [--modifications <MOD,...>] [--date ...]
+
+Lists, for every serial, the effectivity rules in force on the date (default
+today) and the configuration items and service bulletins they make
+applicable. The fleet CSV has the columns variant (FAMILY/VARIANT), serial
+and, optionally, modifications (';'-separated mods the tail has
+incorporated).
+
+Every variant's configuration/effectivity_rules.yaml is compiled once into
+serial and date range indexes (see 02_LIFECYCLE_OS/lib/effectivity.py), so
+a fleet-wide query costs one bisect per serial rather than a scan of every
+rule. Invalid rules fail the run before anything is resolved.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from effectivity import EffectivityError, EffectivityIndex, parse_date, parse_serial, parse_serial_ranges  # noqa: E402
+from fileio import atomic_open, atomic_write  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import iter_rows, split_multi  # noqa: E402
+
+MAX_EXPANDED_SERIALS = 1000000
+RESULT_FIELDS = ['rules', 'configuration_items', 'service_bulletins']
+
+
+def fleet_queries(path):
+    """Return [(variant, serial, modifications)] from a fleet CSV; raise EffectivityError on bad rows."""
+    queries, problems = [], []
+    for line, row in iter_rows(path):
+        variant = (row.get('variant') or '').strip()
+        try:
+            serial = parse_serial(row.get('serial') or '')
+        except ValueError as e:
+            problems.append(f'{path}:{line}: {e}')
+            continue
+        if not variant:
+            problems.append(f'{path}:{line}: missing variant')
+            continue
+        queries.append((variant, serial, frozenset(split_multi(row.get('modifications')))))
+    if problems:
+        raise EffectivityError(problems)
+    return queries
+
+
+def range_queries(variant, serials, modifications):
+    try:
+        ranges = parse_serial_ranges([s for s in serials.split(',') if s.strip()])
+    except ValueError as e:
+        raise EffectivityError([f'--serials: {e}']) from None
+    if any(hi == float('inf') for _lo, hi in ranges) or sum(hi - lo + 1 for lo, hi in ranges) > MAX_EXPANDED_SERIALS:
+        raise EffectivityError([f'--serials: give closed ranges of at most {MAX_EXPANDED_SERIALS} serials'])
+    mods = frozenset(m.strip() for m in (modifications or '').split(',') if m.strip())
+    return [(variant, serial, mods) for lo, hi in ranges for serial in range(lo, hi + 1)]
+
+
+def write_results(path, results, date, unknown):
+    if path.lower().endswith('.json'):
+        document = {
+            'date': date,
+            'results': [{'variant': v, 'serial': s, **resolution._asdict()} for (v, s, _m), resolution in results],
+            'variants_without_rules': unknown,
+        }
+        atomic_write(path, json.dumps(document, indent=2) + '\n')
+        return
+    with atomic_open(path) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['variant', 'serial'] + RESULT_FIELDS)
+        for (variant, serial, _mods), resolution in results:
+            writer.writerow([variant, serial] + [';'.join(values) for values in resolution])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve which effectivity rules, configuration items and service '
+                                                 'bulletins apply to tail serials on a date.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--fleet', metavar='CSV', help='CSV with variant, serial[, modifications] columns')
+    source.add_argument('--variant', metavar='FAMILY/VARIANT', help='resolve --serials of one variant')
+    parser.add_argument('--serials', metavar='RANGES', help="with --variant: serials as 'N', 'N-M', comma-separated")
+    parser.add_argument('--modifications', metavar='MODS', help='with --variant: comma-separated mods incorporated')
+    parser.add_argument('--date', default=datetime.date.today().isoformat(), help='effectivity date (default: today)')
+    parser.add_argument('--output', metavar='PATH', help='write the results as CSV, or JSON for a .json path')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('resolve_effectivity', args, phase='resolve')
+
+    if args.variant and not args.serials:
+        parser.error('--variant needs --serials')
+    try:
+        parse_date(args.date)
+    except ValueError as e:
+        parser.error(f'--date: {e}')
+
+    try:
+        queries = fleet_queries(args.fleet) if args.fleet else range_queries(args.variant, args.serials,
+                                                                               args.modifications)
+        index = EffectivityIndex()
+        if index.problems:
+            raise EffectivityError(index.problems)
+    except (OSError, EffectivityError) as e:
+        print('EFFECTIVITY VALIDATION FAILED:')
+        for problem in getattr(e, 'problems', [str(e)]):
+            print(f'  {problem}')
+        sys.exit(1)
+
+    results = [(query, resolution) for query, resolution in index.resolve(queries, args.date) if resolution is not None]
+    unknown = sorted({variant for variant, _serial, _mods in queries} - set(index.variants))
+
+    if args.output:
+        write_results(args.output, results, args.date, unknown)
+    else:
+        for (variant, serial, _mods), resolution in results:
+            print(f'{variant} {serial}: rules {", ".join(resolution.rules) or "-"}; '
+                  f'CIs {", ".join(resolution.configuration_items) or "-"}; '
+                  f'SBs {", ".join(resolution.service_bulletins) or "-"}')
+    for variant in unknown:
+        print(f'WARNING: {variant} has no effectivity rules; its serials are not resolved')
+    print(f'Resolved {len(results)} serials of {len({q[0] for q, _r in results})} variant(s) on {args.date}'
+          + (f'; written to {args.output}' if args.output else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+run_benchmarks.py — Time the lifecycle tools on synthetic portfolios
+Path: 08_AUTOMATION/scripts/run_benchmarks.py
+Usage: python3 run_benchmarks.py [--sizes small,medium,large] [--repeat N] [--baseline <PATH>]
+                                 [--update-baseline] [--threshold X] [--max-growth X] [--json <OUTPUT>] [--keep]
+
+For every size a synthetic tree is generated with
+generate_synthetic_portfolio.py and each validator, detect_orphans.py,
+propagate_compliance.py and dag_scheduler.py is run in it as a separate
+process. Each tool is run --repeat times; the best wall time and the
+largest peak RSS are reported. Tools in WRITES_TREE modify the tree, so
+before each of their runs the tree is restored from a pristine copy taken
+after generation; every run of them times the full rewrite, not the no-op
+that follows it.
+
+Results are compared with 08_AUTOMATION/ci/benchmark_baseline.json: a tool
+regresses when its time exceeds the baseline by more than --threshold
+(and by at least MIN_DELTA_SECONDS), or its peak RSS by more than
+--rss-threshold. Between consecutive sizes the growth exponent
+log(t2/t1) / log(rows2/rows1) is computed on time net of interpreter
+startup; above --max-growth a tool is flagged SUPERLINEAR. Regressions,
+superlinear growth and failing tools exit 1. --update-baseline records the
+current results instead of comparing.
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_write  # noqa: E402
+from generate_synthetic_portfolio import generate_portfolio  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+
+BASELINE = os.path.join(REPO_ROOT, '08_AUTOMATION', 'ci', 'benchmark_baseline.json')
+
+# name: (families, variants, KNU rows per phase)
+SIZES = {
+    'small': (2, 2, 25),
+    'medium': (4, 4, 100),
+    'large': (8, 8, 200),
+}
+DEFAULT_SIZES = ['small', 'medium']
+
+# (name, script relative to the tree root, arguments)
+TOOLS = [
+    ('validate_structure', '02_LIFECYCLE_OS/validators/validate_structure.py', []),
+    ('validate_knots', '02_LIFECYCLE_OS/validators/validate_knots.py', ['--no-cache']),
+    ('validate_knus', '02_LIFECYCLE_OS/validators/validate_knus.py', ['--no-cache']),
+    ('validate_mappings', '02_LIFECYCLE_OS/validators/validate_mappings.py', ['--no-cache']),
+    ('validate_evidence', '02_LIFECYCLE_OS/validators/validate_evidence.py', []),
+    ('validate_audit_records', '02_LIFECYCLE_OS/validators/validate_audit_records.py', ['--no-cache']),
+    ('brex_engine', '02_LIFECYCLE_OS/validators/brex_engine.py', []),
+    ('detect_orphans', '08_AUTOMATION/scripts/detect_orphans.py', []),
+    ('propagate_compliance', '08_AUTOMATION/scripts/propagate_compliance.py', []),
+    ('dag_scheduler', '02_LIFECYCLE_OS/schedulers/dag_scheduler.py', []),
+    ('dag_scheduler_knu', '02_LIFECYCLE_OS/schedulers/dag_scheduler.py', ['--knu']),
+]
+# Tools that rewrite registry files in the tree they run in
+WRITES_TREE = {'propagate_compliance'}
+
+MIN_DELTA_SECONDS = 0.1
+MIN_DELTA_RSS_KB = 10 * 1024
+MIN_GROWTH_SECONDS = 0.5
+
+
+# Linux carries the peak RSS of the process image replaced by exec() over to
+# the new one, so a tool spawned directly from this (large) process would
+# report our RSS. The probe is a bare interpreter that forks and execs the
+# tool, times it and writes "<seconds> <ru_maxrss>" to the file in argv[1].
+RSS_PROBE = '''
+import os, sys, time
+start = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.argv[2], sys.argv[2:])
+_pid, status, usage = os.wait4(pid, 0)
+seconds = time.perf_counter() - start
+rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+with open(sys.argv[1], "w") as f:
+    f.write(f"{seconds} {rss}")
+sys.exit(os.waitstatus_to_exitcode(status))
+'''
+
+
+def run_process(argv, cwd):
+    """Run argv; return (exit code, wall seconds, peak RSS in KiB or None, output)."""
+    with tempfile.TemporaryFile() as out, tempfile.NamedTemporaryFile('r', suffix='.probe') as probe:
+        if hasattr(os, 'fork') and hasattr(os, 'wait4'):
+            command = [sys.executable, '-S', '-c', RSS_PROBE, probe.name, *argv]
+        else:
+            command = argv
+        start = time.perf_counter()
+        code = subprocess.call(command, cwd=cwd, stdout=out, stderr=subprocess.STDOUT)
+        seconds, rss = time.perf_counter() - start, None
+        measured = probe.read().split()
+        if len(measured) == 2:
+            seconds, rss = float(measured[0]), int(measured[1])
+        out.seek(0)
+        output = out.read().decode('utf-8', errors='replace')
+    return code, seconds, rss, output
+
+
+def startup_seconds(repeat):
+    """Best wall time of a bare interpreter importing PyYAML, subtracted before growth fitting."""
+    return min(run_process([sys.executable, '-c', 'import yaml'], REPO_ROOT)[1] for _ in range(max(1, repeat)))
+
+
+def benchmark_size(name, workdir, repeat):
+    families, variants, rows = SIZES[name]
+    tree = os.path.join(workdir, name)
+    start = time.perf_counter()
+    counts = generate_portfolio(tree, families, variants, rows)
+    generated = time.perf_counter() - start
+    pristine = tree + '.pristine'
+    shutil.copytree(tree, pristine, symlinks=True)
+    results = {}
+    for tool, script, args in TOOLS:
+        best, peak, code, output = None, None, 0, ''
+        for _ in range(max(1, repeat)):
+            if tool in WRITES_TREE:
+                shutil.rmtree(tree)
+                shutil.copytree(pristine, tree, symlinks=True)
+            rc, seconds, rss, out = run_process([sys.executable, os.path.join(tree, script), *args], tree)
+            if rc != 0:
+                code, output = rc, out
+            best = seconds if best is None else min(best, seconds)
+            if rss is not None:
+                peak = rss if peak is None else max(peak, rss)
+        results[tool] = {'seconds': round(best, 4), 'peak_rss_kb': peak, 'exit_code': code}
+        if code != 0:
+            results[tool]['output_tail'] = output.splitlines()[-10:]
+    shutil.rmtree(pristine, ignore_errors=True)
+    return {'families': families, 'variants': variants, 'rows_per_phase': rows, 'rows': counts['rows'],
+            'files': counts['files'], 'generate_seconds': round(generated, 3), 'tools': results}
+
+
+def compare(results, baseline, threshold, rss_threshold):
+    """Return [(size, tool, message)] for every regression against baseline."""
+    regressions = []
+    for size, run in results.items():
+        base_tools = baseline.get(size, {}).get('tools', {})
+        for tool, r in run['tools'].items():
+            b = base_tools.get(tool)
+            if not b:
+                continue
+            if r['seconds'] > b['seconds'] * threshold and r['seconds'] - b['seconds'] >= MIN_DELTA_SECONDS:
+                regressions.append((size, tool, f'{r["seconds"]:.3f}s vs baseline {b["seconds"]:.3f}s'))
+            if r['peak_rss_kb'] and b.get('peak_rss_kb') and r['peak_rss_kb'] > b['peak_rss_kb'] * rss_threshold \
+                    and r['peak_rss_kb'] - b['peak_rss_kb'] >= MIN_DELTA_RSS_KB:
+                regressions.append((size, tool, f'peak RSS {r["peak_rss_kb"] // 1024} MiB vs baseline '
+                                                f'{b["peak_rss_kb"] // 1024} MiB'))
+    return regressions
+
+
+def growth(results, startup, max_growth):
+    """Return ({tool: [(from size, to size, exponent)]}, [(tool, message)] over max_growth)."""
+    ordered = sorted(results, key=lambda size: results[size]['rows'])
+    exponents = {}
+    flagged = []
+    for a, b in zip(ordered, ordered[1:]):
+        ratio = results[b]['rows'] / results[a]['rows']
+        if ratio <= 1:
+            continue
+        for tool in results[b]['tools']:
+            ta = results[a]['tools'][tool]['seconds'] - startup
+            tb = results[b]['tools'][tool]['seconds'] - startup
+            if ta <= 0 or tb <= 0:
+                continue
+            exponent = math.log(tb / ta) / math.log(ratio)
+            exponents.setdefault(tool, []).append((a, b, round(exponent, 2)))
+            if exponent > max_growth and tb >= MIN_GROWTH_SECONDS:
+                flagged.append((tool, f'time grows as rows^{exponent:.2f} from {a} to {b}'))
+    return exponents, flagged
+
+
+def print_report(results, baseline, exponents):
+    print(f'{"SIZE":<8} {"TOOL":<24} {"SECONDS":>9} {"BASELINE":>9} {"PEAK MiB":>9}  GROWTH')
+    for size, run in results.items():
+        base_tools = baseline.get(size, {}).get('tools', {})
+        for tool, r in run['tools'].items():
+            b = base_tools.get(tool, {}).get('seconds')
+            rss = f'{r["peak_rss_kb"] / 1024:.1f}' if r['peak_rss_kb'] else '-'
+            grown = next((e for _a, to, e in exponents.get(tool, []) if to == size), None)
+            status = '' if r['exit_code'] == 0 else f'  exit {r["exit_code"]}'
+            print(f'{size:<8} {tool:<24} {r["seconds"]:>9.3f} {b if b is not None else "-":>9} '
+                  f'{rss:>9}  {grown if grown is not None else "-"}{status}')
+        print(f'{size:<8} ({run["rows"]} rows in {run["files"]} files, generated in {run["generate_seconds"]}s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the lifecycle tools on synthetic portfolios.')
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f'comma-separated sizes from {", ".join(SIZES)} (default: {",".join(DEFAULT_SIZES)})')
+    parser.add_argument('--repeat', type=int, default=3, metavar='N', help='runs per tool; the best is kept (default: 3)')
+    parser.add_argument('--baseline', default=BASELINE, metavar='PATH', help='baseline JSON to compare with or update')
+    parser.add_argument('--update-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=1.5, metavar='X',
+                        help='time regression ratio against the baseline (default: 1.5)')
+    parser.add_argument('--rss-threshold', type=float, default=1.5, metavar='X',
+                        help='peak RSS regression ratio against the baseline (default: 1.5)')
+    parser.add_argument('--max-growth', type=float, default=1.5, metavar='X',
+                        help='largest acceptable growth exponent between sizes (default: 1.5)')
+    parser.add_argument('--workdir', metavar='DIR', help='generate trees here instead of a temporary directory')
+    parser.add_argument('--keep', action='store_true', help='keep the generated trees')
+    parser.add_argument('--json', metavar='OUTPUT', help='write the results as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('run_benchmarks', args, phase='benchmark')
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        print(f'ERROR: unknown size(s): {", ".join(unknown)}')
+        sys.exit(1)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='aerospacemodel-bench-')
+    try:
+        startup = startup_seconds(args.repeat)
+        results = {size: benchmark_size(size, workdir, args.repeat) for size in sizes}
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if not args.update_baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f).get('sizes', {})
+        except (OSError, ValueError):
+            print(f'WARNING: no baseline at {args.baseline}; nothing to compare against')
+
+    exponents, superlinear = growth(results, startup, args.max_growth)
+    regressions = compare(results, baseline, args.threshold, args.rss_threshold)
+    failures = [(size, tool, r) for size, run in results.items() for tool, r in run['tools'].items() if r['exit_code']]
+
+    print_report(results, baseline, exponents)
+    print(f'Interpreter startup: {startup:.3f}s')
+    if args.keep or args.workdir:
+        print(f'Trees kept in {workdir}')
+
+    if args.json:
+        atomic_write(args.json, json.dumps({'startup_seconds': round(startup, 4), 'sizes': results,
+                                            'growth': exponents, 'regressions': regressions,
+                                            'superlinear': superlinear}, indent=2) + '\n')
+    if args.update_baseline:
+        atomic_write(args.baseline, json.dumps({'python': sys.version.split()[0], 'sizes': results}, indent=2) + '\n')
+        print(f'Baseline written: {args.baseline}')
+
+    if failures or regressions or superlinear:
+        print('BENCHMARK FAILED:')
+        for size, tool, r in failures:
+            print(f'  {size} {tool}: exit {r["exit_code"]}')
+            for line in r.get('output_tail', []):
+                print(f'    {line}')
+        for size, tool, message in regressions:
+            print(f'  {size} {tool}: REGRESSION {message}')
+        for tool, message in superlinear:
+            print(f'  {tool}: SUPERLINEAR {message}')
+        sys.exit(1)
+    print('BENCHMARK PASSED')
+
+
+if __name__ == '__main__':
+    main()
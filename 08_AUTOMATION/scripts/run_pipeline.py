@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+run_pipeline.py — Run the CI pipeline or a scheduled job locally, in parallel
+Path: 08_AUTOMATION/scripts/run_pipeline.py
+Usage: python3 run_pipeline.py [--job <JOB_NAME>] [--workers N] [--json <OUTPUT>]
+
+Reads 08_AUTOMATION/ci/pipeline.yaml (or 08_AUTOMATION/jobs/<JOB_NAME>.yaml)
+and runs every stage whose depends_on are satisfied concurrently on a pool
+of worker processes. Python stages are executed inside the long-lived
+workers with runpy instead of being spawned as fresh interpreters, so
+interpreter startup and PyYAML import are paid once per worker.
+
+A failing stage with on_failure FAIL fails the run and skips its transitive
+dependents; with on_failure WARN it is reported and dependents still run.
+Job steps take depends_on/on_failure from the pipeline stage of the same
+name; other job steps depend on every step listed before them.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import runpy
+import shlex
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    import yaml
+except ImportError:
+    print('ERROR: PyYAML is required to read pipeline definitions')
+    sys.exit(1)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+PIPELINE = os.path.join(REPO_ROOT, '08_AUTOMATION', 'ci', 'pipeline.yaml')
+JOBS_DIR = os.path.join(REPO_ROOT, '08_AUTOMATION', 'jobs')
+PYTHON_COMMANDS = {'python', 'python3', os.path.basename(sys.executable)}
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+import yaml_loader  # noqa: E402
+from fileio import atomic_open  # noqa: E402
+from instrumentation import add_metrics_arguments, finish_metrics, reset_metrics, start_metrics  # noqa: E402
+
+
+def load_yaml(path):
+    return yaml_loader.load_yaml(path) or {}
+
+
+def load_pipeline_stages(path=PIPELINE):
+    stages = []
+    for stage in load_yaml(path).get('stages', []):
+        stages.append({
+            'name': stage['name'],
+            'script': stage['script'],
+            'on_failure': stage.get('on_failure', 'FAIL'),
+            'depends_on': list(stage.get('depends_on', [])),
+        })
+    return stages
+
+
+def load_job_stages(job_name, pipeline_path=PIPELINE, jobs_dir=JOBS_DIR):
+    pipeline = {s['name']: s for s in load_pipeline_stages(pipeline_path)}
+    steps = load_yaml(os.path.join(jobs_dir, f'{job_name}.yaml')).get('steps', [])
+    names = [step['name'] for step in steps]
+    stages = []
+    for i, step in enumerate(steps):
+        declared = pipeline.get(step['name'])
+        if 'depends_on' in step:
+            depends_on = list(step['depends_on'])
+        elif declared is not None:
+            depends_on = [d for d in declared['depends_on'] if d in names]
+        else:
+            depends_on = names[:i]
+        stages.append({
+            'name': step['name'],
+            'script': step['script'],
+            'on_failure': step.get('on_failure', declared['on_failure'] if declared else 'FAIL'),
+            'depends_on': depends_on,
+        })
+    return stages
+
+
+def check_dag(stages):
+    """Raise ValueError on unknown dependencies or cycles."""
+    names = {s['name'] for s in stages}
+    for stage in stages:
+        unknown = [d for d in stage['depends_on'] if d not in names]
+        if unknown:
+            raise ValueError(f"stage {stage['name']} depends on unknown stage(s): {', '.join(unknown)}")
+    indegree = {s['name']: len(s['depends_on']) for s in stages}
+    dependents = {s['name']: [] for s in stages}
+    for stage in stages:
+        for dep in stage['depends_on']:
+            dependents[dep].append(stage['name'])
+    ready = [n for n, d in indegree.items() if d == 0]
+    seen = 0
+    while ready:
+        name = ready.pop()
+        seen += 1
+        for child in dependents[name]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if seen != len(stages):
+        cyclic = sorted(n for n, d in indegree.items() if d > 0)
+        raise ValueError(f"dependency cycle among stages: {', '.join(cyclic)}")
+
+
+def run_stage(script):
+    """Execute one stage command in this worker; return (exit_code, output, seconds)."""
+    start = time.perf_counter()
+    argv = shlex.split(script)
+    out = io.StringIO()
+    code = 0
+    if len(argv) >= 2 and argv[0] in PYTHON_COMMANDS and argv[1].endswith('.py'):
+        path = os.path.join(REPO_ROOT, argv[1])
+        saved_argv, saved_path, saved_cwd = sys.argv, list(sys.path), os.getcwd()
+        sys.argv = [path] + argv[2:]
+        sys.path.insert(0, os.path.dirname(path))
+        try:
+            os.chdir(REPO_ROOT)
+            # A forked worker inherits the runner's own metrics; the stage
+            # starts its own when its command line asks for them.
+            reset_metrics()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                runpy.run_path(path, run_name='__main__')
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if not isinstance(e.code, (int, type(None))):
+                out.write(f'{e.code}\n')
+        except Exception:
+            out.write(traceback.format_exc())
+            code = 1
+        finally:
+            finish_metrics()
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            os.chdir(saved_cwd)
+    else:
+        proc = subprocess.run(argv, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        out.write(proc.stdout)
+        code = proc.returncode
+    return code, out.getvalue(), time.perf_counter() - start
+
+
+def execute(stages, workers=None):
+    """Run stages respecting depends_on; return results in declaration order."""
+    check_dag(stages)
+    by_name = {s['name']: s for s in stages}
+    results = {}
+    pending = dict(by_name)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(stages) or 1))
+
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        context = None
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                deps = by_name[name]['depends_on']
+                if any(results.get(d, {}).get('status') in ('FAILED', 'SKIPPED') for d in deps):
+                    blocker = next(d for d in deps if results.get(d, {}).get('status') in ('FAILED', 'SKIPPED'))
+                    results[name] = {'name': name, 'status': 'SKIPPED', 'exit_code': None,
+                                     'seconds': 0.0, 'output': f'skipped: dependency {blocker} did not pass\n'}
+                    del pending[name]
+                elif all(d in results for d in deps):
+                    running[pool.submit(run_stage, by_name[name]['script'])] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, output, seconds = future.result()
+                if code == 0:
+                    status = 'PASSED'
+                elif by_name[name]['on_failure'] == 'WARN':
+                    status = 'WARNED'
+                else:
+                    status = 'FAILED'
+                results[name] = {'name': name, 'status': status, 'exit_code': code,
+                                 'seconds': round(seconds, 3), 'output': output}
+    return [results[s['name']] for s in stages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pipeline.yaml stages or a job locally in parallel.')
+    parser.add_argument('--job', metavar='JOB_NAME', help='run 08_AUTOMATION/jobs/<JOB_NAME>.yaml instead of the CI pipeline')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--json', metavar='OUTPUT', help='write per-stage results and timings as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('run_pipeline', args, phase='run')
+
+    stages = load_job_stages(args.job) if args.job else load_pipeline_stages()
+    try:
+        start = time.perf_counter()
+        results = execute(stages, args.workers)
+        wall = time.perf_counter() - start
+    except ValueError as e:
+        print(f'ERROR: {e}')
+        sys.exit(1)
+
+    for result in results:
+        print(f"=== {result['name']} [{result['status']}]")
+        for line in result['output'].rstrip('\n').splitlines():
+            print(f'  {line}')
+
+    print()
+    print(f"{'STAGE':<32} {'STATUS':<8} {'SECONDS':>8}")
+    for result in results:
+        print(f"{result['name']:<32} {result['status']:<8} {result['seconds']:>8.3f}")
+    print(f"{'wall time':<32} {'':<8} {wall:>8.3f}")
+
+    if args.json:
+        with atomic_open(args.json) as f:
+            json.dump({'wall_seconds': round(wall, 3), 'stages': results}, f, indent=2)
+            f.write('\n')
+
+    sys.exit(1 if any(r['status'] == 'FAILED' for r in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
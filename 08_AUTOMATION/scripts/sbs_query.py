@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+sbs_query.py — SBS subtree, ATA chapter and roll-up queries
+Path: 08_AUTOMATION/scripts/sbs_query.py
+Usage: python3 sbs_query.py [<SBS_CODE|ATA_CHAPTER> ...] [--rollup <CSV> --column <COLUMN>] [--json <OUTPUT>]
+                            [--format text|jsonl] [--max-errors N]
+
+For an SBS code (SYS-100): its ancestors, its subtree and the ATA chapters
+of the node and of the whole subtree. For an ATA chapter (27, ATA-27): the
+SBS codes listing it in sbs_codes.csv and the code chapter_mapping.csv maps
+it to. --rollup counts the rows of any CSV whose COLUMN holds SBS codes
+(';'-separated) per code and per subtree, e.g. everything under SYS-100.
+
+The hierarchy and crosswalk checks of 02_LIFECYCLE_OS/lib/sbs_index.py run
+on every invocation; the run fails on ERROR findings (broken hierarchy)
+and only reports WARNING findings (crosswalk files that disagree).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open  # noqa: E402
+from findings import FindingReporter, add_reporting_arguments  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from records import iter_rows, split_multi  # noqa: E402
+from sbs_index import ERROR, SbsIndex, chapter_key  # noqa: E402
+
+
+def code_result(index, code):
+    node = index.nodes[code]
+    return {
+        'name': node.name,
+        'level': node.level,
+        'ancestors': index.ancestors(code),
+        'subtree': index.subtree(code),
+        'ata_chapters': index.chapters(code),
+        'subtree_ata_chapters': index.chapters(code, subtree=True),
+    }
+
+
+def chapter_result(index, chapter):
+    return {'sbs_codes': index.codes_for_chapter(chapter), 'chapter_mapping': index.mapping.get(chapter)}
+
+
+def rollup(index, path, column):
+    """Return ({code: rows}, {code: rows in subtree}, unknown codes) for a CSV column of SBS codes."""
+    direct, unknown = {}, {}
+    for _line, row in iter_rows(path):
+        for code in split_multi(row.get(column)):
+            target = direct if index.interval(code) else unknown
+            target[code] = target.get(code, 0) + 1
+    return direct, index.subtree_totals(direct), unknown
+
+
+def print_code(code, result):
+    print(f'{code} {result["name"]} (level {result["level"]}):')
+    print(f'  ancestors: {", ".join(result["ancestors"]) or "-"}')
+    print(f'  subtree ({len(result["subtree"])}): {", ".join(result["subtree"])}')
+    print(f'  ATA chapters: {", ".join(result["ata_chapters"]) or "-"}; '
+          f'with subtree: {", ".join(result["subtree_ata_chapters"]) or "-"}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the SBS hierarchy and ATA crosswalk and roll counts up SBS subtrees.')
+    parser.add_argument('queries', nargs='*', metavar='QUERY', help='SBS code (SYS-100) or ATA chapter (27, ATA-27)')
+    parser.add_argument('--rollup', metavar='CSV', help='count the rows of CSV per SBS code and subtree')
+    parser.add_argument('--column', default='sbs_code', help='with --rollup: column holding SBS codes (default: sbs_code)')
+    parser.add_argument('--json', metavar='OUTPUT', help='write the results as JSON')
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('sbs_query', args, phase='query')
+
+    index = SbsIndex()
+    text = args.format == 'text'
+    results, missing = {}, []
+    for query in args.queries:
+        if query in index.nodes and index.interval(query):
+            results[query] = code_result(index, query)
+            if text:
+                print_code(query, results[query])
+        elif chapter_key(query) is not None:
+            chapter = chapter_key(query)
+            results[f'ATA-{chapter}'] = chapter_result(index, chapter)
+            if text:
+                found = results[f'ATA-{chapter}']
+                print(f'ATA-{chapter}: SBS {", ".join(found["sbs_codes"]) or "-"}; '
+                      f'chapter_mapping {found["chapter_mapping"] or "-"}')
+        else:
+            missing.append(query)
+            if text:
+                print(f'NOT FOUND: {query}')
+
+    rolled = None
+    if args.rollup:
+        try:
+            direct, totals, unknown = rollup(index, args.rollup, args.column)
+        except OSError as e:
+            print(f'ERROR: {e}')
+            sys.exit(1)
+        rolled = {'file': args.rollup, 'column': args.column, 'direct': direct,
+                  'subtree': {code: n for code, n in totals.items() if n}, 'unknown_codes': unknown}
+        if text:
+            print(f'Roll-up of {args.rollup} by {args.column}:')
+            for code, n in totals.items():
+                if n:
+                    node = index.nodes[code]
+                    print(f'  {"  " * (node.level or 0)}{code} {node.name}: {n} ({direct.get(code, 0)} direct)')
+            for code, n in sorted(unknown.items()):
+                print(f'  WARNING: {n} row(s) name unknown SBS code {code}')
+
+    if args.json:
+        with atomic_open(args.json) as f:
+            json.dump({'results': results, 'not_found': missing, 'rollup': rolled}, f, indent=2)
+            f.write('\n')
+
+    reporter = FindingReporter('SBS INDEX', args.format, args.max_errors, fail_severities={ERROR}, show_rule=True)
+    reporter.consume(iter(index.findings))
+    code = reporter.finish()
+    sys.exit(code or (1 if missing else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,38 @@
 """
 scaffold_product_variant.py — Scaffold a new product variant
 Path: 08_AUTOMATION/scripts/scaffold_product_variant.py
-Usage: python3 scaffold_product_variant.py <PRODUCT_FAMILY> <VARIANT> [<CRAFT_CLASS> <FAMILY>]
+Usage: python3 scaffold_product_variant.py <PRODUCT_FAMILY> <VARIANT> [<CRAFT_CLASS> <FAMILY> [<PROGRAMME>]]
+       python3 scaffold_product_variant.py --manifest <rollout.yaml|rollout.csv> [--dry-run] [--jobs N] [--created-manifest PATH]
 
 If CRAFT_CLASS and FAMILY are provided, a programme template is also
 scaffolded under the corresponding craft-class/family path.
 
 Valid CRAFT_CLASS values: CRAFT_CREWED, CRAFT_UNCREWED, STATIONS
 Valid FAMILY values:      AMPEL, ROBBBO-T, GAIA
+
+With --manifest, every variant, programme and standard of a rollout
+manifest (see scaffold_plan) is validated first — names, craft classes
+against CRAFT_FAMILY_MAP, standards against standard_taxonomy.yaml — and
+nothing is written unless all entries pass. The files of every entry form
+one plan that is applied by parallel writers; files that already exist are
+left untouched, so re-running a manifest is safe.
 """
 
+import argparse
+import functools
 import os
+import re
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from scaffold_plan import DEFAULT_JOBS, ManifestError, ScaffoldPlan, load_manifest, run_plan  # noqa: E402
+from scaffold_standard import check_standards, known_standards, plan_standard  # noqa: E402
+
+TEMPLATES_DIR = os.path.join(REPO_ROOT, '00_META', 'templates')
+
 LC_PHASES = [
     'LC01_PROBLEM_STATEMENT', 'LC02_REQUIREMENTS', 'LC03_ARCHITECTURE',
     'LC04_DESIGN_DEFINITION', 'LC05_ANALYSIS_AND_SIMULATION',
@@ -32,60 +51,149 @@ CRAFT_FAMILY_MAP = {
     'STATIONS': 'GAIA',
 }
 
+# Folder names are UPPERCASE (00_META/conventions/naming_convention.md).
+NAME_PATTERN = re.compile(r'^[A-Z0-9][A-Z0-9_-]*$')
+DEFAULT_PROGRAMME = 'PROGRAMME'
+PROGRAMME_DIRS = ['governance', 'interfaces', 'milestones', 'roadmap', 'work_packages']
 
-def scaffold_variant(product_family, variant):
+
+@functools.lru_cache(maxsize=None)
+def template_header(name):
+    """Header line of a 00_META CSV template, read once per run."""
+    with open(os.path.join(TEMPLATES_DIR, name), encoding='utf-8') as f:
+        return f.readline().rstrip('\r\n') + '\n'
+
+
+def plan_variant(plan, product_family, variant):
     base = os.path.join(REPO_ROOT, '04_PRODUCTS', product_family, 'variants', variant)
+    knots = template_header('KNOTS.template.csv')
+    knu_plan = template_header('KNU_PLAN.template.csv')
     for phase in LC_PHASES:
         phase_dir = os.path.join(base, 'lifecycle', phase)
-        os.makedirs(os.path.join(phase_dir, 'evidence'), exist_ok=True)
-        for fname, content in [
-            ('README.md', f'# {phase[:4]} — {variant}\n\n**Status:** DRAFT\n'),
-            ('KNOTS.csv', 'knot_id,title,lifecycle_phase,obligation_source,status,owner,created_date,description,clause_refs,knu_refs,compliance_status,notes\n'),
-            ('KNU_PLAN.csv', 'knu_id,title,lifecycle_phase,knot_ref,knu_class,status,owner,created_date,description,evidence_refs,compliance_status,start_date,end_date,notes\n'),
-        ]:
-            fpath = os.path.join(phase_dir, fname)
-            if not os.path.exists(fpath):
-                with open(fpath, 'w') as f:
-                    f.write(content)
-
-    print(f'Variant {variant} scaffolded under {product_family}')
+        plan.add_dir(os.path.join(phase_dir, 'evidence'))
+        plan.add_file(os.path.join(phase_dir, 'README.md'), f'# {phase[:4]} — {variant}\n\n**Status:** DRAFT\n')
+        plan.add_file(os.path.join(phase_dir, 'KNOTS.csv'), knots)
+        plan.add_file(os.path.join(phase_dir, 'KNU_PLAN.csv'), knu_plan)
 
 
-def scaffold_programme(product_family, craft_class, family, programme):
-    """Scaffold a programme template under the craft-class/family path."""
+def plan_programme(plan, product_family, craft_class, family, programme):
     base = os.path.join(
         REPO_ROOT, '04_PRODUCTS', product_family,
         craft_class, family, 'programmes', programme,
     )
-    for subdir in ['governance', 'interfaces', 'milestones', 'roadmap', 'work_packages']:
-        d = os.path.join(base, subdir)
-        os.makedirs(d, exist_ok=True)
-        gitkeep = os.path.join(d, '.gitkeep')
-        if not os.path.exists(gitkeep):
-            with open(gitkeep, 'w') as f:
-                pass
-
-    prog_md = os.path.join(base, 'PROGRAMME.md')
-    if not os.path.exists(prog_md):
-        with open(prog_md, 'w') as f:
-            f.write(f'# {programme} — Programme Definition ({family})\n\n')
-            f.write(f'**Path:** `04_PRODUCTS/{product_family}/{craft_class}/{family}/programmes/{programme}/PROGRAMME.md`\n')
-            f.write('**Authority:** ASIT\n**Status:** DRAFT\n')
+    for subdir in PROGRAMME_DIRS:
+        plan.add_file(os.path.join(base, subdir, '.gitkeep'), '')
+    plan.add_file(os.path.join(base, 'PROGRAMME.md'),
+                  f'# {programme} — Programme Definition ({family})\n\n'
+                  f'**Path:** `04_PRODUCTS/{product_family}/{craft_class}/{family}/programmes/{programme}/PROGRAMME.md`\n'
+                  '**Authority:** ASIT\n**Status:** DRAFT\n')
 
+
+def scaffold_variant(product_family, variant):
+    plan = ScaffoldPlan()
+    plan_variant(plan, product_family, variant)
+    plan.apply(plan.resolve(), jobs=1)
+    print(f'Variant {variant} scaffolded under {product_family}')
+
+
+def scaffold_programme(product_family, craft_class, family, programme):
+    """Scaffold a programme template under the craft-class/family path."""
+    plan = ScaffoldPlan()
+    plan_programme(plan, product_family, craft_class, family, programme)
+    plan.apply(plan.resolve(), jobs=1)
     print(f'Programme {programme} scaffolded under {product_family}/{craft_class}/{family}')
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 3:
-        print('Usage: scaffold_product_variant.py <PRODUCT_FAMILY> <VARIANT> [<CRAFT_CLASS> <FAMILY> [<PROGRAMME>]]')
-        sys.exit(1)
+def check_variants(entries):
+    """Validate manifest variant entries in place (filling in family and programme); return problem strings."""
+    problems = []
+    seen = {}
+    for entry in entries:
+        where = entry['where']
+        for field in ('product_family', 'variant'):
+            if not entry[field]:
+                problems.append(f'{where}: missing {field}')
+            elif not NAME_PATTERN.match(entry[field]):
+                problems.append(f'{where}: {field} "{entry[field]}" must be UPPERCASE letters, digits, "_" or "-"')
+        craft_class = entry['craft_class']
+        if not craft_class:
+            if entry['family'] or entry['programme']:
+                problems.append(f'{where}: family and programme need a craft_class')
+        elif craft_class not in VALID_CRAFT_CLASSES:
+            problems.append(f'{where}: invalid craft_class "{craft_class}". Must be one of: {", ".join(sorted(VALID_CRAFT_CLASSES))}')
+        else:
+            expected = CRAFT_FAMILY_MAP[craft_class]
+            entry['family'] = entry['family'] or expected
+            entry['programme'] = entry['programme'] or DEFAULT_PROGRAMME
+            if entry['family'] != expected:
+                problems.append(f'{where}: craft_class {craft_class} is paired with family {expected}, got {entry["family"]}')
+            if not NAME_PATTERN.match(entry['programme']):
+                problems.append(f'{where}: programme "{entry["programme"]}" must be UPPERCASE letters, digits, "_" or "-"')
+        key = tuple(entry[field] for field in ('product_family', 'variant', 'craft_class', 'family', 'programme'))
+        if key in seen:
+            problems.append(f'{where}: duplicate of {seen[key]}')
+        seen.setdefault(key, where)
+    return problems
+
+
+def plan_manifest(path):
+    """Load and validate a manifest and return its ScaffoldPlan; raise ManifestError listing every problem."""
+    manifest = load_manifest(path)
+    problems = manifest['problems'] + check_variants(manifest['variants'])
+    if manifest['standards']:
+        problems += check_standards(manifest['standards'], known_standards())
+    if problems:
+        raise ManifestError(path, problems)
+    plan = ScaffoldPlan()
+    for entry in manifest['variants']:
+        plan_variant(plan, entry['product_family'], entry['variant'])
+        if entry['craft_class']:
+            plan_programme(plan, entry['product_family'], entry['craft_class'], entry['family'], entry['programme'])
+    for entry in manifest['standards']:
+        plan_standard(plan, entry['standard'])
+    if plan.problems:
+        raise ManifestError(path, plan.problems)
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaffold a new product variant and optionally a programme template.')
+    parser.add_argument('product_family', metavar='PRODUCT_FAMILY', nargs='?')
+    parser.add_argument('variant', metavar='VARIANT', nargs='?')
+    parser.add_argument('craft_class', metavar='CRAFT_CLASS', nargs='?')
+    parser.add_argument('family', metavar='FAMILY', nargs='?')
+    parser.add_argument('programme', metavar='PROGRAMME', nargs='?', default=DEFAULT_PROGRAMME)
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='scaffold every variant, programme and standard of a YAML or CSV rollout manifest')
+    parser.add_argument('--dry-run', action='store_true', help='with --manifest, list the files that would be created')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, metavar='N',
+                        help=f'writer threads for --manifest (default: {DEFAULT_JOBS})')
+    parser.add_argument('--created-manifest', metavar='PATH', help='with --manifest, record the created files as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('scaffold_product_variant', args, phase='scaffold')
+
+    if args.manifest is not None:
+        if args.product_family is not None:
+            parser.error('give either PRODUCT_FAMILY VARIANT or --manifest')
+        try:
+            plan = plan_manifest(args.manifest)
+        except (OSError, ManifestError) as e:
+            print('MANIFEST VALIDATION FAILED:')
+            for problem in getattr(e, 'problems', [str(e)]):
+                print(f'  {problem}')
+            sys.exit(1)
+        run_plan(plan, args.dry_run, args.jobs, args.created_manifest, args.manifest)
+        return
+    if args.variant is None:
+        parser.error('PRODUCT_FAMILY and VARIANT are required without --manifest')
 
-    scaffold_variant(sys.argv[1], sys.argv[2])
+    scaffold_variant(args.product_family, args.variant)
 
-    if len(sys.argv) >= 5:
-        craft_class = sys.argv[3]
-        family = sys.argv[4]
-        programme = sys.argv[5] if len(sys.argv) > 5 else 'PROGRAMME'
+    if args.family is not None:
+        craft_class = args.craft_class
+        family = args.family
+        programme = args.programme
 
         if craft_class not in VALID_CRAFT_CLASSES:
             print(f'ERROR: Invalid craft class "{craft_class}". Must be one of: {", ".join(sorted(VALID_CRAFT_CLASSES))}')
@@ -95,4 +203,8 @@ if __name__ == '__main__':
         if expected_family and family != expected_family:
             print(f'WARNING: Craft class {craft_class} is normally paired with family {expected_family}, got {family}')
 
-        scaffold_programme(sys.argv[1], craft_class, family, programme)
+        scaffold_programme(args.product_family, craft_class, family, programme)
+
+
+if __name__ == '__main__':
+    main()
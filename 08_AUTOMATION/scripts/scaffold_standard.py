@@ -3,47 +3,121 @@
 scaffold_standard.py — Scaffold a new standard binding in 05_STANDARDS_LIBRARY
 Path: 08_AUTOMATION/scripts/scaffold_standard.py
 Usage: python3 scaffold_standard.py <STANDARD_ID>
+       python3 scaffold_standard.py --manifest <rollout.yaml|rollout.csv> [--dry-run] [--jobs N] [--created-manifest PATH]
+
+With --manifest, every standard listed in the manifest (see scaffold_plan)
+is checked against 00_META/taxonomies/standard_taxonomy.yaml before
+anything is written; variant entries are left to scaffold_product_variant.py.
+Existing files, AEROSPACEMODEL.md included, are never overwritten.
 """
 
+import argparse
 import os
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
 
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from scaffold_plan import DEFAULT_JOBS, ManifestError, ScaffoldPlan, load_manifest, run_plan  # noqa: E402
+from yaml_loader import load_yaml  # noqa: E402
 
-def scaffold_standard(standard_id):
+STANDARD_TAXONOMY = os.path.join(REPO_ROOT, '00_META', 'taxonomies', 'standard_taxonomy.yaml')
+
+STANDARD_DIRS = [
+    [],
+    ['source'],
+    ['interpretations'],
+    ['lifecycle_os', 'mappings'],
+    ['lifecycle_os', 'evidence'],
+    ['lifecycle_os', 'audit'],
+    ['lifecycle_os', 'schemas'],
+    ['lifecycle_os', 'validators'],
+    ['lifecycle_os', 'reports'],
+    ['registers'],
+]
+
+
+def known_standards(path=STANDARD_TAXONOMY):
+    """Return the standard IDs listed in the standard taxonomy."""
+    groups = (load_yaml(path) or {}).get('standards') or {}
+    return {str(s['id']) for group in groups.values() for s in group or [] if isinstance(s, dict) and s.get('id')}
+
+
+def check_standards(entries, known):
+    """Return a problem string for every unknown, missing or repeated standard in manifest entries."""
+    problems = []
+    seen = {}
+    for entry in entries:
+        standard, where = entry['standard'], entry['where']
+        if not standard:
+            problems.append(f'{where}: missing standard ID')
+        elif standard not in known:
+            problems.append(f'{where}: unknown standard "{standard}" (not in standard_taxonomy.yaml)')
+        elif standard in seen:
+            problems.append(f'{where}: duplicate of {seen[standard]}')
+        else:
+            seen[standard] = where
+    return problems
+
+
+def aerospacemodel_md(standard_id):
+    return (f'# AEROSPACEMODEL — {standard_id}\n\n'
+            f'**Standard:** {standard_id}  \n'
+            '**Authority:** ASIT  \n'
+            '**Status:** DRAFT\n')
+
+
+def plan_standard(plan, standard_id):
     base = os.path.join(REPO_ROOT, '05_STANDARDS_LIBRARY', standard_id)
-    dirs = [
-        base,
-        os.path.join(base, 'source'),
-        os.path.join(base, 'interpretations'),
-        os.path.join(base, 'lifecycle_os', 'mappings'),
-        os.path.join(base, 'lifecycle_os', 'evidence'),
-        os.path.join(base, 'lifecycle_os', 'audit'),
-        os.path.join(base, 'lifecycle_os', 'schemas'),
-        os.path.join(base, 'lifecycle_os', 'validators'),
-        os.path.join(base, 'lifecycle_os', 'reports'),
-        os.path.join(base, 'registers'),
-    ]
-    for d in dirs:
-        os.makedirs(d, exist_ok=True)
-        gitkeep = os.path.join(d, '.gitkeep')
-        if not os.listdir(d):
-            open(gitkeep, 'w').close()
-
-    # Create AEROSPACEMODEL.md
-    amd_path = os.path.join(base, 'AEROSPACEMODEL.md')
-    with open(amd_path, 'w') as f:
-        f.write(f'# AEROSPACEMODEL — {standard_id}\n\n')
-        f.write(f'**Standard:** {standard_id}  \n')
-        f.write('**Authority:** ASIT  \n')
-        f.write('**Status:** DRAFT\n')
-
-    print(f'Standard {standard_id} scaffolded at {base}')
+    for parts in STANDARD_DIRS:
+        plan.add_dir(os.path.join(base, *parts), keep=True)
+    plan.add_file(os.path.join(base, 'AEROSPACEMODEL.md'), aerospacemodel_md(standard_id))
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print('Usage: scaffold_standard.py <STANDARD_ID>')
+def scaffold_standard(standard_id):
+    plan = ScaffoldPlan()
+    plan_standard(plan, standard_id)
+    plan.apply(plan.resolve(), jobs=1)
+    print(f'Standard {standard_id} scaffolded at {os.path.join(REPO_ROOT, "05_STANDARDS_LIBRARY", standard_id)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaffold a new standard binding in 05_STANDARDS_LIBRARY.')
+    parser.add_argument('standard_id', metavar='STANDARD_ID', nargs='?', help='standard identifier, e.g. AS9100')
+    parser.add_argument('--manifest', metavar='PATH', help='scaffold every standard listed in a YAML or CSV rollout manifest')
+    parser.add_argument('--dry-run', action='store_true', help='with --manifest, list the files that would be created')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, metavar='N',
+                        help=f'writer threads for --manifest (default: {DEFAULT_JOBS})')
+    parser.add_argument('--created-manifest', metavar='PATH', help='with --manifest, record the created files as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('scaffold_standard', args, phase='scaffold')
+
+    if (args.standard_id is None) == (args.manifest is None):
+        parser.error('give either STANDARD_ID or --manifest')
+    if args.standard_id is not None:
+        scaffold_standard(args.standard_id)
+        return
+
+    plan = ScaffoldPlan()
+    try:
+        manifest = load_manifest(args.manifest)
+        entries = manifest['standards']
+        problems = manifest['problems'] + check_standards(entries, known_standards())
+        if not problems:
+            for entry in entries:
+                plan_standard(plan, entry['standard'])
+            problems = plan.problems
+        if problems:
+            raise ManifestError(args.manifest, problems)
+    except (OSError, ManifestError) as e:
+        print('MANIFEST VALIDATION FAILED:')
+        for problem in getattr(e, 'problems', [str(e)]):
+            print(f'  {problem}')
         sys.exit(1)
-    scaffold_standard(sys.argv[1])
+    run_plan(plan, args.dry_run, args.jobs, args.created_manifest, args.manifest)
+
+
+if __name__ == '__main__':
+    main()
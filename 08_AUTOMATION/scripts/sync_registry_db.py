@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+sync_registry_db.py — Sync and query the SQLite mirror of the lifecycle registry
+Path: 08_AUTOMATION/scripts/sync_registry_db.py
+Usage: python3 sync_registry_db.py [--db <PATH>] [--rebuild] [--no-sync] [--query <SQL> [--output <OUT.csv|OUT.json>]]
+
+Syncs .aerospacemodel_cache/registry.sqlite (see 02_LIFECYCLE_OS/lib/registry_db.py
+for the tables) with the tree, reloading only files whose content hash
+changed, and optionally runs one SQL query against it, e.g.
+
+  python3 sync_registry_db.py --query "SELECT knu_id, variant, owner FROM knus
+      WHERE compliance_status = 'NON_COMPLIANT' AND lifecycle_phase = 'LC09'
+      AND family = 'SSTO_SPACEPLANE' AND owner = 'ASIT'"
+
+Query results go to stdout as CSV, or to --output as CSV or JSON. The
+database is a plain SQLite file, so sqlite3 or any other client can query
+it directly after a sync.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open, relpath  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from registry_db import DB_PATH, RegistryDatabase  # noqa: E402
+
+
+def write_rows(path, columns, rows):
+    if path and path.lower().endswith('.json'):
+        with atomic_open(path) as f:
+            json.dump([dict(zip(columns, row)) for row in rows], f, indent=2)
+            f.write('\n')
+        return
+    if path:
+        with atomic_open(path) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+            writer.writerows(rows)
+        return
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(columns)
+    writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror the lifecycle registry into SQLite and query it.')
+    parser.add_argument('--db', default=DB_PATH, metavar='PATH', help='database file (default: .aerospacemodel_cache/registry.sqlite)')
+    parser.add_argument('--rebuild', action='store_true', help='drop the mirror and reload every file')
+    parser.add_argument('--no-sync', action='store_true', help='query the mirror as it is, without checking the tree')
+    parser.add_argument('--query', metavar='SQL', help='run one SQL statement and print its rows as CSV')
+    parser.add_argument('--output', metavar='PATH', help='with --query: write the rows as CSV, or JSON for a .json path')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('sync_registry_db', args, phase='sync')
+
+    database = RegistryDatabase(args.db)
+    if args.rebuild:
+        database.reset()
+    if not args.no_sync:
+        result = database.sync()
+        message = (f'Synced {relpath(os.path.abspath(args.db))}: {len(result["loaded"])} file(s) loaded, '
+                   f'{len(result["unchanged"])} unchanged, {len(result["removed"])} removed')
+        print(message, file=sys.stderr if args.query and not args.output else sys.stdout)
+
+    if args.query:
+        try:
+            columns, rows = database.query(args.query)
+        except sqlite3.Error as e:
+            print(f'ERROR: {e}')
+            sys.exit(1)
+        write_rows(args.output, columns, rows)
+        if args.output:
+            print(f'{len(rows)} row(s) written to {args.output}')
+    database.close()
+
+
+if __name__ == '__main__':
+    main()
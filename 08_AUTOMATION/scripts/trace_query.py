@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+trace_query.py — Impact analysis over the traceability graph
+Path: 08_AUTOMATION/scripts/trace_query.py
+Usage: python3 trace_query.py <NODE> [<NODE> ...] [--reverse] [--kind <KIND>] [--json <OUTPUT>]
+
+Forward (default): everything impacted if NODE changes, e.g.
+  python3 trace_query.py "AS9100 8.3"
+Reverse: everything NODE supports or derives from, e.g.
+  python3 trace_query.py OID-SSTO-LC09-0001 --reverse --kind clause
+
+NODE is a KNOT ID, KNU ID, evidence OID or a clause as '<standard> <clause_id>'.
+The graph is kept in .aerospacemodel_cache/trace_graph.pickle and only the
+source files that changed since the last query are re-read.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from fileio import atomic_open  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+from trace_graph import KINDS, load_graph  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Forward/reverse reachability over the clause → KNOT → KNU → evidence graph.')
+    parser.add_argument('nodes', nargs='+', metavar='NODE', help='KNOT/KNU ID, evidence OID or "<standard> <clause_id>"')
+    parser.add_argument('--reverse', action='store_true', help='walk upstream (what NODE supports) instead of downstream')
+    parser.add_argument('--kind', choices=KINDS, action='append', help='only list nodes of this kind (repeatable)')
+    parser.add_argument('--json', metavar='OUTPUT', help='write the results as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('trace_query', args, phase='query')
+
+    graph = load_graph()
+    results = {}
+    missing = []
+    for name in args.nodes:
+        reached = graph.supports(name) if args.reverse else graph.impacted_by(name)
+        if reached is None:
+            missing.append(name)
+            continue
+        results[name] = {kind: names for kind, names in reached.items() if not args.kind or kind in args.kind}
+    graph.save()
+
+    direction = 'supported by' if args.reverse else 'impacted by'
+    for name, reached in results.items():
+        total = sum(len(names) for names in reached.values())
+        print(f'{total} nodes {direction} {name}:')
+        for kind, names in reached.items():
+            if names:
+                print(f'  {kind} ({len(names)}):')
+                for n in names:
+                    print(f'    {n}')
+    for name in missing:
+        print(f'NOT FOUND: {name}')
+
+    if args.json:
+        with atomic_open(args.json) as f:
+            json.dump({'direction': 'reverse' if args.reverse else 'forward', 'results': results,
+                       'not_found': missing}, f, indent=2)
+            f.write('\n')
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == '__main__':
+    main()
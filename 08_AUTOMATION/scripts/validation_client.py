@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+validation_client.py — Query the validation daemon
+Path: 08_AUTOMATION/scripts/validation_client.py
+Usage: python3 validation_client.py validate|orphans|status|stop [--format text|jsonl] [--max-errors N]
+       python3 validation_client.py compliance <KNOT_ID|KNU_ID> ... [--format text|jsonl]
+
+Thin client for validation_daemon.py, cheap enough for a git pre-commit
+hook in place of the python3 validate_*.py calls:
+
+    python3 08_AUTOMATION/scripts/validation_client.py validate && \
+    python3 08_AUTOMATION/scripts/validation_client.py orphans
+
+validate reports the structure, schema (KNOTS.csv, KNU_PLAN.csv, clause
+mappings, evidence register) and audit record findings; orphans reports
+detect_orphans.py's referential-integrity findings; compliance shows the
+recorded and derived compliance status of KNOTs and KNUs. Output and exit
+codes match the validators. When no daemon is listening the same queries
+are answered by a cold in-process run, unless --no-fallback is given.
+
+Protocol: one JSON request line ({"query": ..., "ids": [...]}) per
+connection to the daemon's Unix socket, answered by one JSON line.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+
+from findings import Finding, FindingReporter, add_reporting_arguments  # noqa: E402
+from fileio import CACHE_DIR  # noqa: E402
+from instrumentation import add_metrics_arguments, start_metrics  # noqa: E402
+
+QUERIES = ['validate', 'orphans', 'compliance', 'status', 'stop']
+MAX_SOCKET_PATH = 100
+TIMEOUT = 60.0
+
+REPORT_TITLES = {
+    'validate': ('VALIDATION', {'ERROR'}),
+    'orphans': ('REFERENTIAL INTEGRITY', None),
+}
+
+
+def default_socket_path(root=REPO_ROOT):
+    """The daemon socket under .aerospacemodel_cache, or in the temp dir when that path is too long for AF_UNIX."""
+    path = os.path.join(CACHE_DIR if root == REPO_ROOT else os.path.join(root, '.aerospacemodel_cache'),
+                        'validation_daemon.sock')
+    if len(os.fsencode(path)) <= MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha256(os.fsencode(os.path.abspath(root))).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f'aerospacemodel-{digest}.sock')
+
+
+def send_request(request, path, timeout=TIMEOUT):
+    """Send one request to the daemon; raise OSError when it is not reachable."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    data = b''.join(chunks)
+    if not data.endswith(b'\n'):
+        raise OSError('incomplete response from validation daemon')
+    return json.loads(data)
+
+
+def answer_cold(request):
+    """Answer request without a daemon by loading the repository model in this process."""
+    from validation_daemon import RepositoryModel
+    model = RepositoryModel()
+    model.load()
+    return model.query(request)
+
+
+def print_findings(response, query, args):
+    title, fail_severities = REPORT_TITLES[query]
+    reporter = FindingReporter(title, args.format, args.max_errors, fail_severities=fail_severities)
+    reporter.consume(Finding(**f) for f in response['findings'])
+    return reporter.finish()
+
+
+def print_compliance(response, args):
+    if args.format == 'jsonl':
+        for result in response['results']:
+            print(json.dumps(result))
+        return 0 if all(r.get('kind') for r in response['results']) else 1
+    missing = 0
+    for result in response['results']:
+        if result.get('kind') == 'KNOT':
+            recorded = sorted({r['compliance_status'] for r in result['records']})
+            state = 'in sync' if result['in_sync'] else 'out of sync'
+            print(f'{result["id"]}: {result["derived"]} (recorded: {", ".join(recorded) or "-"}, {state})')
+            for knu in result['knus']:
+                print(f'  {knu["knu_id"]} {knu["compliance_status"]}')
+        elif result.get('kind') == 'KNU':
+            for record in result['records']:
+                print(f'{result["id"]}: {record["compliance_status"]} ({record["file"]}:{record["line"]})')
+            for knot_id, derived in result['knots'].items():
+                print(f'  parent {knot_id}: {derived}')
+        else:
+            print(f'NOT FOUND: {result["id"]}')
+            missing += 1
+    return 1 if missing else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the validation daemon (or validate cold when it is not running).')
+    parser.add_argument('query', choices=QUERIES, help='what to ask the daemon')
+    parser.add_argument('ids', nargs='*', metavar='ID', help='KNOT or KNU IDs for the compliance query')
+    parser.add_argument('--socket', default=None, metavar='PATH', help='daemon socket (default: under .aerospacemodel_cache)')
+    parser.add_argument('--no-fallback', action='store_true', help='fail instead of validating cold when no daemon is running')
+    add_reporting_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validation_client', args, phase='query')
+
+    if args.query == 'compliance' and not args.ids:
+        parser.error('compliance needs at least one KNOT or KNU ID')
+    request = {'query': 'shutdown' if args.query == 'stop' else args.query, 'ids': args.ids}
+    path = args.socket or default_socket_path()
+    try:
+        response = send_request(request, path)
+    except (OSError, ValueError) as e:
+        if args.query in ('status', 'stop'):
+            print(f'Validation daemon not running ({path}: {e})')
+            sys.exit(1 if args.query == 'status' else 0)
+        if args.no_fallback:
+            print(f'ERROR: validation daemon not reachable at {path}: {e}')
+            sys.exit(2)
+        print('Validation daemon not running; validating cold', file=sys.stderr)
+        response = answer_cold(request)
+
+    if not response.get('ok'):
+        print(f'ERROR: {response.get("error", "request failed")}')
+        sys.exit(2)
+    if args.query in REPORT_TITLES:
+        sys.exit(print_findings(response, args.query, args))
+    if args.query == 'compliance':
+        sys.exit(print_compliance(response, args))
+    if args.query == 'stop':
+        print('Validation daemon stopped')
+        return
+    for key, value in response['status'].items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
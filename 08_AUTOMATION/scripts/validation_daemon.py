@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+validation_daemon.py — Watch-mode validation daemon with a local socket query API
+Path: 08_AUTOMATION/scripts/validation_daemon.py
+Usage: python3 validation_daemon.py [--socket PATH] [--poll] [--interval SECONDS]
+
+Loads every registry CSV and audit YAML once into an in-memory model: the
+schema and audit findings of each file, the keys and references that
+detect_orphans.py joins, and the KNOT/KNU compliance statuses. The tree is
+then watched (tree_watch: inotify, or signature polling with --poll) and
+only files that changed are re-read. A file's dangling references are
+rechecked when it changes or when a key it refers to appears or
+disappears, so removing a KNOT re-reports exactly the KNUs, KNOTs and
+mappings that pointed at it. A change to a file the checks are compiled
+from (record schemas, controlled_vocabulary.yaml, the controlled
+registries, BREX_RULESET.yaml) drops the compiled checks and re-reads
+every file.
+
+Queries arrive on a Unix socket (default .aerospacemodel_cache/
+validation_daemon.sock), one JSON line per connection; pending changes are
+applied before each answer, so results always reflect the tree on disk.
+validation_client.py is the command-line front end. The daemon is single
+threaded and serves one query at a time.
+"""
+
+import argparse
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'lib'))
+sys.path.insert(0, os.path.join(REPO_ROOT, '02_LIFECYCLE_OS', 'validators'))
+
+from brex_ruleset import BREX_RULESET, rule_severities  # noqa: E402
+from detect_orphans import KEYS, ORPHAN, REFERENCES, file_keys, is_dangling, reference_finding, scan_references  # noqa: E402
+from fileio import relpath  # noqa: E402
+from findings import finding_dict, make_finding  # noqa: E402
+from instrumentation import add_metrics_arguments, count, start_metrics  # noqa: E402
+from propagate_compliance import derive_knot_compliance, knu_status  # noqa: E402
+from records import CONTROLLED_STATUS_CODES, LC_CANONICAL_PHASES, RecordTable, controlled_vocabularies  # noqa: E402
+from repo_walk import iter_files  # noqa: E402
+from schema_compiler import SCHEMAS, compiled_schema  # noqa: E402
+from tree_watch import open_watcher  # noqa: E402
+from validate_audit_records import check_audit_yaml, is_audit_yaml  # noqa: E402
+from validate_structure import check_structure  # noqa: E402
+from validation_client import default_socket_path  # noqa: E402
+
+TRACKED_CSV = set(SCHEMAS) | set(KEYS) | set(REFERENCES)
+CLAUSE_REFERRERS = {name for name, references in REFERENCES.items()
+                    if any(len(columns) > 1 for _kind, columns, _multi in references)}
+RULE_READ = 'READ'
+DEFAULT_INTERVAL = 2.0
+CLIENT_TIMEOUT = 5.0
+MAX_REQUEST = 64 * 1024
+
+
+class TableSource:
+    """Serve one parsed table through the registry.select() interface detect_orphans expects."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def select(self, _filepath, fields):
+        return self.table.select(fields)
+
+
+class FileState:
+    """What the model knows about one tracked file."""
+
+    __slots__ = ('findings', 'key_kind', 'keys', 'refs', 'dangling', 'knus', 'knots')
+
+    def __init__(self):
+        self.findings = []
+        self.key_kind = None
+        self.keys = ()
+        self.refs = None
+        self.dangling = []
+        self.knus = ()
+        self.knots = ()
+
+
+def is_tracked(path):
+    return os.path.basename(path) in TRACKED_CSV or is_audit_yaml(path)
+
+
+def rule_sources():
+    """Absolute paths of the files the schema, vocabulary and severity checks are compiled from."""
+    sources = {CONTROLLED_STATUS_CODES, LC_CANONICAL_PHASES, BREX_RULESET}
+    for kind in SCHEMAS:
+        sources.update(compiled_schema(kind).sources)
+    return {os.path.abspath(p) for p in sources}
+
+
+def clear_rule_caches():
+    compiled_schema.cache_clear()
+    controlled_vocabularies.cache_clear()
+    rule_severities.cache_clear()
+
+
+def read_file(path):
+    """Parse one tracked file into a FileState; unreadable files become a single READ finding."""
+    state = FileState()
+    name = os.path.basename(path)
+    try:
+        if is_audit_yaml(path):
+            state.findings = list(check_audit_yaml(path))
+            return state
+        if name in SCHEMAS:
+            state.findings = list(compiled_schema(name).check_file(path))
+        if name not in KEYS and name not in REFERENCES:
+            return state
+        table = RecordTable.from_csv(path)
+        source = TableSource(table)
+        if name in KEYS:
+            state.key_kind, columns = KEYS[name]
+            state.keys = file_keys(path, columns, source)
+        if name in REFERENCES:
+            state.refs = list(scan_references(path, REFERENCES[name], source))
+        if name == 'KNU_PLAN.csv':
+            state.knus = [(line, (knu_id or '').strip(), (knot_ref or '').strip(), knu_status(status))
+                          for line, knu_id, knot_ref, status in table.select(['knu_id', 'knot_ref', 'compliance_status'])]
+        elif name == 'KNOTS.csv':
+            state.knots = [(line, (knot_id or '').strip(), (status or '').strip())
+                           for line, knot_id, status in table.select(['knot_id', 'compliance_status'])]
+    except (OSError, ValueError) as e:
+        state = FileState()
+        state.findings = [make_finding(path, None, RULE_READ, 'ERROR', f'Cannot read file: {e}')]
+    return state
+
+
+class RepositoryModel:
+    """In-memory validation state of the tree under root, updated file by file."""
+
+    def __init__(self, root=REPO_ROOT):
+        self.root = root
+        self.files = {}
+        self.key_counts = {kind: Counter() for kind, _columns in KEYS.values()}
+        self.referrers = {}
+        self.clause_standards = set()
+        self.knus = {}
+        self.children = {}
+        self.knots = {}
+        self.rule_sources = rule_sources()
+        self.loaded = None
+        self.refreshes = 0
+        self.last_refresh = None
+
+    def load(self):
+        """(Re)read every tracked file."""
+        paths = set(self.files)
+        paths.update(p for p in iter_files(self.root) if is_tracked(p))
+        self.refresh(paths)
+        self.loaded = time.time()
+        return self
+
+    # -- incremental update ---------------------------------------------------
+
+    def refresh(self, paths):
+        """Re-read paths (created, modified or deleted) and recheck the files that depend on them."""
+        started = time.perf_counter()
+        changed = set()
+        for path in paths:
+            if path.endswith(os.sep):
+                changed.update(p for p in self.files if p.startswith(path))
+            else:
+                changed.add(path)
+        if any(p in self.rule_sources or (p.endswith(os.sep) and any(s.startswith(p) for s in self.rule_sources))
+               for p in paths):
+            # Every cached finding was produced by the old checks.
+            clear_rule_caches()
+            self.rule_sources = rule_sources()
+            changed.update(self.files)
+            changed.update(p for p in iter_files(self.root) if is_tracked(p))
+
+        presence = {}
+        recheck = set()
+        reread = 0
+        for path in sorted(changed):
+            old = self.files.pop(path, None)
+            new = read_file(path) if is_tracked(path) and os.path.isfile(path) else None
+            if old is None and new is None:
+                continue
+            reread += 1
+            if old is not None:
+                self.unindex(path, old, presence)
+            if new is not None:
+                self.files[path] = new
+                self.index(path, new, presence)
+                if new.refs is not None:
+                    recheck.add(path)
+
+        for (kind, key), was_present in presence.items():
+            if (key in self.key_counts[kind]) != was_present:
+                recheck.update(self.referrers.get((kind, key), ()))
+        standards = {standard for standard, _clause in self.key_counts['clause']}
+        if standards != self.clause_standards:
+            self.clause_standards = standards
+            recheck.update(p for p in self.files if os.path.basename(p) in CLAUSE_REFERRERS)
+
+        for path in recheck:
+            state = self.files.get(path)
+            if state is not None and state.refs is not None:
+                state.dangling = [reference_finding(path, line, kind, columns, value)
+                                  for line, kind, columns, value in state.refs
+                                  if is_dangling(kind, value, self.key_counts, self.clause_standards)]
+
+        self.refreshes += 1
+        self.last_refresh = {'files': reread, 'dependents': len(recheck - changed),
+                             'ms': round((time.perf_counter() - started) * 1000, 3)}
+        count('files_reread', reread)
+        return self.last_refresh
+
+    def index(self, path, state, presence):
+        if state.key_kind is not None:
+            counts = self.key_counts[state.key_kind]
+            for key in state.keys:
+                presence.setdefault((state.key_kind, key), key in counts)
+                counts[key] += 1
+        for _line, kind, _columns, value in state.refs or ():
+            if kind != ORPHAN:
+                self.referrers.setdefault((kind, value), set()).add(path)
+        for line, knu_id, knot_ref, status in state.knus:
+            if knu_id:
+                self.knus.setdefault(knu_id, {})[(path, line)] = (knot_ref, status)
+            if knot_ref:
+                self.children.setdefault(knot_ref, {})[(path, line)] = (knu_id, status)
+        for line, knot_id, status in state.knots:
+            if knot_id:
+                self.knots.setdefault(knot_id, {})[(path, line)] = status
+
+    def unindex(self, path, state, presence):
+        if state.key_kind is not None:
+            counts = self.key_counts[state.key_kind]
+            for key in state.keys:
+                presence.setdefault((state.key_kind, key), True)
+                counts[key] -= 1
+                if counts[key] <= 0:
+                    del counts[key]
+        for _line, kind, _columns, value in state.refs or ():
+            if kind != ORPHAN:
+                discard(self.referrers, (kind, value), path)
+        for line, knu_id, knot_ref, _status in state.knus:
+            if knu_id:
+                discard(self.knus, knu_id, (path, line))
+            if knot_ref:
+                discard(self.children, knot_ref, (path, line))
+        for line, knot_id, _status in state.knots:
+            if knot_id:
+                discard(self.knots, knot_id, (path, line))
+
+    # -- queries ----------------------------------------------------------------
+
+    def validation_findings(self):
+        """Structure, schema and audit record findings, file by file."""
+        yield from check_structure()
+        for path in sorted(self.files):
+            yield from self.files[path].findings
+
+    def orphan_findings(self):
+        for path in sorted(self.files):
+            yield from self.files[path].dangling
+
+    def compliance(self, object_id):
+        """Recorded and derived compliance of a KNOT, or a KNU's records and its parents' derived status."""
+        if object_id in self.knots or object_id in self.children:
+            records = [{'file': relpath(path, self.root), 'line': line, 'compliance_status': status}
+                       for (path, line), status in sorted(self.knots.get(object_id, {}).items())]
+            children = sorted(self.children.get(object_id, {}).items())
+            derived = derive_knot_compliance([status for _where, (_knu_id, status) in children])
+            return {'id': object_id, 'kind': 'KNOT', 'derived': derived,
+                    'in_sync': all(r['compliance_status'] == derived for r in records),
+                    'records': records,
+                    'knus': [{'knu_id': knu_id, 'compliance_status': status, 'file': relpath(path, self.root), 'line': line}
+                             for (path, line), (knu_id, status) in children]}
+        if object_id in self.knus:
+            records = [{'file': relpath(path, self.root), 'line': line, 'knot_ref': knot_ref, 'compliance_status': status}
+                       for (path, line), (knot_ref, status) in sorted(self.knus[object_id].items())]
+            parents = sorted({r['knot_ref'] for r in records if r['knot_ref']})
+            return {'id': object_id, 'kind': 'KNU', 'records': records,
+                    'knots': {knot_id: derive_knot_compliance([status for _knu_id, status in self.children.get(knot_id, {}).values()])
+                              for knot_id in parents}}
+        return {'id': object_id, 'kind': None}
+
+    def status(self):
+        return {'root': self.root, 'files': len(self.files),
+                'knots': len(self.knots), 'knus': len(self.knus),
+                'loaded': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.loaded)) if self.loaded else None,
+                'refreshes': self.refreshes, 'last_refresh': self.last_refresh}
+
+    def query(self, request):
+        """Answer one request dict; see validation_client.py for the protocol."""
+        query = request.get('query')
+        if query == 'validate':
+            return {'ok': True, 'findings': [finding_dict(f) for f in self.validation_findings()]}
+        if query == 'orphans':
+            return {'ok': True, 'findings': [finding_dict(f) for f in self.orphan_findings()]}
+        if query == 'compliance':
+            return {'ok': True, 'results': [self.compliance(str(i)) for i in request.get('ids') or ()]}
+        if query == 'status':
+            return {'ok': True, 'status': self.status()}
+        return {'ok': False, 'error': f'unknown query: {query}'}
+
+
+def discard(mapping, key, member):
+    """Remove member from the set or dict at mapping[key], dropping the entry once empty."""
+    entries = mapping.get(key)
+    if entries is None:
+        return
+    if isinstance(entries, dict):
+        entries.pop(member, None)
+    else:
+        entries.discard(member)
+    if not entries:
+        del mapping[key]
+
+
+# -- server -------------------------------------------------------------------
+
+def apply_changes(model, watcher):
+    changed = watcher.changes()
+    if changed is None:
+        model.load()
+    elif changed:
+        model.refresh(changed)
+
+
+def read_request(conn):
+    data = b''
+    while b'\n' not in data:
+        chunk = conn.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST:
+            raise ValueError('request too large')
+    return json.loads(data.split(b'\n', 1)[0] or b'null')
+
+
+def handle(conn, model, watcher):
+    """Answer one connection; return False when the client asked the daemon to stop."""
+    started = time.perf_counter()
+    running = True
+    conn.settimeout(CLIENT_TIMEOUT)
+    try:
+        try:
+            request = read_request(conn)
+            if not isinstance(request, dict):
+                raise ValueError('request must be a JSON object')
+        except (OSError, ValueError) as e:
+            response = {'ok': False, 'error': f'bad request: {e}'}
+        else:
+            if request.get('query') == 'shutdown':
+                response = {'ok': True}
+                running = False
+            else:
+                response = model.query(request)
+                if request.get('query') == 'status':
+                    response['status']['watcher'] = type(watcher).__name__
+        response['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        conn.sendall(json.dumps(response).encode('utf-8') + b'\n')
+    except OSError:
+        pass
+    finally:
+        conn.close()
+    count('queries')
+    return running
+
+
+def bind_socket(path):
+    """Listen on path, replacing a stale socket file; raise OSError when a daemon already serves it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+        else:
+            raise OSError(f'a validation daemon is already listening on {path}')
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    server.setblocking(False)
+    return server
+
+
+def serve(model, watcher, server, interval=DEFAULT_INTERVAL):
+    """Apply tree changes and answer queries until a shutdown request arrives."""
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, 'client')
+    timeout = None
+    if watcher.fileno() is None:
+        timeout = interval
+    else:
+        selector.register(watcher.fileno(), selectors.EVENT_READ, 'watch')
+    running = True
+    while running:
+        events = selector.select(timeout)
+        # Changes that happened before a client connected are queued ahead of it.
+        apply_changes(model, watcher)
+        for key, _mask in events:
+            if key.data != 'client':
+                continue
+            try:
+                conn, _address = server.accept()
+            except BlockingIOError:
+                continue
+            conn.setblocking(True)
+            running = handle(conn, model, watcher) and running
+    selector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep the repository validated in memory and answer queries on a Unix socket.')
+    parser.add_argument('--socket', default=None, metavar='PATH', help='socket path (default: under .aerospacemodel_cache)')
+    parser.add_argument('--poll', action='store_true', help='poll file signatures instead of using inotify')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, metavar='SECONDS',
+                        help=f'polling interval (default: {DEFAULT_INTERVAL})')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics('validation_daemon', args, phase='serve')
+
+    path = args.socket or default_socket_path()
+    try:
+        server = bind_socket(path)
+    except OSError as e:
+        print(f'ERROR: {e}')
+        sys.exit(1)
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+    watcher = open_watcher(REPO_ROOT, polling=args.poll)
+    try:
+        model = RepositoryModel().load()
+        print(f'Validation daemon ready: {len(model.files)} files, watching with {type(watcher).__name__}, '
+              f'listening on {path}', flush=True)
+        serve(model, watcher, server, args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        watcher.close()
+        if os.path.exists(path):
+            os.unlink(path)
+    print('Validation daemon stopped')
+
+
+if __name__ == '__main__':
+    main()